@@ -0,0 +1,194 @@
+"""完了タスクのアーカイブと復元
+
+完了（status = 完了）のまま ARCHIVE_AFTER_DAYS 日以上更新されていないタスクを、配下の行ごと
+アーカイブテーブル（models/archive.py）へ移す。ARCHIVE_BATCH_SIZE 件ずつ、バッチごとに別の
+トランザクションで INSERT ... SELECT で写してから現役のタスクを削除し、配下の行は
+外部キーのカスケードで消す（全文検索の行もトリガーで消える）。
+
+ORM を通らない一括の移動のため、flush のイベントで行っている変更の記録はここで行う:
+移動した行を変更履歴（/sync）に削除として、関連付けが外れたメモを更新として記録し、
+コレクションバージョン（ETag）を進める（/events は app/events.py が変更履歴から配信する）。
+復元はその逆で、行を現役のテーブルへ戻して作成として記録する。
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import DateTime, String, delete, func, insert, literal, null, select, update
+from sqlalchemy.engine import Connection, Engine
+
+from .database import current_database
+from .events import broker
+from .models import Category, Memo, CollectionVersion, ChangeLogEntry
+from .models.archive import ARCHIVE_TABLES, ARCHIVED_SOURCES
+from .models.task import jst
+
+# 完了してからこの日数が過ぎたタスクをアーカイブする（0 でスケジューラからのアーカイブを無効にする）
+ARCHIVE_AFTER_DAYS = int(os.getenv("BIZBUDDY_ARCHIVE_AFTER_DAYS", "0"))
+# 1トランザクションで移すタスク数（配下の行もまとめて移る）
+ARCHIVE_BATCH_SIZE = int(os.getenv("BIZBUDDY_ARCHIVE_BATCH_SIZE", "100"))
+
+CLOSED_STATUS = "完了"
+
+# 変更履歴に記録するテーブル -> エンティティ名（app/sync.py の SYNC_ENTITIES と同じ名前）
+LOGGED_ENTITIES = {
+    "tasks": "task",
+    "sub_tasks": "sub_task",
+    "leaf_tasks": "leaf_task",
+    "action_items": "action_item",
+    "work_logs": "work_log",
+}
+
+# 変更履歴の task_id（/events）に記録する列。それ以外のテーブルは NULL
+TASK_ID_COLUMNS = {"tasks": "id", "sub_tasks": "task_id", "work_logs": "task_id"}
+
+# アーカイブ・復元で波及するコレクション（app/cache.py）
+TOUCHED_COLLECTIONS = ("tasks", "memos", "action_plan")
+
+HOT_TABLES = {source.name: source for source in ARCHIVED_SOURCES}
+
+
+class ArchiveError(ValueError):
+    """復元できない（アーカイブにない、または ID が現役の行と重複している）"""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _now_jst() -> datetime:
+    return datetime.now(jst).replace(tzinfo=None)
+
+
+def subtree_filters(tables: Dict, task_ids) -> Dict:
+    """テーブル名 -> 指定したタスクの配下の行を選ぶ条件（現役・アーカイブのどちらのテーブルにも使える）"""
+    sub_ids = select(tables["sub_tasks"].c.id).where(tables["sub_tasks"].c.task_id.in_(task_ids))
+    leaf_ids = select(tables["leaf_tasks"].c.id).where(tables["leaf_tasks"].c.sub_task_id.in_(sub_ids))
+    return {
+        "tasks": tables["tasks"].c.id.in_(task_ids),
+        "sub_tasks": tables["sub_tasks"].c.task_id.in_(task_ids),
+        "leaf_tasks": tables["leaf_tasks"].c.sub_task_id.in_(sub_ids),
+        "action_items": tables["action_items"].c.leaf_task_id.in_(leaf_ids),
+        "work_logs": tables["work_logs"].c.task_id.in_(task_ids),
+        "memo_task": tables["memo_task"].c.task_id.in_(task_ids),
+        "task_category": tables["task_category"].c.task_id.in_(task_ids),
+        "work_time_rollups": tables["work_time_rollups"].c.task_id.in_(task_ids),
+    }
+
+
+def _log_changes(connection: Connection, tables: Dict, filters: Dict, op: str) -> None:
+    """移動する行を変更履歴に記録する（関連付けが変わるメモは更新として記録する）"""
+    now = datetime.utcnow()
+    columns = ["entity", "row_id", "op", "task_id", "changed_at"]
+    for name, entity in LOGGED_ENTITIES.items():
+        table = tables[name]
+        task_id = table.c[TASK_ID_COLUMNS[name]] if name in TASK_ID_COLUMNS else null()
+        connection.execute(insert(ChangeLogEntry).from_select(columns, select(
+            literal(entity, String), table.c.id, literal(op, String), task_id, literal(now, DateTime)
+        ).where(filters[name])))
+    memo_task = tables["memo_task"]
+    connection.execute(insert(ChangeLogEntry).from_select(columns, select(
+        literal("memo", String), memo_task.c.memo_id, literal("update", String), null(), literal(now, DateTime)
+    ).where(filters["memo_task"]).distinct()))
+
+
+def _bump_versions(connection: Connection) -> Dict[str, int]:
+    connection.execute(
+        update(CollectionVersion)
+        .where(CollectionVersion.name.in_(TOUCHED_COLLECTIONS))
+        .values(version=CollectionVersion.version + 1)
+    )
+    return dict(connection.execute(
+        select(CollectionVersion.name, CollectionVersion.version)
+        .where(CollectionVersion.name == "tasks")
+    ).all())
+
+
+def archive_tasks(connection: Connection, task_ids: List[int]) -> Dict[str, int]:
+    """指定したタスクを配下の行ごとアーカイブへ移す（呼び出し側のトランザクション内で実行）"""
+    hot = subtree_filters(HOT_TABLES, task_ids)
+    archived_at = _now_jst()
+    for name, source in HOT_TABLES.items():
+        target = ARCHIVE_TABLES[name]
+        columns = [column.name for column in source.columns]
+        if name == "tasks":
+            rows = select(*source.c, literal(archived_at, DateTime)).where(hot[name])
+            columns.append("archived_at")
+        else:
+            rows = select(*source.c).where(hot[name])
+        connection.execute(insert(target).from_select(columns, rows))
+    _log_changes(connection, HOT_TABLES, hot, "delete")
+    # 配下の行・関連付け・ロールアップ・期限の通知は外部キーのカスケードで消える
+    connection.execute(delete(HOT_TABLES["tasks"]).where(hot["tasks"]))
+    return _bump_versions(connection)
+
+
+def archive_completed_tasks(
+    engine: Engine,
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    limit: Optional[int] = None,
+) -> int:
+    """完了後 older_than_days 日以上経ったタスクをバッチごとにアーカイブし、件数を返す"""
+    tasks = HOT_TABLES["tasks"]
+    cutoff = _now_jst() - timedelta(days=older_than_days)
+    archived = 0
+    while limit is None or archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - archived)
+        with engine.begin() as connection:
+            task_ids = list(connection.execute(
+                select(tasks.c.id)
+                .where(tasks.c.status == CLOSED_STATUS, tasks.c.last_updated < cutoff)
+                .order_by(tasks.c.id)
+                .limit(size)
+            ).scalars())
+            if not task_ids:
+                break
+            archive_tasks(connection, task_ids)
+        # コミットしたので、このプロセスの /events にはポーリングを待たずに読ませる
+        broker.notify(current_database().tenant)
+        archived += len(task_ids)
+    return archived
+
+
+def restore_task(engine: Engine, task_id: int) -> None:
+    """アーカイブしたタスクを配下の行ごと現役のテーブルへ戻す
+
+    次回のアーカイブですぐに戻らないよう、最終更新日時は復元した時刻にする。
+    削除済みのメモ・カテゴリとの関連付けは戻さない。
+    """
+    archived_tasks = ARCHIVE_TABLES["tasks"]
+    with engine.begin() as connection:
+        if connection.execute(select(archived_tasks.c.id).where(archived_tasks.c.id == task_id)).first() is None:
+            raise ArchiveError("Archived task not found", 404)
+        filters = subtree_filters(ARCHIVE_TABLES, [task_id])
+
+        # アーカイブ後に同じ ID で作られた行があれば戻せない
+        for name in LOGGED_ENTITIES:
+            source, archived = HOT_TABLES[name], ARCHIVE_TABLES[name]
+            duplicated = connection.execute(
+                select(func.count()).select_from(source)
+                .where(source.c.id.in_(select(archived.c.id).where(filters[name])))
+            ).scalar()
+            if duplicated:
+                raise ArchiveError(f"Cannot restore: {name} ids are already in use", 409)
+
+        for name, source in HOT_TABLES.items():
+            archived = ARCHIVE_TABLES[name]
+            columns = [column.name for column in source.columns]
+            condition = filters[name]
+            if name == "memo_task":
+                condition = condition & archived.c.memo_id.in_(select(Memo.id))
+            elif name == "task_category":
+                condition = condition & archived.c.category_id.in_(select(Category.id))
+            connection.execute(insert(source).from_select(
+                columns, select(*[archived.c[column] for column in columns]).where(condition)
+            ))
+        connection.execute(
+            update(HOT_TABLES["tasks"]).where(HOT_TABLES["tasks"].c.id == task_id).values(last_updated=_now_jst())
+        )
+        _log_changes(connection, HOT_TABLES, subtree_filters(HOT_TABLES, [task_id]), "create")
+        for name in reversed(list(HOT_TABLES)):
+            connection.execute(delete(ARCHIVE_TABLES[name]).where(filters[name]))
+        _bump_versions(connection)
+    broker.notify(current_database().tenant)
@@ -0,0 +1,168 @@
+"""読み取り系 GET の ETag（条件付き GET）とレスポンスキャッシュ
+
+書き込みを含む flush のたびに、影響するコレクションのバージョンを同じトランザクション内で
+インクリメントする（collection_versions テーブル）。GET ではバージョンから ETag を作り、
+If-None-Match が一致すればルートや ORM に触れる前に 304 を返す。
+シリアライズ済みの JSON は (URL, ETag) をキーにメモリ上へ保持し、バージョンが進めば自然に無効になる。
+バージョンは DB に置くため、複数ワーカーでも整合する。
+マルチテナントモード（app/tenants.py）ではバージョンがテナントごとに進むため、ETag にテナント名を含める。
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from .database import Database, current_database
+from .models import Task, Category, WorkLog, Memo, SubTask, LeafTask, ActionItem, CollectionVersion
+from .models.cascade import cascaded_deletes
+
+COLLECTIONS = ("tasks", "memos", "action_plan")
+
+# 変更されたモデル -> バージョンを進めるコレクション
+# （Memo はタスクを、Task は作業ログ・カテゴリを埋め込んで返すため、それぞれ波及させる）
+MODEL_COLLECTIONS = {
+    Task: ("tasks", "memos", "action_plan"),
+    WorkLog: ("tasks", "memos"),
+    Category: ("tasks", "memos"),
+    Memo: ("memos",),
+    SubTask: ("action_plan", "tasks"),
+    LeafTask: ("action_plan", "tasks"),
+    ActionItem: ("action_plan", "tasks"),
+}
+
+# GET のパス -> 対応するコレクション
+ROUTE_COLLECTIONS = [
+    (re.compile(r"^/tasks/\d+/(sub-tasks|action-plan|progress)$"), "action_plan"),
+    (re.compile(r"^/(sub-tasks/\d+/details|action-items/\d+)$"), "action_plan"),
+    (re.compile(r"^/tasks/\d+/memos/$"), "memos"),
+    (re.compile(r"^/memos/(\d+)?$"), "memos"),
+    (re.compile(r"^/task-memos$"), "memos"),
+    (re.compile(r"^/tasks/(\d+|\d+/work-logs/)?$"), "tasks"),
+]
+
+# キャッシュするレスポンスの件数（0 でキャッシュ無効、ETag のみ）
+RESPONSE_CACHE_SIZE = int(os.getenv("BIZBUDDY_RESPONSE_CACHE_SIZE", "256"))
+
+# キャッシュしたレスポンスに引き継ぐヘッダー
+CACHED_HEADERS = ("content-type", "x-next-cursor")
+
+
+def collection_for_path(path: str) -> Optional[str]:
+    for pattern, collection in ROUTE_COLLECTIONS:
+        if pattern.match(path):
+            return collection
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_collection_versions(session, flush_context):
+    touched = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        touched.update(MODEL_COLLECTIONS.get(type(obj), ()))
+    for model, _, _ in cascaded_deletes(session):
+        touched.update(MODEL_COLLECTIONS[model])
+    if touched:
+        session.connection().execute(
+            update(CollectionVersion)
+            .where(CollectionVersion.name.in_(touched))
+            .values(version=CollectionVersion.version + 1)
+        )
+
+
+def install_collection_versions(engine) -> None:
+    """バージョン行がなければ作成する"""
+    with engine.begin() as connection:
+        existing = set(connection.execute(select(CollectionVersion.name)).scalars())
+        missing = [{"name": name, "version": 0} for name in COLLECTIONS if name not in existing]
+        if missing:
+            connection.execute(CollectionVersion.__table__.insert(), missing)
+
+
+def current_etag(collection: str, database: Optional[Database] = None) -> str:
+    database = database or current_database()
+    with database.engine.connect() as connection:
+        version = connection.execute(
+            select(CollectionVersion.version).where(CollectionVersion.name == collection)
+        ).scalar()
+    if database.tenant is not None:
+        return f'W/"{database.tenant}.{collection}.{version or 0}"'
+    return f'W/"{collection}.{version or 0}"'
+
+
+class ResponseCache:
+    """(URL, ETag) -> (本文, ヘッダー) のスレッドセーフな LRU"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[bytes, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str, etag: str):
+        with self._lock:
+            entry = self._entries.get((url, etag))
+            if entry is not None:
+                self._entries.move_to_end((url, etag))
+            return entry
+
+    def put(self, url: str, etag: str, body: bytes, headers: Dict[str, str]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[(url, etag)] = (body, headers)
+            self._entries.move_to_end((url, etag))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        collection = collection_for_path(request.url.path) if request.method == "GET" else None
+        if collection is None:
+            return await call_next(request)
+
+        # バージョンの読み取りは書き込み中のロック待ち（busy_timeout）で止まりうるため、イベントループの外で行う
+        database = current_database()
+        etag = await run_in_threadpool(current_etag, collection, database)
+        cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=cache_headers)
+
+        url = str(request.url.path) + ("?" + request.url.query if request.url.query else "")
+        cached = response_cache.get(url, etag)
+        if cached is not None:
+            body, headers = cached
+            return Response(content=body, status_code=200, headers={**headers, **cache_headers})
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {key: value for key, value in response.headers.items() if key in CACHED_HEADERS}
+        # 処理中に書き込みがあった場合は、どちらの版か分からないためキャッシュしない
+        if await run_in_threadpool(current_etag, collection, database) == etag:
+            response_cache.put(url, etag, body, headers)
+        else:
+            cache_headers = {"Cache-Control": "no-cache"}
+        return Response(content=body, status_code=200, headers={**headers, **cache_headers})
@@ -0,0 +1,182 @@
+"""BizBuddy の管理コマンド
+
+使い方（backend ディレクトリで実行）:
+    python -m app.cli migrate
+    python -m app.cli rebuild-progress
+    python -m app.cli rebuild-search
+    python -m app.cli rebuild-work-time
+    python -m app.cli export -o backup.ndjson
+    python -m app.cli import backup.ndjson [--replace]
+    python -m app.cli prune-change-log --days 90
+    python -m app.cli refresh-urgency
+    python -m app.cli archive-tasks --days 90
+
+マルチテナントモード（BIZBUDDY_TENANT_MODE）では --tenant で対象のテナントを指定する。
+省略すると全テナントに対して実行する（export・import は指定が必要）。
+"""
+import argparse
+import sys
+
+from .database import current_database, get_engine, use_database
+from .models import rebuild_progress_counters, rebuild_work_time_rollups
+from .search import install_search_index, is_supported, rebuild_search_index
+from .cache import install_collection_versions
+from .transfer import TransferError, export_chunks, import_file
+from .sync import prune_change_log as prune_change_log_entries
+from .urgency import run_urgency_jobs
+from .archive import ARCHIVE_BATCH_SIZE, archive_completed_tasks
+from .migrate import upgrade_database
+from .tenants import TENANT_MODE, TenantError, for_each_database, migrate_tenants, tenant_router, validate_tenant
+
+
+def migrate(args):
+    if TENANT_MODE:
+        tenants = migrate_tenants(args.revision, [args.tenant] if args.tenant else None)
+        print(f"{len(tenants)} tenant databases migrated to {args.revision}")
+    else:
+        upgrade_database(get_engine(), args.revision)
+        print(f"Database migrated to {args.revision}")
+
+
+def rebuild_progress(args):
+    db = current_database().session_factory()
+    try:
+        rebuild_progress_counters(db)
+    finally:
+        db.close()
+    print("Progress counters rebuilt")
+
+
+def rebuild_search(args):
+    engine = get_engine()
+    if not is_supported(engine):
+        raise SystemExit("Full-text search requires SQLite")
+    install_search_index(engine)
+    with engine.begin() as connection:
+        rebuild_search_index(connection)
+    print("Search index rebuilt")
+
+
+def rebuild_work_time(args):
+    db = current_database().session_factory()
+    try:
+        rebuild_work_time_rollups(db)
+    finally:
+        db.close()
+    print("Work time rollups rebuilt")
+
+
+def export(args):
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in export_chunks(get_engine()):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+
+def import_(args):
+    engine = get_engine()
+    install_search_index(engine)
+    install_collection_versions(engine)
+    with open(args.file, encoding="utf-8") as file:
+        try:
+            counts = import_file(engine, file, replace=args.replace)
+        except TransferError as exc:
+            raise SystemExit(str(exc))
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+
+
+def prune_change_log(args):
+    db = current_database().session_factory()
+    try:
+        deleted = prune_change_log_entries(db, args.days)
+    finally:
+        db.close()
+    print(f"Deleted {deleted} change log entries")
+
+
+def refresh_urgency(args):
+    result = run_urgency_jobs(get_engine())
+    print(f"Updated {result['scores']} urgency scores, queued {result['reminders']} reminders")
+
+
+def archive_tasks(args):
+    archived = archive_completed_tasks(get_engine(), args.days, batch_size=args.batch_size, limit=args.limit)
+    print(f"Archived {archived} tasks")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="BizBuddy management commands")
+    parser.add_argument("--tenant", help="対象のテナント（マルチテナントモードのみ。省略時は全テナント）")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    command = subcommands.add_parser("migrate", help="DB を最新のスキーマに移行する（デプロイ時にアプリの起動前に1回実行する）")
+    command.add_argument("--revision", default="head", help="移行先のリビジョン")
+    command.set_defaults(func=migrate)
+
+    rebuild = subcommands.add_parser("rebuild-progress", help="アクションプランの進捗カウンタを再計算する")
+    rebuild.set_defaults(func=rebuild_progress)
+
+    rebuild = subcommands.add_parser("rebuild-search", help="全文検索インデックスを作り直す")
+    rebuild.set_defaults(func=rebuild_search)
+
+    rebuild = subcommands.add_parser("rebuild-work-time", help="作業時間の日次ロールアップを作り直す")
+    rebuild.set_defaults(func=rebuild_work_time)
+
+    command = subcommands.add_parser("export", help="ワークスペース全体を NDJSON で出力する")
+    command.add_argument("-o", "--output", help="出力ファイル（省略時は標準出力）")
+    command.set_defaults(func=export)
+
+    command = subcommands.add_parser("import", help="NDJSON を取り込む")
+    command.add_argument("file")
+    command.add_argument("--replace", action="store_true", help="既存データを削除してから取り込む")
+    command.set_defaults(func=import_)
+
+    command = subcommands.add_parser("prune-change-log", help="差分同期用の古い変更履歴を削除する")
+    command.add_argument("--days", type=int, default=90, help="この日数より古い履歴を削除する")
+    command.set_defaults(func=prune_change_log)
+
+    command = subcommands.add_parser("refresh-urgency", help="緊急度の再計算と期限通知の登録をすぐに実行する")
+    command.set_defaults(func=refresh_urgency)
+
+    command = subcommands.add_parser("archive-tasks", help="完了から一定期間が過ぎたタスクを配下の行ごとアーカイブへ移す")
+    command.add_argument("--days", type=int, default=90, help="完了後この日数が過ぎたタスクを移す")
+    command.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="1トランザクションで移すタスク数")
+    command.add_argument("--limit", type=int, default=None, help="今回移すタスク数の上限")
+    command.set_defaults(func=archive_tasks)
+
+    args = parser.parse_args(argv)
+    if not TENANT_MODE:
+        if args.tenant:
+            raise SystemExit("--tenant requires BIZBUDDY_TENANT_MODE")
+        if args.func is not migrate:
+            # どのコマンドも最新のスキーマを前提にするため、先に移行する
+            upgrade_database(get_engine())
+        args.func(args)
+        return
+
+    try:
+        tenant = validate_tenant(args.tenant) if args.tenant else None
+    except TenantError as exc:
+        raise SystemExit(str(exc))
+    if args.func is migrate:
+        args.func(args)
+    elif tenant is not None:
+        # テナントの DB は開くときに移行する
+        with tenant_router.borrow(tenant) as database, use_database(database):
+            args.func(args)
+    elif args.func in (export, import_):
+        raise SystemExit(f"--tenant is required for {args.command} in tenant mode")
+    else:
+        def run(database):
+            print(f"[{database.tenant}]")
+            args.func(args)
+
+        for_each_database(run)
+
+
+if __name__ == "__main__":
+    main()
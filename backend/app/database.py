@@ -1,19 +1,142 @@
-from sqlalchemy import create_engine
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./bizbuddy.db"
+# Postgres 等に切り替える場合は BIZBUDDY_DATABASE_URL で接続先を指定する
+SQLALCHEMY_DATABASE_URL = os.getenv("BIZBUDDY_DATABASE_URL", "sqlite:///./bizbuddy.db")
+
+# true にすると主要ルートを非同期エンジン版に切り替える（同期版との比較用）
+USE_ASYNC_DB = os.getenv("BIZBUDDY_ASYNC_DB", "false").lower() in ("1", "true", "yes")
+
+# SQLite 接続ごとに設定する PRAGMA のプロファイル
+#   tuned:  WAL + synchronous=NORMAL など、同時アクセス向けの設定（既定）
+#   legacy: 外部キー以外の PRAGMA を設定しない（従来のロールバックジャーナル動作）
+# 子の削除は外部キーの ON DELETE CASCADE に任せているため、foreign_keys はどちらでも有効にする
+SQLITE_PROFILE = os.getenv("BIZBUDDY_SQLITE_PROFILE", "tuned")
+
+SQLITE_PROFILES = {
+    "tuned": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": os.getenv("BIZBUDDY_SQLITE_BUSY_TIMEOUT", "5000"),  # ミリ秒
+        "cache_size": os.getenv("BIZBUDDY_SQLITE_CACHE_SIZE", "-65536"),  # 負数は KiB 単位（64MiB）
+        "mmap_size": os.getenv("BIZBUDDY_SQLITE_MMAP_SIZE", "268435456"),  # 256MiB
+        "temp_store": "MEMORY",
+    },
+    "legacy": {},
+}
+
+# コネクションプールの設定（SQLite ファイル / サーバー DB 共通）
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("BIZBUDDY_DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("BIZBUDDY_DB_MAX_OVERFLOW", "20")),
+    "pool_timeout": int(os.getenv("BIZBUDDY_DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("BIZBUDDY_DB_POOL_RECYCLE", "1800")),
+    "pool_pre_ping": True,
+}
+
+# 同期ドライバ -> 非同期ドライバの対応
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+def to_async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    for name, value in SQLITE_PROFILES[SQLITE_PROFILE].items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def engine_options(url: str) -> dict:
+    """URL に応じた create_engine / create_async_engine の引数"""
+    if not is_sqlite(url):
+        return dict(POOL_OPTIONS)
+    options = {"connect_args": {"check_same_thread": False}}
+    if make_url(url).database not in (None, "", ":memory:"):
+        options.update(POOL_OPTIONS)
+    return options
+
+def create_db_engine(url: str, **options):
+    engine = create_engine(url, **{**engine_options(url), **options})
+    if is_sqlite(url):
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    return engine
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+@dataclass(eq=False)
+class Database:
+    """接続先の DB。マルチテナントモード（app/tenants.py）ではテナントごとに1つ作る"""
+    engine: Engine
+    session_factory: sessionmaker
+    tenant: Optional[str] = None
+
+default_database = Database(engine, SessionLocal)
+
+# リクエスト（や管理コマンド・スケジューラのジョブ）が使う DB。テナントモードではミドルウェアが設定する
+_current_database: ContextVar[Database] = ContextVar("bizbuddy_database", default=default_database)
+
+def current_database() -> Database:
+    return _current_database.get()
+
+def get_engine() -> Engine:
+    return current_database().engine
+
+@contextmanager
+def use_database(database: Database):
+    token = _current_database.set(database)
+    try:
+        yield database
+    finally:
+        _current_database.reset(token)
+
 def get_db():
-    db = SessionLocal()
+    db = current_database().session_factory()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# 非同期エンジンはドライバ（aiosqlite 等）が必要なため、有効時のみ作成する
+async_engine = None
+AsyncSessionLocal = None
+
+if USE_ASYNC_DB:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    async_url = to_async_url(SQLALCHEMY_DATABASE_URL)
+    async_options = engine_options(async_url)
+    if is_sqlite(async_url) and "pool_size" in async_options:
+        # aiosqlite の既定は NullPool のため、ファイル DB ではプールを明示する
+        async_options["poolclass"] = AsyncAdaptedQueuePool
+    async_engine = create_async_engine(async_url, **async_options)
+    if is_sqlite(async_url):
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
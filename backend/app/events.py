@@ -0,0 +1,272 @@
+"""書き込みの変更イベントを購読中のクライアントへ配信する（/events の Server-Sent Events）
+
+変更は書き込みと同じトランザクションで change_log（app/sync.py）に、期限の通知は deadline_reminders
+（app/urgency.py）に記録される。どのワーカー（gunicorn の別プロセス）で書き込まれても届くよう、
+各ワーカーは購読者のいる DB ごとに1つのフィード（ChangeFeed）を動かし、これらのテーブルを
+seq・id の順に読み進めて自分の購読者に配る。
+- 他のワーカーの書き込みは EVENTS_POLL_INTERVAL 秒ごとの読み込みで届く。同じワーカーの書き込みは
+  コミット直後に読みに行く（after_commit でフィードを起こす）
+- コミットされた変更だけが履歴に残るため、ロールバックされた変更（グループコミットで取り消された
+  1件の書き込みを含む）は配信されない
+- 購読を始める前の変更は配信しない（取りこぼしは /sync で埋める）。インポートなどで履歴が
+  reset されたときと、購読者のキューが溢れたときは resync を送って全件の再取得を促す
+- マルチテナントモード（app/tenants.py）ではテナントごとにフィードが分かれ、同じテナントの購読者にだけ配る
+"""
+import asyncio
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .models import Task, WorkLog, Memo, SubTask, LeafTask, ActionItem, CollectionVersion, ChangeLogEntry, DeadlineReminder
+from .models.cascade import cascaded_deletes
+from .models.change_log import RESET_OP
+
+logger = logging.getLogger(__name__)
+
+# モデル -> (エンティティ名, 所属コレクション, 親タスクを指す属性)
+EVENT_ENTITIES = {
+    Task: ("task", "tasks", "id"),
+    WorkLog: ("work_log", "tasks", "task_id"),
+    Memo: ("memo", "memos", None),
+    SubTask: ("sub_task", "action_plan", "task_id"),
+    LeafTask: ("leaf_task", "action_plan", None),
+    ActionItem: ("action_item", "action_plan", None),
+}
+
+# エンティティ名 -> 所属コレクション（change_log の行からイベントを組み立てる）
+ENTITY_COLLECTIONS = {entity: collection for entity, collection, _ in EVENT_ENTITIES.values()}
+
+# 他のワーカーの書き込みを読みに行く間隔（秒）
+EVENTS_POLL_INTERVAL = float(os.getenv("BIZBUDDY_EVENTS_POLL_INTERVAL", "1"))
+# 1回の読み込みで取る履歴・通知の件数（残っていればすぐに続きを読む）
+FEED_BATCH_SIZE = 500
+
+# 購読者ごとに溜められるイベント数。溢れた購読者には resync を送って再取得させる
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# change_log に書き込んだセッションの印（app/sync.py が立てる）
+CHANGE_LOG_WRITTEN_KEY = "change_log_written"
+
+
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, tenant: Optional[str] = None):
+        self.loop = loop
+        self.tenant = tenant
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def _put(self, change: dict) -> None:
+        try:
+            self.queue.put_nowait(change)
+        except asyncio.QueueFull:
+            # 取りこぼしたイベントは差分で埋められないため、溜まった分を捨てて全件再取得を促す
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"op": "resync"})
+
+
+class ChangeFeed:
+    """1つの DB の change_log・deadline_reminders をどこまで読んだか"""
+
+    def __init__(self, database):
+        self.database = database
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.seq = 0
+        self.reminder_id = 0
+
+    def start(self) -> None:
+        """購読を始めた時点の末尾から読む"""
+        with self.database.engine.connect() as connection:
+            self.seq = connection.scalar(select(ChangeLogEntry.seq).order_by(ChangeLogEntry.seq.desc()).limit(1)) or 0
+            self.reminder_id = connection.scalar(
+                select(DeadlineReminder.id).order_by(DeadlineReminder.id.desc()).limit(1)
+            ) or 0
+
+    def read(self) -> Tuple[List[dict], bool]:
+        """前回の続きからイベントを読み、(イベント, まだ続きがあるか) を返す"""
+        with self.database.engine.connect() as connection:
+            entries = connection.execute(
+                select(ChangeLogEntry.seq, ChangeLogEntry.entity, ChangeLogEntry.row_id, ChangeLogEntry.op, ChangeLogEntry.task_id)
+                .where(ChangeLogEntry.seq > self.seq)
+                .order_by(ChangeLogEntry.seq)
+                .limit(FEED_BATCH_SIZE)
+            ).all()
+            reminders = connection.execute(
+                select(DeadlineReminder.id, DeadlineReminder.task_id, DeadlineReminder.kind, DeadlineReminder.deadline, Task.title)
+                .join(Task, Task.id == DeadlineReminder.task_id)
+                .where(DeadlineReminder.id > self.reminder_id)
+                .order_by(DeadlineReminder.id)
+                .limit(FEED_BATCH_SIZE)
+            ).all()
+            # 同じ読み込みの中ではバージョンは最新の値になる（クライアントは ETag の比較にしか使わない）
+            versions: Dict[str, int] = dict(connection.execute(
+                select(CollectionVersion.name, CollectionVersion.version)
+            ).all()) if entries else {}
+
+        changes = []
+        for entry in entries:
+            if entry.op == RESET_OP:
+                changes.append({"op": "resync"})
+                continue
+            collection = ENTITY_COLLECTIONS.get(entry.entity)
+            if collection is None:
+                continue
+            changes.append({
+                "entity": entry.entity,
+                "id": entry.row_id,
+                "op": entry.op,
+                "collection": collection,
+                "task_id": entry.task_id,
+                "version": versions.get(collection, 0),
+            })
+        for reminder in reminders:
+            changes.append({
+                "op": "reminder",
+                "entity": "task",
+                "id": reminder.task_id,
+                "reminder_id": reminder.id,
+                "kind": reminder.kind,
+                "title": reminder.title,
+                "deadline": reminder.deadline.isoformat(),
+            })
+        if entries:
+            self.seq = entries[-1].seq
+        if reminders:
+            self.reminder_id = reminders[-1].id
+        return changes, len(entries) == FEED_BATCH_SIZE or len(reminders) == FEED_BATCH_SIZE
+
+    def wake(self) -> None:
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+
+class ChangeBroker:
+    def __init__(self):
+        self._subscribers: List[Subscriber] = []
+        self._feeds: Dict[Optional[str], ChangeFeed] = {}
+        self._lock = threading.Lock()
+
+    async def subscribe(self, database) -> Subscriber:
+        """database の変更の購読を始める（その DB のフィードがなければ起動する）"""
+        subscriber = Subscriber(asyncio.get_running_loop(), database.tenant)
+        feed = None
+        with self._lock:
+            self._subscribers.append(subscriber)
+            if database.tenant not in self._feeds:
+                feed = self._feeds[database.tenant] = ChangeFeed(database)
+        if feed is not None:
+            try:
+                await run_in_threadpool(feed.start)
+            except BaseException:
+                self.unsubscribe(subscriber)
+                raise
+            with self._lock:
+                # 起動を待つ間に購読者が全員離れていれば動かさない
+                if self._feeds.get(database.tenant) is feed:
+                    feed.task = asyncio.create_task(self._run(feed))
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+            if any(other.tenant == subscriber.tenant for other in self._subscribers):
+                return
+            feed = self._feeds.pop(subscriber.tenant, None)
+        # 購読者がいなくなった DB は読みに行かない
+        if feed is not None and feed.task is not None and not feed.loop.is_closed():
+            feed.loop.call_soon_threadsafe(feed.task.cancel)
+
+    def notify(self, tenant: Optional[str] = None) -> None:
+        """このプロセスで tenant の change_log・deadline_reminders に書き込んだ（コミット後に呼ぶ）"""
+        with self._lock:
+            feed = self._feeds.get(tenant)
+        if feed is not None:
+            feed.wake()
+
+    def publish(self, changes: List[dict], tenant: Optional[str] = None) -> None:
+        with self._lock:
+            subscribers = [subscriber for subscriber in self._subscribers if subscriber.tenant == tenant]
+        try:
+            current_loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        for subscriber in subscribers:
+            for change in changes:
+                if subscriber.loop is current_loop:
+                    subscriber._put(change)
+                elif not subscriber.loop.is_closed():
+                    subscriber.loop.call_soon_threadsafe(subscriber._put, change)
+
+    async def _run(self, feed: ChangeFeed) -> None:
+        tenant = feed.database.tenant
+        while True:
+            try:
+                await asyncio.wait_for(feed.wakeup.wait(), EVENTS_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            feed.wakeup.clear()
+            try:
+                changes, more = await run_in_threadpool(feed.read)
+            except Exception:
+                # 読めなかった分は次回に同じ位置から読み直す
+                logger.exception("Failed to read changes for /events")
+                continue
+            if more:
+                feed.wakeup.set()
+            if changes:
+                self.publish(changes, tenant)
+
+
+broker = ChangeBroker()
+
+
+def changed_entities(session) -> List[dict]:
+    """flush 中の session.new / dirty / deleted（とカスケード削除される子孫）から変更されたエンティティを集める"""
+    changes = []
+    for op, objects in (("create", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            spec = EVENT_ENTITIES.get(type(obj))
+            if spec is None:
+                continue
+            if op == "update" and (obj in session.deleted or not session.is_modified(obj)):
+                continue
+            entity, collection, task_key = spec
+            changes.append({
+                "entity": entity,
+                "id": obj.id,
+                "op": op,
+                "collection": collection,
+                "task_id": getattr(obj, task_key) if task_key else None,
+            })
+    # DB のカスケード削除で消える子孫（セッションに読み込まれていない行）
+    for model, row_id, parent_id in cascaded_deletes(session):
+        entity, collection, task_key = EVENT_ENTITIES[model]
+        changes.append({
+            "entity": entity,
+            "id": row_id,
+            "op": "delete",
+            "collection": collection,
+            "task_id": parent_id if task_key else None,
+        })
+    return changes
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_feed(session):
+    if session.in_nested_transaction():
+        # SAVEPOINT の RELEASE でも呼ばれる。外側のトランザクションがコミットされるまで待つ
+        return
+    if session.info.pop(CHANGE_LOG_WRITTEN_KEY, False):
+        broker.notify(session.info.get("tenant"))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_written(session):
+    session.info.pop(CHANGE_LOG_WRITTEN_KEY, None)
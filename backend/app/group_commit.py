@@ -0,0 +1,204 @@
+"""書き込みのグループコミット（任意）
+
+SQLite は書き込みが1つずつしか進まず、コミットごとにジャーナルの同期が走るため、小さな書き込み
+（アクションアイテムの完了切り替え・作業ログやメモの保存）が同時に多く来るとコミットが詰まる。
+BIZBUDDY_GROUP_COMMIT を有効にすると、これらのルートの書き込みを専用の書き込みスレッドに渡し、
+GROUP_COMMIT_WINDOW_MS の間に集まった書き込みを1トランザクションにまとめて1回でコミットする。
+
+- 書き込みごとに SAVEPOINT を張るため、1件が失敗（404 や制約違反）しても他の書き込みはコミットされ、
+  失敗した書き込みのリクエストにだけ例外が返る（変更履歴も失敗した分は残らないため、/sync・/events にも出ない）
+- レスポンスはコミット前（flush 後）に response_model で組み立て、コミットできてから各リクエストに返す。
+  コミット自体が失敗した場合はまとめた全リクエストに例外を返す
+- 書き込みスレッドは DB ごとに最初の書き込みで起動し（gunicorn の preload で fork された後のワーカーごとに1つ）、
+  書き込みが IDLE_SECONDS 来なければ止まる（マルチテナントモードではテナントの DB ごとにスレッドができるため）
+- 書き込みスレッドのクエリはリクエストの計測（Server-Timing・/metrics の DB 時間）には含まれない
+- 非同期モード（BIZBUDDY_ASYNC_DB）の非同期ルートでは使わない
+"""
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .database import Database, SessionLocal, current_database
+
+logger = logging.getLogger("bizbuddy")
+
+GROUP_COMMIT = os.getenv("BIZBUDDY_GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+# 最初の書き込みが来てから、同じトランザクションにまとめる書き込みを待つ時間
+GROUP_COMMIT_WINDOW_MS = float(os.getenv("BIZBUDDY_GROUP_COMMIT_WINDOW_MS", "2"))
+# 1トランザクションにまとめる書き込みの上限
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("BIZBUDDY_GROUP_COMMIT_MAX_BATCH", "64"))
+
+# write(session) -> 値、load(session, 値) -> レスポンスの元になる値
+Write = Callable[[Session], Any]
+Load = Callable[[Session, Any], Any]
+
+
+@dataclass
+class PendingWrite:
+    write: Write
+    load: Optional[Load]
+    response_model: Any
+    future: Future = field(default_factory=Future)
+    value: Any = None
+    error: Optional[BaseException] = None
+
+
+class WriteCoordinator:
+    # この秒数書き込みが来なければ書き込みスレッドを止める（次の書き込みで起動し直す）
+    IDLE_SECONDS = 60
+
+    def __init__(self, session_factory=SessionLocal, window_ms: float = GROUP_COMMIT_WINDOW_MS,
+                 max_batch: int = GROUP_COMMIT_MAX_BATCH):
+        self.session_factory = session_factory
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[PendingWrite]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def submit(self, write: Write, load: Optional[Load] = None, response_model=None) -> Future:
+        pending = PendingWrite(write, load, response_model)
+        # キューへの投入はロックの中で行う（書き込みスレッドが空のキューを見て止まるのと競合しないように）
+        with self._lock:
+            # fork したプロセスには親のスレッドが引き継がれないため、プロセスごとに起動する
+            if self._thread is None or self._pid != os.getpid():
+                self._start()
+            self._queue.put(pending)
+        return pending.future
+
+    def stop(self) -> None:
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._pid != os.getpid():
+                return
+            self._thread = None
+            self._queue.put(None)
+        thread.join()
+
+    def _start(self) -> None:
+        self._queue = queue.Queue()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._queue,), name="bizbuddy-group-commit", daemon=True
+        )
+        self._thread.start()
+
+    def _next_batch(self, pending_writes: "queue.Queue[Optional[PendingWrite]]") -> Optional[List[PendingWrite]]:
+        try:
+            first = pending_writes.get(timeout=self.IDLE_SECONDS)
+        except queue.Empty:
+            with self._lock:
+                if pending_writes.empty():
+                    if self._thread is threading.current_thread():
+                        self._thread = None
+                    return None
+            first = pending_writes.get_nowait()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                pending = pending_writes.get(timeout=timeout) if timeout > 0 else pending_writes.get_nowait()
+            except queue.Empty:
+                break
+            if pending is None:
+                # 集めた分をコミットしてから止まる
+                pending_writes.put(None)
+                break
+            batch.append(pending)
+        return batch
+
+    def _run(self, pending_writes: "queue.Queue[Optional[PendingWrite]]") -> None:
+        while True:
+            batch = self._next_batch(pending_writes)
+            if batch is None:
+                return
+            try:
+                self._commit(batch)
+            except Exception as exc:
+                logger.exception("Group commit failed")
+                for pending in batch:
+                    pending.error = pending.error or exc
+            for pending in batch:
+                if pending.error is not None:
+                    pending.future.set_exception(pending.error)
+                else:
+                    pending.future.set_result(pending.value)
+
+    def _commit(self, batch: List[PendingWrite]) -> None:
+        session = self.session_factory()
+        try:
+            if session.get_bind().dialect.name == "sqlite":
+                # pysqlite は最初の書き込みまで BEGIN を送らず、先頭の SAVEPOINT の RELEASE がそのままコミットになるため、
+                # 書き込みロックを取ってトランザクションを明示的に始める
+                session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            for pending in batch:
+                try:
+                    with session.begin_nested():
+                        value = pending.write(session)
+                        session.flush()
+                        if pending.load is not None:
+                            value = pending.load(session, value)
+                        if pending.response_model is not None:
+                            value = pending.response_model.model_validate(value)
+                    pending.value = value
+                except Exception as exc:
+                    pending.error = exc
+                    # ロールバックした書き込みで読み込んだ値（進捗カウンタなど）を後続の書き込みに残さない
+                    session.expire_all()
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+
+# DB -> 書き込みをまとめるコーディネーター（閉じられたテナントの DB の分は参照がなくなれば消える）
+_coordinators: "weakref.WeakKeyDictionary[Database, WriteCoordinator]" = weakref.WeakKeyDictionary()
+_coordinators_lock = threading.Lock()
+
+
+def coordinator_for(database: Database) -> WriteCoordinator:
+    with _coordinators_lock:
+        coordinator = _coordinators.get(database)
+        if coordinator is None:
+            coordinator = _coordinators[database] = WriteCoordinator(database.session_factory)
+        return coordinator
+
+
+def stop_all() -> None:
+    with _coordinators_lock:
+        coordinators = list(_coordinators.values())
+    for coordinator in coordinators:
+        coordinator.stop()
+
+
+def commit_write(db: Session, write: Write, load: Optional[Load] = None, response_model=None):
+    """ルートの書き込みを実行してコミットし、レスポンスの元になる値を返す
+
+    write(session) は変更を加え、レスポンスの元になる値（ORM オブジェクトや dict）を返す。
+    load(session, 値) を渡すとコミット後（グループコミットでは flush 後）に読み直した値を返す。
+    グループコミットが無効ならリクエストのセッション db でそのまま実行・コミットし、ORM オブジェクトは refresh して返す。
+    有効なら現在の DB（current_database()）の書き込みスレッドに渡し、他のリクエストとまとめてコミットされるまで待つ（値は response_model で組み立てた後のもの）。
+    """
+    if GROUP_COMMIT:
+        return coordinator_for(current_database()).submit(write, load, response_model).result()
+    value = write(db)
+    db.commit()
+    if load is not None:
+        return load(db, value)
+    if hasattr(value, "__table__"):
+        db.refresh(value)
+    return value
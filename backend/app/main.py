@@ -1,26 +1,63 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session
-from typing import List
-from .models import Base, Task as TaskModel, Memo as MemoModel, WorkLog as WorkLogModel
-from .schemas.task import Task, TaskCreate
-from .schemas.memo import Memo, MemoCreate
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, with_parent
+from typing import List, Optional
+from .models import Task as TaskModel, Memo as MemoModel, WorkLog as WorkLogModel
+from .schemas.task import Task, TaskCreate, TaskSummary, TaskListView, TaskBulkRequest, TaskBulkResult
+from .schemas.memo import Memo, MemoCreate, TaskMemos, MAX_TASK_MEMO_IDS
 from .schemas.work_log import WorkLog, WorkLogCreate
-from .database import engine, get_db
+from .database import get_db, USE_ASYNC_DB
+from .pagination import NEXT_CURSOR_HEADER, keyset_page
+from .cache import ConditionalGetMiddleware
+from .metrics import MetricsMiddleware
+from .scheduler import Scheduler, SCHEDULER_INTERVAL
+from .urgency import run_urgency_jobs
+from .archive import ARCHIVE_AFTER_DAYS, archive_completed_tasks
+from .group_commit import commit_write, stop_all as stop_write_coordinators
+from .tenants import TENANT_EVICT_INTERVAL, TENANT_MODE, TenantMiddleware, for_each_database, tenant_router
+from .serializers import (
+    FAST_RESPONSES, TASK_FIELDS, TASK_SUMMARY_FIELDS, MEMO_FIELDS, parse_fields, use_fast_path, fast_response,
+    task_to_dict, task_summary_to_dict, memo_to_dict, task_projection_options, memo_projection_options,
+)
+from .routers import (
+    search as search_routes, events as event_routes, analytics as analytics_routes,
+    transfer as transfer_routes, metrics as metrics_routes, sync as sync_routes,
+    urgency as urgency_routes, archive as archive_routes, health as health_routes,
+)
 from datetime import datetime
 import logging
 import pytz
-from .schemas.action_plan import SubTask, SubTaskCreate, LeafTask, LeafTaskCreate, ActionItem, ActionItemCreate
+from pydantic import ValidationError
+from .schemas.action_plan import (
+    SubTask, SubTaskCreate, LeafTask, LeafTaskCreate, ActionItem, ActionItemCreate,
+    SubTaskTree, ActionPlanTree, ActionPlanProgress, BatchRequest, BatchResult,
+)
 from .models.action_plan import SubTask as SubTaskModel, LeafTask as LeafTaskModel, ActionItem as ActionItemModel
+from .queries import (
+    task_load_options, memo_load_options, sub_task_tree_options, action_plan_tree_options,
+    parse_task_sort, filter_tasks, build_sub_task_tree, build_action_plan_tree, action_item_detail,
+    action_plan_progress_statements, build_action_plan_progress,
+    apply_memo_task_diff, task_memo_statements, group_task_memos, build_task_memos,
+)
 
 # ロガーの設定
 logger = logging.getLogger("bizbuddy")
 
-Base.metadata.create_all(bind=engine)
+# スキーマの作成・移行は起動時には行わず、デプロイ時に `python -m app.cli migrate`（app/migrate.py）で1回だけ行う
+# （複数ワーカーの同時起動で移行が競合しないように。移行済みかどうかは /readyz で確認できる）
+
+# 高速レスポンスモードでは他のエンドポイントも JSON 化を orjson で行う
+app = FastAPI(title="BizBuddy API", default_response_class=ORJSONResponse if FAST_RESPONSES else JSONResponse)
+
+# ETag による条件付き GET とレスポンスキャッシュ（CORS より内側に置く）
+app.add_middleware(ConditionalGetMiddleware)
 
-app = FastAPI(title="BizBuddy API")
+# マルチテナントモードではヘッダーのテナントの DB をリクエストに割り当てる（ETag・キャッシュより外側、CORS より内側に置く）
+if TENANT_MODE:
+    app.add_middleware(TenantMiddleware)
 
 # CORSの設定
 app.add_middleware(
@@ -29,8 +66,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# クエリ数・DB 時間などの計測（キャッシュ応答や CORS も含めて測るため最も外側に置く）
+app.add_middleware(MetricsMiddleware, router=app.router)
+
 @app.exception_handler(Exception)
 async def validation_exception_handler(request, exc):
     logger.error(f"Error processing request: {exc}")
@@ -42,6 +83,56 @@ async def validation_exception_handler(request, exc):
         })
     )
 
+app.include_router(health_routes.router)
+app.include_router(search_routes.router)
+app.include_router(event_routes.router)
+app.include_router(analytics_routes.router)
+app.include_router(transfer_routes.router)
+app.include_router(metrics_routes.router)
+app.include_router(sync_routes.router)
+# /tasks/next を /tasks/{task_id} より先に登録する
+app.include_router(urgency_routes.router)
+app.include_router(archive_routes.router)
+
+# 非同期モードでは同じパスの非同期版ルートを先に登録し、以下の同期版より優先させる
+if USE_ASYNC_DB:
+    from .routers import async_routes
+    app.include_router(async_routes.router)
+
+# 緊急度の再計算・期限通知・完了タスクのアーカイブはリクエストの処理とは別に、バックグラウンドで定期的に行う
+# （テナントモードでは全テナントの DB を順に処理する）
+scheduler = Scheduler()
+if SCHEDULER_INTERVAL > 0:
+    scheduler.add_job(
+        "urgency", lambda: for_each_database(lambda database: run_urgency_jobs(database.engine)), SCHEDULER_INTERVAL
+    )
+    if ARCHIVE_AFTER_DAYS > 0:
+        scheduler.add_job(
+            "archive",
+            lambda: for_each_database(lambda database: archive_completed_tasks(database.engine, ARCHIVE_AFTER_DAYS)),
+            SCHEDULER_INTERVAL,
+        )
+if TENANT_MODE:
+    # 開いたテナントの接続はワーカーごとに持つため、使われなくなった分は各ワーカーで閉じる
+    scheduler.add_job("tenant-eviction", tenant_router.evict_idle, TENANT_EVICT_INTERVAL, leader_only=False)
+
+@app.on_event("startup")
+async def start_scheduler():
+    scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_scheduler():
+    await scheduler.stop()
+
+@app.on_event("shutdown")
+def stop_write_coordinator():
+    # 集めた書き込みをコミットしてから書き込みスレッドを止める
+    stop_write_coordinators()
+
+@app.on_event("shutdown")
+def close_tenant_databases():
+    tenant_router.close_all()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to BizBuddy API"}
@@ -59,14 +150,45 @@ def create_task(task: TaskCreate, db: Session = Depends(get_db)):
     db.refresh(db_task)
     return db_task
 
-@app.get("/tasks/", response_model=List[Task])
-def read_tasks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    tasks = db.query(TaskModel).offset(skip).limit(limit).all()
-    return tasks
+@app.get("/tasks/", response_model=List[TaskSummary])
+def read_tasks(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status: Optional[List[str]] = Query(None),
+    deadline_from: Optional[datetime] = None,
+    deadline_to: Optional[datetime] = None,
+    sort: Optional[str] = None,
+    view: TaskListView = "summary",
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """タスク一覧（既定は作業ログの集計値を含む TaskSummary。view=full で詳細と同じ Task を返す）"""
+    summary = view == "summary"
+    selected = parse_fields(fields, TASK_SUMMARY_FIELDS if summary else TASK_FIELDS)
+    # 集計値は同じ SELECT のサブクエリで、categories / work_logs は selectin で一括ロードし、件数によらずクエリ数を固定する
+    query = db.query(TaskModel).options(*task_projection_options(selected, summary))
+    query = filter_tasks(query, status, deadline_from, deadline_to)
+
+    if sort:
+        # 任意のソート順ではカーソルが使えないため skip/limit でページングする
+        if cursor:
+            raise HTTPException(status_code=400, detail="cursor cannot be combined with sort")
+        tasks = query.order_by(*parse_task_sort(sort)).offset(skip).limit(limit).all()
+    else:
+        if skip and not cursor:
+            query = query.offset(skip)
+        tasks = keyset_page(query, TaskModel.created_at, TaskModel.id, cursor, limit, response)
+
+    if summary and not use_fast_path(selected):
+        return tasks
+    # Task の表現は response_model と異なるため常に serializers で組み立てる
+    return fast_response(tasks, task_summary_to_dict if summary else task_to_dict, selected, response)
 
 @app.get("/tasks/{task_id}", response_model=Task)
 def read_task(task_id: int, db: Session = Depends(get_db)):
-    task = db.query(TaskModel).filter(TaskModel.id == task_id).first()
+    task = db.query(TaskModel).options(*task_load_options()).filter(TaskModel.id == task_id).first()
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
@@ -96,20 +218,52 @@ def delete_task(task_id: int, db: Session = Depends(get_db)):
     db.commit()
     return {"message": "Task deleted successfully"}
 
+@app.post("/tasks/bulk", response_model=TaskBulkResult)
+def bulk_update_tasks(request: TaskBulkRequest, db: Session = Depends(get_db)):
+    """複数タスクの削除・完了をまとめて1トランザクションで適用する（1件でも見つからなければ何もしない）
+
+    サブタスク以下・作業ログ・メモとの関連付けは読み込まず、DB のカスケード削除で消す。
+    """
+    task_ids = sorted(set(request.task_ids))
+    tasks = db.query(TaskModel).filter(TaskModel.id.in_(task_ids)).all()
+    missing = sorted(set(task_ids) - {task.id for task in tasks})
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Tasks not found: {missing}")
+    for task in tasks:
+        if request.action == "delete":
+            db.delete(task)
+        elif task.status != "完了":
+            task.status = "完了"
+    db.commit()
+    return TaskBulkResult(action=request.action, task_ids=task_ids)
+
 @app.post("/memos/", response_model=Memo)
 def create_memo(memo: MemoCreate, db: Session = Depends(get_db)):
-    db_memo = MemoModel(
-        content=memo.content,
-        created_at=datetime.utcnow()
-    )
-    db.add(db_memo)
-    db.commit()
-    db.refresh(db_memo)
-    return db_memo
+    def write(db):
+        db_memo = MemoModel(
+            content=memo.content,
+            created_at=datetime.utcnow()
+        )
+        db.add(db_memo)
+        return db_memo
+    return commit_write(db, write, response_model=Memo)
 
 @app.get("/memos/", response_model=List[Memo])
-def read_memos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    memos = db.query(MemoModel).order_by(MemoModel.created_at.desc()).offset(skip).limit(limit).all()
+def read_memos(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    selected = parse_fields(fields, MEMO_FIELDS)
+    query = db.query(MemoModel).options(*memo_projection_options(selected))
+    if skip and not cursor:
+        query = query.offset(skip)
+    memos = keyset_page(query, MemoModel.created_at, MemoModel.id, cursor, limit, response, descending=True)
+    if use_fast_path(selected):
+        return fast_response(memos, memo_to_dict, selected, response)
     return memos
 
 @app.get("/memos/{memo_id}", response_model=Memo)
@@ -121,75 +275,98 @@ def read_memo(memo_id: int, db: Session = Depends(get_db)):
 
 @app.put("/memos/{memo_id}", response_model=Memo)
 def update_memo(memo_id: int, memo: MemoCreate, db: Session = Depends(get_db)):
-    print(f"Updating memo {memo_id} with data: {memo.dict()}")  # デバッグ用
-    db_memo = db.query(MemoModel).filter(MemoModel.id == memo_id).first()
-    if not db_memo:
-        raise HTTPException(status_code=404, detail="Memo not found")
-    
-    # コンテンツが変更された場合のみ時刻を更新
-    if db_memo.content != memo.content:
-        db_memo.content = memo.content
-        db_memo.created_at = datetime.utcnow()
-    
-    # タスクの関連付けを更新（時刻は更新しない）
-    if memo.task_ids:
-        # 既存のタスクをクリア
-        db_memo.tasks = []
-        db.flush()
-        
-        # 新しいタスクを関連付け
-        tasks = db.query(TaskModel).filter(TaskModel.id.in_(memo.task_ids)).all()
-        print(f"Found tasks: {[t.id for t in tasks]}")  # デバッグ用
-        for task in tasks:
-            db_memo.tasks.append(task)
-    else:
-        db_memo.tasks = []
-    
+    logger.debug(f"Updating memo {memo_id} with data: {memo.dict()}")
+
+    def write(db):
+        db_memo = db.query(MemoModel).options(*memo_load_options()).filter(MemoModel.id == memo_id).first()
+        if not db_memo:
+            raise HTTPException(status_code=404, detail="Memo not found")
+
+        # コンテンツが変更された場合のみ時刻を更新
+        if db_memo.content != memo.content:
+            db_memo.content = memo.content
+            db_memo.created_at = datetime.utcnow()
+
+        # タスクの関連付けを差分で更新（時刻は更新しない）
+        added_task_ids = apply_memo_task_diff(db_memo, memo.task_ids)
+        if added_task_ids:
+            db_memo.tasks.extend(
+                db.query(TaskModel).options(*task_load_options()).filter(TaskModel.id.in_(added_task_ids)).all()
+            )
+
+    def load(db, _):
+        return db.query(MemoModel).options(*memo_load_options()).filter(MemoModel.id == memo_id).first()
+
     try:
-        db.commit()
-        db.refresh(db_memo)
-        print(f"Updated memo tasks: {[t.id for t in db_memo.tasks]}")  # デバッグ用
-        return db_memo
+        return commit_write(db, write, load, response_model=Memo)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error updating memo: {str(e)}")  # デバッグ用
+        logger.error(f"Error updating memo {memo_id}: {e}")
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/memos/{memo_id}")
 def delete_memo(memo_id: int, db: Session = Depends(get_db)):
-    db_memo = db.query(MemoModel).filter(MemoModel.id == memo_id).first()
-    if not db_memo:
-        raise HTTPException(status_code=404, detail="Memo not found")
-    
-    db.delete(db_memo)
-    db.commit()
-    return {"message": "Memo deleted successfully"}
+    def write(db):
+        db_memo = db.query(MemoModel).filter(MemoModel.id == memo_id).first()
+        if not db_memo:
+            raise HTTPException(status_code=404, detail="Memo not found")
+        db.delete(db_memo)
+        return {"message": "Memo deleted successfully"}
+    return commit_write(db, write)
 
 @app.get("/tasks/{task_id}/memos/", response_model=List[Memo])
-def read_task_memos(task_id: int, db: Session = Depends(get_db)):
+def read_task_memos(
+    task_id: int,
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
     task = db.query(TaskModel).filter(TaskModel.id == task_id).first()
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task.memos
+    query = db.query(MemoModel).options(*memo_load_options()).filter(with_parent(task, TaskModel.memos))
+    return keyset_page(query, MemoModel.created_at, MemoModel.id, cursor, limit, response, descending=True)
+
+@app.get("/task-memos", response_model=List[TaskMemos])
+def read_memos_for_tasks(
+    task_ids: List[int] = Query([], max_length=MAX_TASK_MEMO_IDS),
+    counts_only: bool = False,
+    db: Session = Depends(get_db)
+):
+    """複数タスクのメモ（またはメモ件数だけ）をまとめて返す。タスク一覧の件数表示用"""
+    counts, memos_by_task = task_memo_statements(task_ids, counts_only)
+    memo_counts = dict(db.execute(counts).all())
+    memos = {} if counts_only else group_task_memos(db.execute(memos_by_task).all())
+    return build_task_memos(task_ids, memo_counts, memos)
 
 @app.get("/tasks/{task_id}/work-logs/", response_model=List[WorkLog])
-def get_work_logs(task_id: int, db: Session = Depends(get_db)):
+def get_work_logs(
+    task_id: int,
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
     task = db.query(TaskModel).filter(TaskModel.id == task_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task.work_logs
+    query = db.query(WorkLogModel).filter(WorkLogModel.task_id == task_id)
+    return keyset_page(query, WorkLogModel.started_at, WorkLogModel.id, cursor, limit, response, descending=True)
 
 @app.post("/tasks/{task_id}/work-logs/", response_model=WorkLog)
 def create_work_log(task_id: int, work_log: WorkLogCreate, db: Session = Depends(get_db)):
-    task = db.query(TaskModel).filter(TaskModel.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    db_work_log = WorkLogModel(**work_log.dict(), task_id=task_id)
-    db.add(db_work_log)
-    db.commit()
-    db.refresh(db_work_log)
-    return db_work_log
+    def write(db):
+        task = db.query(TaskModel).filter(TaskModel.id == task_id).first()
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        db_work_log = WorkLogModel(**work_log.dict(), task_id=task_id)
+        db.add(db_work_log)
+        return db_work_log
+    return commit_write(db, write, response_model=WorkLog)
 
 @app.put("/tasks/{task_id}/work-logs/{work_log_id}", response_model=WorkLog)
 def update_work_log(
@@ -198,34 +375,34 @@ def update_work_log(
     work_log_update: WorkLogCreate,
     db: Session = Depends(get_db)
 ):
-    db_work_log = db.query(WorkLogModel).filter(
-        WorkLogModel.id == work_log_id,
-        WorkLogModel.task_id == task_id
-    ).first()
-    
-    if not db_work_log:
-        raise HTTPException(status_code=404, detail="Work log not found")
-    
-    for key, value in work_log_update.dict().items():
-        setattr(db_work_log, key, value)
-    
-    db.commit()
-    db.refresh(db_work_log)
-    return db_work_log
+    def write(db):
+        db_work_log = db.query(WorkLogModel).filter(
+            WorkLogModel.id == work_log_id,
+            WorkLogModel.task_id == task_id
+        ).first()
+
+        if not db_work_log:
+            raise HTTPException(status_code=404, detail="Work log not found")
+
+        for key, value in work_log_update.dict().items():
+            setattr(db_work_log, key, value)
+        return db_work_log
+    return commit_write(db, write, response_model=WorkLog)
 
 @app.delete("/tasks/{task_id}/work-logs/{work_log_id}")
 def delete_work_log(task_id: int, work_log_id: int, db: Session = Depends(get_db)):
-    db_work_log = db.query(WorkLogModel).filter(
-        WorkLogModel.id == work_log_id,
-        WorkLogModel.task_id == task_id
-    ).first()
-    
-    if not db_work_log:
-        raise HTTPException(status_code=404, detail="Work log not found")
-    
-    db.delete(db_work_log)
-    db.commit()
-    return {"message": "Work log deleted successfully"}
+    def write(db):
+        db_work_log = db.query(WorkLogModel).filter(
+            WorkLogModel.id == work_log_id,
+            WorkLogModel.task_id == task_id
+        ).first()
+
+        if not db_work_log:
+            raise HTTPException(status_code=404, detail="Work log not found")
+
+        db.delete(db_work_log)
+        return {"message": "Work log deleted successfully"}
+    return commit_write(db, write)
 
 # アクションプラン関連のエンドポイント
 @app.get("/tasks/{task_id}/sub-tasks", response_model=List[SubTask])
@@ -233,7 +410,49 @@ def get_sub_tasks(task_id: int, db: Session = Depends(get_db)):
     task = db.query(TaskModel).filter(TaskModel.id == task_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task.sub_tasks
+    return (
+        db.query(SubTaskModel)
+        .options(*sub_task_tree_options())
+        .filter(SubTaskModel.task_id == task_id)
+        .order_by(SubTaskModel.id)
+        .all()
+    )
+
+@app.get("/tasks/{task_id}/action-plan", response_model=ActionPlanTree)
+def get_action_plan_tree(task_id: int, db: Session = Depends(get_db)):
+    """タスク配下のアクションプラン全体を進捗率付きで返す（階層ごとに1クエリ）"""
+    task = (
+        db.query(TaskModel)
+        .options(*action_plan_tree_options())
+        .filter(TaskModel.id == task_id)
+        .first()
+    )
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return build_action_plan_tree(task)
+
+@app.get("/tasks/{task_id}/progress", response_model=ActionPlanProgress)
+def get_action_plan_progress(task_id: int, db: Session = Depends(get_db)):
+    """保存済みカウンタからアクションプランの進捗率だけを返す（アクションアイテムは読まない）"""
+    task_stmt, sub_task_stmt, leaf_task_stmt = action_plan_progress_statements(task_id)
+    task_row = db.execute(task_stmt).first()
+    if task_row is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return build_action_plan_progress(
+        task_row, db.execute(sub_task_stmt).all(), db.execute(leaf_task_stmt).all()
+    )
+
+@app.get("/sub-tasks/{sub_task_id}/details", response_model=SubTaskTree)
+def get_sub_task_details(sub_task_id: int, db: Session = Depends(get_db)):
+    db_sub_task = (
+        db.query(SubTaskModel)
+        .options(*sub_task_tree_options())
+        .filter(SubTaskModel.id == sub_task_id)
+        .first()
+    )
+    if not db_sub_task:
+        raise HTTPException(status_code=404, detail="Sub task not found")
+    return build_sub_task_tree(db_sub_task)
 
 @app.post("/tasks/{task_id}/sub-tasks", response_model=SubTask)
 def create_sub_task(task_id: int, sub_task: SubTaskCreate, db: Session = Depends(get_db)):
@@ -305,37 +524,150 @@ def delete_leaf_task(leaf_task_id: int, db: Session = Depends(get_db)):
 
 @app.post("/leaf-tasks/{leaf_task_id}/action-items", response_model=ActionItem)
 def create_action_item(leaf_task_id: int, action_item: ActionItemCreate, db: Session = Depends(get_db)):
-    db_leaf_task = db.query(LeafTaskModel).filter(LeafTaskModel.id == leaf_task_id).first()
-    if not db_leaf_task:
-        raise HTTPException(status_code=404, detail="Leaf task not found")
+    def write(db):
+        db_leaf_task = db.query(LeafTaskModel).filter(LeafTaskModel.id == leaf_task_id).first()
+        if not db_leaf_task:
+            raise HTTPException(status_code=404, detail="Leaf task not found")
 
-    db_action_item = ActionItemModel(**action_item.dict(), leaf_task_id=leaf_task_id)
-    db.add(db_action_item)
-    db.commit()
-    db.refresh(db_action_item)
-    return db_action_item
+        db_action_item = ActionItemModel(**action_item.dict(), leaf_task_id=leaf_task_id)
+        db.add(db_action_item)
+        return db_action_item
+    return commit_write(db, write, response_model=ActionItem)
 
 @app.put("/action-items/{action_item_id}", response_model=ActionItem)
 def update_action_item(action_item_id: int, action_item: ActionItemCreate, db: Session = Depends(get_db)):
-    db_action_item = db.query(ActionItemModel).filter(ActionItemModel.id == action_item_id).first()
-    if not db_action_item:
-        raise HTTPException(status_code=404, detail="Action item not found")
+    def write(db):
+        db_action_item = db.query(ActionItemModel).filter(ActionItemModel.id == action_item_id).first()
+        if not db_action_item:
+            raise HTTPException(status_code=404, detail="Action item not found")
 
-    for key, value in action_item.dict().items():
-        setattr(db_action_item, key, value)
-    db.commit()
-    db.refresh(db_action_item)
-    return db_action_item
+        for key, value in action_item.dict().items():
+            setattr(db_action_item, key, value)
+        return db_action_item
+    return commit_write(db, write, response_model=ActionItem)
 
 @app.delete("/action-items/{action_item_id}")
 def delete_action_item(action_item_id: int, db: Session = Depends(get_db)):
-    db_action_item = db.query(ActionItemModel).filter(ActionItemModel.id == action_item_id).first()
-    if not db_action_item:
-        raise HTTPException(status_code=404, detail="Action item not found")
+    def write(db):
+        db_action_item = db.query(ActionItemModel).filter(ActionItemModel.id == action_item_id).first()
+        if not db_action_item:
+            raise HTTPException(status_code=404, detail="Action item not found")
+
+        db.delete(db_action_item)
+        return {"message": "Action item deleted"}
+    return commit_write(db, write)
+
+# バッチ操作の対象: エンティティ名 -> (モデル, 入力スキーマ, 親モデル, 親キー, 表示名)
+BATCH_ENTITIES = {
+    "sub_task": (SubTaskModel, SubTaskCreate, TaskModel, "task_id", "Sub task"),
+    "leaf_task": (LeafTaskModel, LeafTaskCreate, SubTaskModel, "sub_task_id", "Leaf task"),
+    "action_item": (ActionItemModel, ActionItemCreate, LeafTaskModel, "leaf_task_id", "Action item"),
+}
+
+# モデル -> (親モデル, 親キー)
+BATCH_PARENTS = {model: (parent_model, parent_key) for model, _, parent_model, parent_key, _ in BATCH_ENTITIES.values()}
+
+def row_to_dict(row):
+    return {column.key: getattr(row, column.key) for column in row.__table__.columns}
+
+def batch_ancestors(db, loaded, model, row_id):
+    """(model, row_id) 自身とその親・祖先のキー（親が読み込まれていなければ読み込む）"""
+    keys = []
+    while model in BATCH_PARENTS and row_id is not None:
+        keys.append((model, row_id))
+        row = loaded.get((model, row_id)) or db.get(model, row_id)
+        if row is None:
+            break
+        model, parent_key = BATCH_PARENTS[model]
+        row_id = getattr(row, parent_key)
+    return keys
+
+@app.post("/action-plan/batch", response_model=List[BatchResult])
+def batch_action_plan(batch: BatchRequest, db: Session = Depends(get_db)):
+    """サブタスク・リーフタスク・アクションアイテムの作成/更新/削除をまとめて1トランザクションで適用する"""
+    # 対象行と親行をモデルごとに IN 句でまとめて読み込み、1件ずつの SELECT を避ける
+    wanted = {}
+    for operation in batch.operations:
+        model, _, parent_model, _, _ = BATCH_ENTITIES[operation.entity]
+        if operation.op == "create":
+            wanted.setdefault(parent_model, set()).add(operation.parent_id)
+        else:
+            wanted.setdefault(model, set()).add(operation.id)
+    loaded = {
+        (model, row.id): row
+        for model, ids in wanted.items()
+        for row in db.query(model).filter(model.id.in_(ids - {None})).all()
+    }
 
-    db.delete(db_action_item)
+    # 同じバッチで削除する行の配下への作成・更新は、削除のカスケードで消える行を返すことになるため受け付けない
+    deleted = {
+        (BATCH_ENTITIES[operation.entity][0], operation.id)
+        for operation in batch.operations if operation.op == "delete"
+    }
+    if deleted:
+        for index, operation in enumerate(batch.operations):
+            model, _, parent_model, _, _ = BATCH_ENTITIES[operation.entity]
+            if operation.op == "create":
+                keys = batch_ancestors(db, loaded, parent_model, operation.parent_id)
+            elif operation.op == "update":
+                keys = batch_ancestors(db, loaded, model, operation.id)
+            else:
+                continue
+            if deleted.intersection(keys):
+                db.rollback()
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"operations[{index}]: target or its parent is deleted in the same batch",
+                )
+
+    applied = []
+    for index, operation in enumerate(batch.operations):
+        model, schema, parent_model, parent_key, label = BATCH_ENTITIES[operation.entity]
+
+        try:
+            if operation.op == "create":
+                if (parent_model, operation.parent_id) not in loaded:
+                    raise HTTPException(status_code=404, detail=f"operations[{index}]: parent not found")
+                values = schema.model_validate(operation.data).model_dump()
+                row = model(**values, **{parent_key: operation.parent_id})
+                db.add(row)
+            else:
+                row = loaded.get((model, operation.id))
+                if row is None:
+                    raise HTTPException(status_code=404, detail=f"operations[{index}]: {label} not found")
+                if operation.op == "update":
+                    current = {key: getattr(row, key) for key in schema.model_fields}
+                    values = schema.model_validate({**current, **operation.data}).model_dump()
+                    for key, value in values.items():
+                        setattr(row, key, value)
+                else:
+                    db.delete(row)
+        except ValidationError as e:
+            db.rollback()
+            raise HTTPException(status_code=422, detail=f"operations[{index}]: {e.errors()}")
+        except HTTPException:
+            db.rollback()
+            raise
+        applied.append((operation, row))
+
+    # 採番とデフォルト値の確定は flush 1回で行い、コミットも1回だけにする
+    try:
+        db.flush()
+    except IntegrityError as e:
+        # バッチ全体を取り消す
+        db.rollback()
+        raise HTTPException(status_code=409, detail=f"Batch violates a constraint: {e.orig}")
+    results = [
+        BatchResult(
+            op=operation.op,
+            entity=operation.entity,
+            id=row.id,
+            data=None if operation.op == "delete" else row_to_dict(row),
+        )
+        for operation, row in applied
+    ]
     db.commit()
-    return {"message": "Action item deleted"}
+    return results
 
 @app.get("/action-items/{action_item_id}", response_model=ActionItem)
 def get_action_item(action_item_id: int, db: Session = Depends(get_db)):
@@ -344,16 +676,4 @@ def get_action_item(action_item_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Action item not found")
     
     # 関連するタスク、サブタスク、リーフタスクの情報を取得
-    result = {
-        "id": action_item.id,
-        "content": action_item.content,
-        "is_completed": action_item.is_completed,
-        "leaf_task_id": action_item.leaf_task_id,
-        "created_at": action_item.created_at,
-        "updated_at": action_item.updated_at,
-        "task_title": action_item.leaf_task.sub_task.task.title if action_item.leaf_task else "",
-        "subtask_title": action_item.leaf_task.sub_task.title if action_item.leaf_task else "",
-        "leaf_task_title": action_item.leaf_task.title if action_item.leaf_task else ""
-    }
-    
-    return result 
\ No newline at end of file
+    return action_item_detail(action_item) 
\ No newline at end of file
@@ -0,0 +1,275 @@
+"""リクエスト単位の計測（クエリ数・DB 時間・シリアライズ時間・ハンドラ時間）
+
+SQLAlchemy のカーソル実行イベントと FastAPI のレスポンスシリアライズを計測し、
+リクエストごとに Server-Timing ヘッダーとして返す。あわせてルート単位のヒストグラムに集計し、
+/metrics で Prometheus のテキスト形式として公開する。
+閾値（BIZBUDDY_SLOW_QUERY_MS）を超えたクエリは bizbuddy.sql ロガーに出力する。
+エラーになったクエリも件数・DB 時間に含め、ルートごとの失敗数を数える。
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+import fastapi.routing
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+
+logger = logging.getLogger("bizbuddy.sql")
+
+# 0 以下でスロークエリログを無効化
+SLOW_QUERY_MS = float(os.getenv("BIZBUDDY_SLOW_QUERY_MS", "200"))
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class RequestStats:
+    __slots__ = ("scope", "queries", "db_seconds", "serialization_seconds", "route")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.route: Optional[str] = None
+
+    def current_route(self) -> str:
+        """スロークエリのラベル用（ハンドラ実行中はルーティング済みなのでテンプレートが取れる）"""
+        return self.route or getattr(self.scope.get("route"), "path", None) or "unmatched"
+
+
+# 同期ルートはスレッドプールで動くが、コンテキストはコピーされるので同じオブジェクトを参照できる
+_current: ContextVar[Optional[RequestStats]] = ContextVar("bizbuddy_request_stats", default=None)
+
+
+# 文の開始時刻は実行コンテキストに持たせる（接続に積むと、失敗した文の分が残り続ける）
+QUERY_STARTED_AT = "_bizbuddy_query_started_at"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        setattr(context, QUERY_STARTED_AT, time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_query(context, statement)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    """失敗した文は after_cursor_execute が呼ばれないため、ここで件数と時間を計上する"""
+    _record_query(exception_context.execution_context, exception_context.statement, failed=True)
+
+
+def _record_query(context, statement: Optional[str], failed: bool = False) -> None:
+    started = getattr(context, QUERY_STARTED_AT, None)
+    if started is None:
+        # カーソルで実行する前の失敗（接続・文の組み立て）は計上しない
+        return
+    setattr(context, QUERY_STARTED_AT, None)
+    elapsed = time.perf_counter() - started
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+    route = stats.current_route() if stats is not None else "-"
+    if failed:
+        registry.failed_queries.inc(route)
+    if SLOW_QUERY_MS > 0 and elapsed * 1000 >= SLOW_QUERY_MS:
+        registry.slow_queries.inc(route)
+        logger.warning(
+            "Slow query (%.1f ms%s) on %s: %s",
+            elapsed * 1000, ", failed" if failed else "", route, " ".join((statement or "").split()),
+        )
+
+
+_serialize_response = fastapi.routing.serialize_response
+
+
+@contextmanager
+def measure_serialization():
+    """ブロック内の所要時間をシリアライズ時間として計上する"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _current.get()
+        if stats is not None:
+            stats.serialization_seconds += time.perf_counter() - started
+
+
+async def _timed_serialize_response(*args, **kwargs):
+    with measure_serialization():
+        return await _serialize_response(*args, **kwargs)
+
+
+# FastAPI はルートの戻り値の検証・変換をこの関数で行うため、差し替えて所要時間を測る
+fastapi.routing.serialize_response = _timed_serialize_response
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...], labels: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.labels = labels
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, label_values: Tuple[str, ...], value: float) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in sorted(self._series.items()):
+            labels = ",".join(f'{key}="{_escape(value)}"' for key, value in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {_format_number(total)}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label: str):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self._values: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value: str) -> None:
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_value, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{{{self.label}="{_escape(label_value)}"}} {value}')
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value))
+
+
+class Registry:
+    def __init__(self):
+        labels = ("method", "route")
+        self.duration = Histogram(
+            "bizbuddy_request_duration_seconds", "Total request time", DURATION_BUCKETS, labels + ("status",)
+        )
+        self.handler = Histogram(
+            "bizbuddy_request_handler_seconds", "Request time excluding DB and serialization", DURATION_BUCKETS, labels
+        )
+        self.db = Histogram("bizbuddy_request_db_seconds", "Time spent in SQL per request", DURATION_BUCKETS, labels)
+        self.serialization = Histogram(
+            "bizbuddy_request_serialization_seconds", "Response model serialization time", DURATION_BUCKETS, labels
+        )
+        self.queries = Histogram("bizbuddy_request_queries", "SQL statements per request", QUERY_COUNT_BUCKETS, labels)
+        self.slow_queries = Counter("bizbuddy_slow_queries_total", "Queries slower than BIZBUDDY_SLOW_QUERY_MS", "route")
+        self.failed_queries = Counter("bizbuddy_failed_queries_total", "Queries that raised a database error", "route")
+        self._lock = threading.Lock()
+
+    def record(self, method: str, route: str, status: int, total: float, stats: RequestStats) -> None:
+        labels = (method, route)
+        with self._lock:
+            self.duration.observe(labels + (str(status),), total)
+            self.handler.observe(labels, _handler_seconds(total, stats))
+            self.db.observe(labels, stats.db_seconds)
+            self.serialization.observe(labels, stats.serialization_seconds)
+            self.queries.observe(labels, stats.queries)
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for histogram in (self.duration, self.handler, self.db, self.serialization, self.queries):
+                lines += histogram.render()
+        lines += self.slow_queries.render()
+        lines += self.failed_queries.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def _handler_seconds(total: float, stats: RequestStats) -> float:
+    return max(total - stats.db_seconds - stats.serialization_seconds, 0.0)
+
+
+def server_timing(total: float, stats: RequestStats) -> str:
+    return ", ".join((
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries"',
+        f"ser;dur={stats.serialization_seconds * 1000:.2f}",
+        f"app;dur={_handler_seconds(total, stats) * 1000:.2f}",
+        f"total;dur={total * 1000:.2f}",
+    ))
+
+
+def _route_template(scope, router) -> str:
+    route = scope.get("route")
+    if route is None and router is not None:
+        # ルーティング前に応答したリクエスト（条件付き GET の 304 など）は自前で照合する
+        for candidate in router.routes:
+            if candidate.matches(scope)[0] == Match.FULL:
+                route = candidate
+                break
+    # ルートに一致しなかったリクエストはパスごとに系列が増えないようまとめる
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """計測を行う ASGI ミドルウェア（ストリーミングレスポンスも最後まで計測する）"""
+
+    def __init__(self, app, router=None):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                stats.route = _route_template(scope, self.router)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(time.perf_counter() - started, stats).encode()))
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            registry.record(
+                scope["method"], stats.route or _route_template(scope, self.router),
+                status, time.perf_counter() - started, stats,
+            )
@@ -0,0 +1,252 @@
+"""スキーマの移行（Alembic）
+
+起動時にテーブルを作るのではなく、デプロイの手順として1回だけ実行する（`python -m app.cli migrate`）。
+複数ワーカーの起動でスキーマ変更が競合しないよう、アプリ本体は移行を行わず、
+/readyz（app/routers/health.py）で DB が最新のリビジョンにあり、スキーマがモデルと一致することだけを確認する。
+
+Alembic の導入前に create_all・migrations/*.sql で作った DB（alembic_version がなく tasks がある）は、
+どこまで SQL を適用したか分からないため、ベースラインのリビジョンのスキーマと比べて足りない分を補ってから
+（テーブル・列の追加、外部キー・主キーが違うテーブルの作り直し）ベースラインを適用済みとして登録し、
+以降のリビジョンを適用する。補えない差分が残る場合は登録せずにエラーにする。
+補った DB は、追加した列・集計テーブルの値（status_rank・進捗カウンタ・作業時間のロールアップ・緊急度）を
+既存のデータから計算し直す。
+移行の後に、モデルに含めない全文検索インデックス・コレクションバージョン・変更履歴の初期行を用意する。
+"""
+import logging
+import os
+from typing import List, Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import MetaData, Table, case, create_engine, insert, inspect, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .cache import install_collection_versions
+from .models import Base, Task
+from .models.progress import rebuild_progress_counters
+from .models.task import STATUS_RANK, get_status_rank
+from .models.work_time import rebuild_work_time_rollups
+from .search import install_search_index
+from .sync import install_change_log
+from .urgency import refresh_urgency_scores
+
+logger = logging.getLogger("bizbuddy")
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+# Alembic 導入時点（migrations/20241100 まで）のスキーマ
+BASELINE_REVISION = "0001"
+
+# 統合された旧テーブル -> 行を引き継ぐテーブル（migrations/20240700_consolidate_memo_task.sql）
+MERGED_LEGACY_TABLES = {"memo_task_association": "memo_task"}
+
+# 以前の版がスキーマを確かめずにベースラインを登録した DB がありうるリビジョン（その版の最新は 0002）
+UNVERIFIED_STAMP_REVISIONS = ("0001", "0002")
+
+
+class SchemaMismatchError(RuntimeError):
+    """DB のスキーマがモデル（移行先のリビジョン）と一致しない"""
+
+
+def alembic_config() -> Config:
+    config = Config(ALEMBIC_INI)
+    # アプリ・管理コマンドのロガー設定を上書きしない
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def _foreign_keys(table: Table) -> set:
+    return {
+        (tuple(constraint.column_keys), constraint.referred_table.name,
+         tuple(element.column.name for element in constraint.elements), (constraint.ondelete or "").upper())
+        for constraint in table.foreign_key_constraints
+    }
+
+
+def _reflected_foreign_keys(inspector, table_name: str) -> set:
+    return {
+        (tuple(fk["constrained_columns"]), fk["referred_table"], tuple(fk["referred_columns"]),
+         (fk.get("options", {}).get("ondelete") or "").upper())
+        for fk in inspector.get_foreign_keys(table_name)
+    }
+
+
+def _differences(connection: Connection, metadata: MetaData) -> List[str]:
+    """metadata のテーブルと比べて DB に足りないもの（テーブル・列）と、外部キー・主キーの違い"""
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+    differences = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing:
+            differences.append(f"{table.name}: missing table")
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        differences.extend(
+            f"{table.name}.{column.name}: missing column" for column in table.columns if column.name not in columns
+        )
+        primary_key = set(inspector.get_pk_constraint(table.name)["constrained_columns"])
+        if primary_key != {column.name for column in table.primary_key.columns}:
+            differences.append(f"{table.name}: primary key differs")
+        if _reflected_foreign_keys(inspector, table.name) != _foreign_keys(table):
+            differences.append(f"{table.name}: foreign keys differ")
+    return differences
+
+
+def schema_differences(connection: Connection) -> List[str]:
+    """DB のスキーマとモデルの違い（空ならモデルどおり。/readyz・移行後の確認に使う）"""
+    return _differences(connection, Base.metadata)
+
+
+def baseline_metadata() -> MetaData:
+    """ベースラインのリビジョンを空のメモリ上の DB に適用して読み取ったスキーマ"""
+    config = alembic_config()
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    try:
+        with engine.connect() as connection:
+            config.attributes["connection"] = connection
+            command.upgrade(config, BASELINE_REVISION)
+            metadata.reflect(connection, only=lambda name, _: name != "alembic_version")
+    finally:
+        engine.dispose()
+    return metadata
+
+
+def _rebuild_table(connection: Connection, table: Table, columns: set) -> None:
+    """テーブルを table の定義で作り直し、共通の列の行を移す（SQLite は外部キー・主キーを ALTER できないため）
+
+    主キー・NOT NULL に反する行（重複した関連付けなど）は移さない。
+    """
+    temporary = table.to_metadata(table.metadata, name=f"_{table.name}_new")
+    for index in list(temporary.indexes):
+        temporary.indexes.discard(index)
+    temporary.create(connection)
+    shared = [column.name for column in table.columns if column.name in columns]
+    connection.execute(
+        insert(temporary).prefix_with("OR IGNORE").from_select(
+            shared, select(*(table.c[name] for name in shared))
+        )
+    )
+    connection.execute(text(f"DROP TABLE {table.name}"))
+    connection.execute(text(f"ALTER TABLE {temporary.name} RENAME TO {table.name}"))
+    table.metadata.remove(temporary)
+
+
+def _delete_orphans(connection: Connection) -> None:
+    """外部キーが無効だった頃に親が削除されて残った行を取り除く（子の子も消えるまで繰り返す）"""
+    while True:
+        orphans = connection.execute(text("PRAGMA foreign_key_check")).all()
+        if not orphans:
+            return
+        for table, rowid, _, _ in orphans:
+            connection.execute(text(f"DELETE FROM {table} WHERE rowid = :rowid"), {"rowid": rowid})
+
+
+def upgrade_legacy_schema(connection: Connection) -> None:
+    """Alembic の導入前の DB を、ベースラインのリビジョンのスキーマに合わせる（SQLite のみ）"""
+    target = baseline_metadata()
+    if connection.dialect.name == "sqlite":
+        # 作り直すテーブルの子の行がカスケード削除されないよう、外部キーを止める（トランザクションの外で実行する）
+        connection.commit()
+        connection.execute(text("PRAGMA foreign_keys=OFF"))
+        connection.commit()
+        try:
+            inspector = inspect(connection)
+            existing = set(inspector.get_table_names())
+            for table in target.sorted_tables:
+                if table.name not in existing:
+                    table.create(connection)
+                    continue
+                columns = {column["name"] for column in inspector.get_columns(table.name)}
+                missing = [column for column in table.columns if column.name not in columns]
+                for column in missing:
+                    if not column.nullable and column.server_default is None:
+                        raise SchemaMismatchError(f"{table.name}.{column.name}: missing NOT NULL column without a default")
+                rebuild = (
+                    missing
+                    or set(inspector.get_pk_constraint(table.name)["constrained_columns"])
+                    != {column.name for column in table.primary_key.columns}
+                    or _reflected_foreign_keys(inspector, table.name) != _foreign_keys(table)
+                )
+                if rebuild:
+                    _rebuild_table(connection, table, columns)
+                for index in table.indexes:
+                    index.create(connection, checkfirst=True)
+            for legacy, table in MERGED_LEGACY_TABLES.items():
+                if legacy in existing and table in target.tables:
+                    columns = list(target.tables[table].primary_key.columns.keys())
+                    column_list = ", ".join(columns)
+                    connection.execute(text(
+                        f"INSERT OR IGNORE INTO {table} ({column_list}) SELECT {column_list} FROM {legacy}"
+                    ))
+                    connection.execute(text(f"DROP TABLE {legacy}"))
+            _delete_orphans(connection)
+            differences = _differences(connection, target)
+            if differences:
+                raise SchemaMismatchError("Cannot upgrade the legacy schema: " + "; ".join(differences))
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.execute(text("PRAGMA foreign_keys=ON"))
+            connection.commit()
+    else:
+        differences = _differences(connection, target)
+        if differences:
+            raise SchemaMismatchError("Cannot upgrade the legacy schema: " + "; ".join(differences))
+
+
+def backfill_legacy_data(engine: Engine) -> None:
+    """補った列・集計テーブルの値を既存のデータから計算する"""
+    db = Session(bind=engine)
+    try:
+        db.execute(
+            update(Task).where(Task.status_rank.is_(None)).values(
+                status_rank=case(STATUS_RANK, value=Task.status, else_=get_status_rank(None)),
+                last_updated=Task.last_updated,
+            )
+        )
+        rebuild_progress_counters(db)
+        rebuild_work_time_rollups(db)
+    finally:
+        db.close()
+    refresh_urgency_scores(engine)
+
+
+def upgrade_database(engine: Engine, revision: str = "head") -> None:
+    config = alembic_config()
+    legacy = False
+    with engine.connect() as connection:
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        if "alembic_version" not in tables and "tasks" in tables:
+            legacy = True
+        elif current_revision(connection) in UNVERIFIED_STAMP_REVISIONS and _differences(connection, baseline_metadata()):
+            logger.warning("Database schema does not match its revision; upgrading it from the legacy schema")
+            legacy = True
+        if legacy:
+            upgrade_legacy_schema(connection)
+            if current_revision(connection) is None:
+                command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
+        if revision == "head":
+            differences = schema_differences(connection)
+            if differences:
+                raise SchemaMismatchError("Database schema does not match the models: " + "; ".join(differences))
+    install_search_index(engine)
+    install_collection_versions(engine)
+    install_change_log(engine)
+    if legacy:
+        backfill_legacy_data(engine)
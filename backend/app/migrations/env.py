@@ -0,0 +1,80 @@
+"""Alembic の実行環境
+
+対象はすべてのモデル（app.models）のメタデータ。接続は app.database のエンジン
+（BIZBUDDY_DATABASE_URL）を使い、呼び出し側が config.attributes["connection"] に
+接続を渡した場合はそれを使う（app/migrate.py）。
+全文検索の FTS テーブルはモデルに含めず app/search.py が管理するため、自動生成の比較から外す。
+SQLite はテーブルの作り直しで ALTER を行うため batch モードで生成・実行する。
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import text
+
+from app.database import engine
+from app.models import Base
+from app.search import SEARCH_TABLE
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # search_index と FTS5 の内部テーブル（search_index_data など）
+    if type_ == "table" and name.startswith(SEARCH_TABLE):
+        return False
+    return True
+
+
+def _configure(**options) -> None:
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=include_object,
+        render_as_batch=True,
+        compare_type=True,
+        **options,
+    )
+
+
+def run_migrations_offline() -> None:
+    """接続せずに SQL を出力する（alembic upgrade head --sql）"""
+    _configure(url=config.get_main_option("sqlalchemy.url") or engine.url.render_as_string(hide_password=False), literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run(connection) -> None:
+    sqlite = connection.dialect.name == "sqlite"
+    if sqlite:
+        # batch モードのテーブル作り直しで子の行がカスケード削除されないよう、移行中は外部キーを止める
+        # （トランザクション内では変更できないため、開始前に実行する）
+        connection.execute(text("PRAGMA foreign_keys=OFF"))
+        connection.commit()
+    try:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        connection.commit()
+    finally:
+        if sqlite:
+            connection.execute(text("PRAGMA foreign_keys=ON"))
+            connection.commit()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+    with engine.connect() as connection:
+        _run(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,51 @@
+"""autoincrement archived ids
+
+アーカイブ（app/archive.py）は行を元の ID のまま移して戻すため、現役のテーブルで ID が使い回されると
+アーカイブしたタスクを復元できなくなり（409）、同じ ID のタスクを再びアーカイブすると主キーが重複する。
+タスク・アクションプラン・作業ログのテーブルを AUTOINCREMENT で作り直し（SQLite は ALTER できない）、
+採番の開始位置をアーカイブ済みの ID より後ろにする。SQLite 以外は ID を使い回さないため何もしない。
+作り直したテーブルの全文検索用トリガーは移行の後に app/search.py が作り直す。
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 09:12:40.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# アーカイブへ移る行を持つテーブル（archive_ + 同じ名前のアーカイブテーブルがある）
+TABLES = ("tasks", "sub_tasks", "leaf_tasks", "action_items", "work_logs")
+
+
+def _recreate(autoincrement: bool) -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table, recreate="always", table_kwargs={"sqlite_autoincrement": autoincrement}):
+            pass
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _recreate(True)
+    for table in TABLES:
+        op.execute(f"DELETE FROM sqlite_sequence WHERE name = '{table}'")
+        op.execute(
+            f"INSERT INTO sqlite_sequence (name, seq) SELECT '{table}', "
+            f"max(coalesce((SELECT max(id) FROM {table}), 0), coalesce((SELECT max(id) FROM archive_{table}), 0))"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _recreate(False)
@@ -0,0 +1,40 @@
+"""change log task id
+
+/events を各ワーカーが change_log から配信するため、イベントの task_id（作業ログ・サブタスクの親タスク）を
+履歴に持たせる。削除された行からは親をたどれないため、書き込み時に記録する（既存の行は NULL のまま）。
+期限の通知も id の順に読み進めるため、deadline_reminders を AUTOINCREMENT で作り直して id を再利用しない。
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 11:03:27.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('task_id', sa.Integer(), nullable=True))
+
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table('deadline_reminders', recreate="always", table_kwargs={"sqlite_autoincrement": True}):
+            pass
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table('deadline_reminders', recreate="always", table_kwargs={"sqlite_autoincrement": False}):
+            pass
+
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.drop_column('task_id')
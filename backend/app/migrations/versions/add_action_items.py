@@ -1,38 +0,0 @@
-"""add action items
-
-Revision ID: add_action_items
-Create Date: 2024-01-10 10:00:00.000000
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = 'add_action_items'
-down_revision: Union[str, None] = None
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.create_table('action_items',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('content', sa.String(), nullable=True),
-        sa.Column('is_completed', sa.Boolean(), nullable=True, default=False),
-        sa.Column('leaf_task_id', sa.Integer(), nullable=True),
-        sa.ForeignKeyConstraint(['leaf_task_id'], ['leaf_tasks.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_action_items_id'), 'action_items', ['id'], unique=False)
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_index(op.f('ix_action_items_id'), table_name='action_items')
-    op.drop_table('action_items')
-    # ### end Alembic commands ### 
\ No newline at end of file
@@ -1,5 +1,12 @@
 from .task import Base, Task, Category, WorkLog
 from .memo import Memo
 from .action_plan import SubTask, LeafTask, ActionItem
+from . import cascade
+from .progress import rebuild_progress_counters
+from .collection_version import CollectionVersion
+from .work_time import WorkTimeRollup, rebuild_work_time_rollups
+from .change_log import ChangeLogEntry
+from .reminder import DeadlineReminder
+from . import archive
 
-__all__ = ['Base', 'Task', 'Category', 'WorkLog', 'Memo', 'SubTask', 'LeafTask', 'ActionItem'] 
\ No newline at end of file
+__all__ = ['Base', 'Task', 'Category', 'WorkLog', 'Memo', 'SubTask', 'LeafTask', 'ActionItem', 'rebuild_progress_counters', 'CollectionVersion', 'WorkTimeRollup', 'rebuild_work_time_rollups', 'ChangeLogEntry', 'DeadlineReminder'] 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 from datetime import datetime
@@ -12,9 +12,19 @@ class SubTask(Base):
     description = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # 配下のアクションアイテムの件数（models/progress.py で増分更新）
+    completed_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     task = relationship("Task", back_populates="sub_tasks")
-    leaf_tasks = relationship("LeafTask", back_populates="sub_task", cascade="all, delete-orphan")
+    leaf_tasks = relationship("LeafTask", back_populates="sub_task", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # 親からのツリー読み込み・カスケード削除用
+        Index("ix_sub_tasks_task_id", "task_id"),
+        # アーカイブした行の ID を使い回さない（models/task.py の Task と同じ）
+        {"sqlite_autoincrement": True},
+    )
 
 class LeafTask(Base):
     __tablename__ = "leaf_tasks"
@@ -25,9 +35,19 @@ class LeafTask(Base):
     description = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # 配下のアクションアイテムの件数（models/progress.py で増分更新）
+    completed_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     sub_task = relationship("SubTask", back_populates="leaf_tasks")
-    action_items = relationship("ActionItem", back_populates="leaf_task", cascade="all, delete-orphan")
+    action_items = relationship("ActionItem", back_populates="leaf_task", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # 親からのツリー読み込み・カスケード削除用
+        Index("ix_leaf_tasks_sub_task_id", "sub_task_id"),
+        # アーカイブした行の ID を使い回さない（models/task.py の Task と同じ）
+        {"sqlite_autoincrement": True},
+    )
 
 class ActionItem(Base):
     __tablename__ = "action_items"
@@ -39,4 +59,11 @@ class ActionItem(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    leaf_task = relationship("LeafTask", back_populates="action_items") 
\ No newline at end of file
+    leaf_task = relationship("LeafTask", back_populates="action_items")
+
+    __table_args__ = (
+        # 親からのツリー読み込み・カスケード削除用
+        Index("ix_action_items_leaf_task_id", "leaf_task_id"),
+        # アーカイブした行の ID を使い回さない（models/task.py の Task と同じ）
+        {"sqlite_autoincrement": True},
+    )
@@ -0,0 +1,58 @@
+"""アーカイブ済みタスクの保存先テーブル（archive_ + 元のテーブル名）
+
+完了から一定期間が過ぎたタスクは、配下のアクションプラン・作業ログ・メモやカテゴリとの関連付け・
+作業時間のロールアップごと、同じ列構成のアーカイブテーブルへ移される（移動は app/archive.py）。
+通常の一覧・集計・インデックスは現役のテーブルだけを対象にするため、履歴が増えても遅くならない。
+ID は元の値のまま保存し、復元時にそのまま戻す（現役のテーブルは AUTOINCREMENT のため、アーカイブした ID が
+新しい行に使われることはない）。アーカイブ側には外部キーを張らない。
+"""
+from sqlalchemy import Column, DateTime, Index, Table
+
+from ..database import Base
+from .task import Task, WorkLog, task_category
+from .memo import memo_task
+from .action_plan import SubTask, LeafTask, ActionItem
+from .work_time import WorkTimeRollup
+
+ARCHIVE_PREFIX = "archive_"
+
+# 親が先に来る順序（移動・復元はこの順に INSERT する）
+ARCHIVED_SOURCES = (
+    Task.__table__,
+    SubTask.__table__,
+    LeafTask.__table__,
+    ActionItem.__table__,
+    WorkLog.__table__,
+    memo_task,
+    task_category,
+    WorkTimeRollup.__table__,
+)
+
+# アーカイブ側で親から子をたどるための列
+ARCHIVE_INDEXES = {
+    "sub_tasks": ("task_id",),
+    "leaf_tasks": ("sub_task_id",),
+    "action_items": ("leaf_task_id",),
+    "work_logs": ("task_id",),
+    "memo_task": ("task_id",),
+    "task_category": ("task_id",),
+}
+
+
+def _archive_table(source: Table) -> Table:
+    name = ARCHIVE_PREFIX + source.name
+    columns = [
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable, autoincrement=False)
+        for column in source.columns
+    ]
+    if source is Task.__table__:
+        columns.append(Column("archived_at", DateTime, nullable=False))
+    indexes = [Index(f"ix_{name}_{column}", column) for column in ARCHIVE_INDEXES.get(source.name, ())]
+    if source is Task.__table__:
+        # GET /archive/tasks（アーカイブした新しい順）のキーセットページネーション用
+        indexes.append(Index(f"ix_{name}_archived_at_id", "archived_at", "id"))
+    return Table(name, Base.metadata, *columns, *indexes)
+
+
+# 元のテーブル名 -> アーカイブテーブル
+ARCHIVE_TABLES = {source.name: _archive_table(source) for source in ARCHIVED_SOURCES}
@@ -0,0 +1,103 @@
+"""外部キーの ON DELETE CASCADE に任せた削除の補足
+
+タスク・サブタスク・リーフタスクの子のリレーションには passive_deletes を指定しているため、
+親を削除しても子は読み込まれず、DB のカスケード削除でまとめて消える（1行ずつの DELETE にならない）。
+flush のイベントで維持している派生データ（変更イベント・変更履歴・コレクションバージョン・進捗カウンタ）が
+子の削除を見落とさないよう、flush の前に次のものを ID と件数だけを引くクエリで集めておく。
+
+- CASCADE_DELETES_KEY: カスケードで消える子孫の (モデル, id, 親の id)
+- REMOVED_COUNTERS_KEY: 削除されるサブタスク・リーフタスクの削除前の進捗カウンタ
+"""
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from .action_plan import SubTask, LeafTask, ActionItem
+from .task import Task, WorkLog
+
+CASCADE_DELETES_KEY = "cascade_deletes"
+REMOVED_COUNTERS_KEY = "removed_progress_counters"
+
+# 親モデル -> [(子モデル, 親を指す外部キー)]
+CASCADE_CHILDREN = {
+    Task: [(SubTask, SubTask.task_id), (WorkLog, WorkLog.task_id)],
+    SubTask: [(LeafTask, LeafTask.sub_task_id)],
+    LeafTask: [(ActionItem, ActionItem.leaf_task_id)],
+}
+
+# 進捗カウンタを持つコンテナ -> 親を指す外部キー
+COUNTER_PARENTS = {
+    SubTask: SubTask.task_id,
+    LeafTask: LeafTask.sub_task_id,
+}
+
+# IN 句に並べる ID の数（SQLite のパラメータ数上限より十分小さく）
+ID_CHUNK_SIZE = 500
+
+
+def _chunks(ids: List[int]):
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        yield ids[start:start + ID_CHUNK_SIZE]
+
+
+def _cascaded_children(connection, deleted: Dict[type, set]) -> List[Tuple[type, int, int]]:
+    """削除される親から子孫を階層ごとにたどる（flush で明示的に削除される行は除く）"""
+    found = []
+    visited = {model: set(ids) for model, ids in deleted.items()}
+    parents = {model: sorted(ids) for model, ids in deleted.items()}
+    while parents:
+        children = {}
+        for parent_model, parent_ids in parents.items():
+            for child_model, foreign_key in CASCADE_CHILDREN.get(parent_model, ()):
+                seen = visited.setdefault(child_model, set())
+                for chunk in _chunks(parent_ids):
+                    rows = connection.execute(
+                        select(child_model.id, foreign_key).where(foreign_key.in_(chunk))
+                    ).all()
+                    for row_id, parent_id in rows:
+                        if row_id in seen:
+                            continue
+                        seen.add(row_id)
+                        children.setdefault(child_model, []).append(row_id)
+                        found.append((child_model, row_id, parent_id))
+        parents = children
+    return found
+
+
+def _removed_counters(connection, deleted: Dict[type, set]) -> Dict[type, Dict[int, Tuple[int, int, int]]]:
+    counters = {}
+    for model, foreign_key in COUNTER_PARENTS.items():
+        ids = sorted(deleted.get(model, ()))
+        counters[model] = {}
+        for chunk in _chunks(ids):
+            rows = connection.execute(
+                select(model.id, foreign_key, model.completed_count, model.total_count).where(model.id.in_(chunk))
+            )
+            for row_id, parent_id, completed, total in rows:
+                counters[model][row_id] = (parent_id, completed or 0, total or 0)
+    return counters
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_cascade_deletes(session, flush_context, instances):
+    deleted: Dict[type, set] = {}
+    for obj in session.deleted:
+        if type(obj) in CASCADE_CHILDREN and obj.id is not None:
+            deleted.setdefault(type(obj), set()).add(obj.id)
+    if not deleted:
+        session.info.pop(CASCADE_DELETES_KEY, None)
+        session.info.pop(REMOVED_COUNTERS_KEY, None)
+        return
+    connection = session.connection()
+    session.info[CASCADE_DELETES_KEY] = _cascaded_children(connection, deleted)
+    session.info[REMOVED_COUNTERS_KEY] = _removed_counters(connection, deleted)
+
+
+def cascaded_deletes(session) -> List[Tuple[type, int, int]]:
+    """この flush でカスケード削除される子孫の (モデル, id, 親の id)。after_flush から参照する"""
+    return session.info.get(CASCADE_DELETES_KEY, [])
+
+
+def removed_counters(session) -> Dict[type, Dict[int, Tuple[int, int, int]]]:
+    return session.info.get(REMOVED_COUNTERS_KEY, {})
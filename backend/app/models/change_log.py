@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from datetime import datetime
+from ..database import Base
+
+# インポートなど、それ以前の履歴から差分を組み立てられない変更を表す op
+RESET_OP = "reset"
+
+
+class ChangeLogEntry(Base):
+    """書き込みの変更履歴（差分同期 /sync 用）
+
+    作成・更新・削除のたびに同じトランザクション内で1行追加される。seq は単調増加で再利用されない。
+    op が "reset" の行は、それ以前の履歴から差分を組み立てられないこと（インポートなど）を表す。
+    /events（app/events.py）も各ワーカーがこのテーブルを seq 順に読んで配信する。
+    """
+    __tablename__ = "change_log"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String, nullable=False)  # task, work_log, memo, sub_task, leaf_task, action_item
+    row_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # create, update, delete, reset
+    task_id = Column(Integer)  # 所属するタスク（/events の task_id。タスク自身・作業ログ・サブタスクのみ）
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
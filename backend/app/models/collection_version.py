@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String
+from ..database import Base
+
+class CollectionVersion(Base):
+    """コレクション（tasks / memos / action_plan）ごとの更新バージョン
+
+    書き込みのたびに同じトランザクション内でインクリメントされ、GET の ETag に使われる。
+    """
+    __tablename__ = "collection_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import pytz
@@ -10,12 +10,14 @@ jst = pytz.timezone('Asia/Tokyo')
 def get_jst_now():
     return datetime.now(jst)
 
-# メモとタスクの多対多関係のための中間テーブル
+# メモとタスクの多対多関係のための中間テーブル（Memo.tasks / Task.memos の両方で使う）
 memo_task = Table(
     'memo_task',
     Base.metadata,
-    Column('memo_id', Integer, ForeignKey('memos.id')),
-    Column('task_id', Integer, ForeignKey('tasks.id'))
+    Column('memo_id', Integer, ForeignKey('memos.id', ondelete="CASCADE"), primary_key=True),
+    Column('task_id', Integer, ForeignKey('tasks.id', ondelete="CASCADE"), primary_key=True),
+    # タスク側からの参照（タスクのメモ一覧・件数）用。メモ側は主キーの先頭列で引ける
+    Index('ix_memo_task_task_id', 'task_id'),
 )
 
 class Memo(Base):
@@ -26,4 +28,9 @@ class Memo(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # リレーションシップ
-    tasks = relationship("Task", secondary=memo_task, back_populates="memos")
\ No newline at end of file
+    tasks = relationship("Task", secondary=memo_task, back_populates="memos")
+
+    __table_args__ = (
+        # キーセットページネーション用
+        Index("ix_memos_created_at_id", "created_at", "id"),
+    )
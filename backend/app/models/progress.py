@@ -0,0 +1,187 @@
+"""アクションプランの進捗カウンタ（completed_count / total_count）の維持
+
+アクションアイテムの作成・完了切り替え・削除を flush 時に検出し、リーフタスク・サブタスク・タスクの
+カウンタを差分で更新する。リーフタスク・サブタスクが削除された場合（配下は DB のカスケード削除で消え、
+読み込まれない）は、削除前のコンテナのカウンタの分を親から引く（models/cascade.py）。
+差分は「count = count + delta」の UPDATE で適用するため、同時更新でも値がずれない。
+"""
+from collections import defaultdict
+
+from sqlalchemy import Integer, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from .action_plan import SubTask, LeafTask, ActionItem
+from .cascade import cascaded_deletes, removed_counters
+from .task import Task
+
+# flush 中にカウンタを更新した (モデル, id) の集合（変更履歴 app/sync.py が更新として記録する）
+COUNTER_UPDATES_KEY = "progress_counter_updates"
+
+
+def _item_deltas(session):
+    """flush 対象のアクションアイテムからリーフタスクごとの (completed, total) の差分を求める"""
+    deltas = defaultdict(lambda: [0, 0])
+
+    def add(leaf_task_id, completed, total):
+        if leaf_task_id is not None:
+            deltas[leaf_task_id][0] += completed
+            deltas[leaf_task_id][1] += total
+
+    for item in session.new:
+        if isinstance(item, ActionItem):
+            add(item.leaf_task_id, int(bool(item.is_completed)), 1)
+
+    for item in session.deleted:
+        if isinstance(item, ActionItem):
+            # 削除前の状態で数える（同じ flush 内で切り替えられていても元の値を使う）
+            completed = inspect(item).attrs.is_completed.history
+            was_completed = completed.deleted[0] if completed.deleted else item.is_completed
+            leaf = inspect(item).attrs.leaf_task_id.history
+            old_leaf_task_id = leaf.deleted[0] if leaf.deleted else item.leaf_task_id
+            add(old_leaf_task_id, -int(bool(was_completed)), -1)
+
+    for item in session.dirty:
+        if not isinstance(item, ActionItem) or item in session.deleted:
+            continue
+        state = inspect(item)
+        completed = state.attrs.is_completed.history
+        leaf = state.attrs.leaf_task_id.history
+        if not completed.has_changes() and not leaf.has_changes():
+            continue
+        was_completed = completed.deleted[0] if completed.deleted else item.is_completed
+        old_leaf_task_id = leaf.deleted[0] if leaf.deleted else item.leaf_task_id
+        add(old_leaf_task_id, -int(bool(was_completed)), -1)
+        add(item.leaf_task_id, int(bool(item.is_completed)), 1)
+
+    return {leaf_id: delta for leaf_id, delta in deltas.items() if delta != [0, 0]}
+
+
+def _parent_ids(session, model, ids, parent_key):
+    """id -> 親 ID の対応を求める
+
+    flush 後は削除済みの行を DB から引けないため、セッション内のオブジェクトを先に参照し、
+    残りだけを1クエリで取得する。
+    """
+    parents = {}
+    for obj in list(session.deleted) + list(session.identity_map.values()):
+        if isinstance(obj, model) and obj.id in ids:
+            parents[obj.id] = getattr(obj, parent_key.key)
+    missing = set(ids) - set(parents)
+    if missing:
+        rows = session.connection().execute(select(model.id, parent_key).where(model.id.in_(missing)))
+        parents.update(dict(rows.all()))
+    return parents
+
+
+def _apply(session, model, deltas, preserve_column):
+    connection = session.connection()
+    for row_id, (completed, total) in deltas.items():
+        if completed == total == 0:
+            continue
+        connection.execute(
+            update(model)
+            .where(model.id == row_id)
+            .values(
+                completed_count=model.completed_count + completed,
+                total_count=model.total_count + total,
+                # カウンタ更新では最終更新日時を動かさない
+                **{preserve_column.key: preserve_column},
+            )
+        )
+        session.info.setdefault(COUNTER_UPDATES_KEY, set()).add((model, row_id))
+        # セッション内に読み込み済みのオブジェクトにも差分を反映する
+        obj = session.identity_map.get(identity_key(model, row_id))
+        if obj is not None:
+            loaded = obj.__dict__
+            if "completed_count" in loaded:
+                set_committed_value(obj, "completed_count", (loaded["completed_count"] or 0) + completed)
+            if "total_count" in loaded:
+                set_committed_value(obj, "total_count", (loaded["total_count"] or 0) + total)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_progress_counters(session, flush_context):
+    # 削除されたリーフタスク・サブタスク（カスケード削除を含む）の配下は、コンテナのカウンタでまとめて引く
+    removed = removed_counters(session)
+    removed_ids = defaultdict(set)
+    for model, counters in removed.items():
+        removed_ids[model].update(counters)
+    for model, row_id, _ in cascaded_deletes(session):
+        removed_ids[model].add(row_id)
+    removed_ids[Task].update(obj.id for obj in session.deleted if isinstance(obj, Task))
+
+    leaf_deltas = {
+        leaf_id: delta for leaf_id, delta in _item_deltas(session).items()
+        if leaf_id not in removed_ids[LeafTask]
+    }
+    if not leaf_deltas and not removed.get(LeafTask) and not removed.get(SubTask):
+        return
+
+    sub_deltas = defaultdict(lambda: [0, 0])
+    task_deltas = defaultdict(lambda: [0, 0])
+    leaf_to_sub = _parent_ids(session, LeafTask, set(leaf_deltas), LeafTask.sub_task_id)
+    for leaf_id, (completed, total) in leaf_deltas.items():
+        sub_task_id = leaf_to_sub.get(leaf_id)
+        if sub_task_id is not None:
+            sub_deltas[sub_task_id][0] += completed
+            sub_deltas[sub_task_id][1] += total
+    for sub_task_id, completed, total in removed.get(LeafTask, {}).values():
+        if sub_task_id is not None:
+            sub_deltas[sub_task_id][0] -= completed
+            sub_deltas[sub_task_id][1] -= total
+    sub_deltas = {
+        sub_id: delta for sub_id, delta in sub_deltas.items() if sub_id not in removed_ids[SubTask]
+    }
+
+    sub_to_task = _parent_ids(session, SubTask, set(sub_deltas), SubTask.task_id)
+    for sub_task_id, (completed, total) in sub_deltas.items():
+        task_id = sub_to_task.get(sub_task_id)
+        if task_id is not None:
+            task_deltas[task_id][0] += completed
+            task_deltas[task_id][1] += total
+    for task_id, completed, total in removed.get(SubTask, {}).values():
+        if task_id is not None:
+            task_deltas[task_id][0] -= completed
+            task_deltas[task_id][1] -= total
+    task_deltas = {
+        task_id: delta for task_id, delta in task_deltas.items() if task_id not in removed_ids[Task]
+    }
+
+    _apply(session, LeafTask, leaf_deltas, LeafTask.updated_at)
+    _apply(session, SubTask, sub_deltas, SubTask.updated_at)
+    _apply(session, Task, task_deltas, Task.last_updated)
+
+
+def rebuild_progress_counters(db: Session, commit: bool = True) -> None:
+    """すべてのカウンタをアクションアイテムから再計算する（不整合の修復・既存 DB の移行用）"""
+    completed = func.coalesce(func.sum(ActionItem.is_completed.cast(Integer)), 0)
+    db.execute(
+        update(LeafTask).values(
+            total_count=select(func.count(ActionItem.id))
+            .where(ActionItem.leaf_task_id == LeafTask.id)
+            .scalar_subquery(),
+            completed_count=select(completed)
+            .where(ActionItem.leaf_task_id == LeafTask.id)
+            .scalar_subquery(),
+            updated_at=LeafTask.updated_at,
+        )
+    )
+    for parent, child, key, preserve in (
+        (SubTask, LeafTask, LeafTask.sub_task_id, SubTask.updated_at),
+        (Task, SubTask, SubTask.task_id, Task.last_updated),
+    ):
+        db.execute(
+            update(parent).values(
+                total_count=select(func.coalesce(func.sum(child.total_count), 0))
+                .where(key == parent.id)
+                .scalar_subquery(),
+                completed_count=select(func.coalesce(func.sum(child.completed_count), 0))
+                .where(key == parent.id)
+                .scalar_subquery(),
+                **{preserve.key: preserve},
+            )
+        )
+    if commit:
+        db.commit()
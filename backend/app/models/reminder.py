@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from ..database import Base
+
+class DeadlineReminder(Base):
+    """期限が近づいた・過ぎたタスクの通知（app/urgency.py のバックグラウンド処理が登録する）
+
+    同じタスク・同じ期限・同じ種類の通知は一度だけ作られる。期限を変更すると新しい期限で再び通知される。
+    GET /reminders と /events は id の順に読み進めるため、id は再利用しない（AUTOINCREMENT）。
+    """
+    __tablename__ = "deadline_reminders"
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String, nullable=False)  # approaching, overdue
+    deadline = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("task_id", "kind", "deadline", name="uq_deadline_reminders_task_kind_deadline"),
+        {"sqlite_autoincrement": True},
+    )
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Table, Index
+from sqlalchemy.orm import relationship, validates, query_expression, column_property
 from datetime import datetime
 import pytz
 from ..database import Base
@@ -11,20 +11,36 @@ jst = pytz.timezone('Asia/Tokyo')
 def get_jst_now():
     return datetime.now(jst)
 
+def to_jst(value):
+    """タイムゾーンなしの JST 日時に揃える（タイムゾーンなしの値は JST とみなす）
+
+    SQLite はタイムゾーンを保存せず、タイムゾーン付きの値はその時刻のまま保存されるため、
+    日時の列には書き込み時にこの形へ揃えた値だけを入れる（フロントエンドは UTC の ISO 文字列を送る）。
+    """
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(jst).replace(tzinfo=None)
+    return value
+
+# ステータスの表示順（フロントエンドの statusOrder と同じ並び）
+STATUS_RANK = {
+    "進行中": 0,
+    "未着手": 1,
+    "casual": 2,
+    "backlog": 3,
+    "完了": 4,
+}
+
+def get_status_rank(status):
+    return STATUS_RANK.get(status, len(STATUS_RANK))
+
 # タスクとカテゴリの多対多関係のための中間テーブル
 task_category = Table(
     'task_category',
     Base.metadata,
-    Column('task_id', Integer, ForeignKey('tasks.id')),
-    Column('category_id', Integer, ForeignKey('categories.id'))
-)
-
-# 中間テーブル: メモとタスクの多対多関連
-memo_task_association = Table(
-    'memo_task_association',
-    Base.metadata,
-    Column('memo_id', Integer, ForeignKey('memos.id')),
-    Column('task_id', Integer, ForeignKey('tasks.id'))
+    Column('task_id', Integer, ForeignKey('tasks.id', ondelete="CASCADE")),
+    Column('category_id', Integer, ForeignKey('categories.id', ondelete="CASCADE")),
+    Index('ix_task_category_task_id', 'task_id'),
+    Index('ix_task_category_category_id', 'category_id'),
 )
 
 class Task(Base):
@@ -42,12 +58,47 @@ class Task(Base):
     created_at = Column(DateTime, default=get_jst_now)
     last_updated = Column(DateTime, default=get_jst_now, onupdate=get_jst_now)
     status = Column(String, default="未着手")  # 未着手, 進行中, 完了
+    status_rank = Column(Integer, default=STATUS_RANK["未着手"])  # status から自動設定
+    # 配下のアクションアイテムの件数（models/progress.py で増分更新）
+    completed_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # 期限と経過時間を加味した緊急度（app/urgency.py のバックグラウンド処理で定期的に再計算。完了タスクは NULL）
+    urgency_score = Column(Float, nullable=True)
+    urgency_updated_at = Column(DateTime, nullable=True)
 
     # リレーションシップ
-    categories = relationship("Category", secondary=task_category, back_populates="tasks")
-    work_logs = relationship("WorkLog", back_populates="task", cascade="all, delete-orphan")
-    memos = relationship("Memo", secondary=memo_task_association, back_populates="tasks")
-    sub_tasks = relationship("SubTask", back_populates="task", cascade="all, delete-orphan")
+    # 削除時に子や関連付けを読み込まず、外部キーの ON DELETE CASCADE に任せる（models/cascade.py）
+    categories = relationship("Category", secondary=task_category, back_populates="tasks", passive_deletes=True)
+    work_logs = relationship("WorkLog", back_populates="task", cascade="all, delete-orphan", passive_deletes=True)
+    memos = relationship("Memo", secondary=memo_task, back_populates="tasks", passive_deletes=True)
+    sub_tasks = relationship("SubTask", back_populates="task", cascade="all, delete-orphan", passive_deletes=True)
+
+    # 作業ログの集計値（一覧用。queries.task_summary_options を指定したクエリでだけ読み込まれる）
+    work_log_count = query_expression()
+    logged_minutes = query_expression()
+    last_activity_at = query_expression()
+
+    __table_args__ = (
+        # キーセットページネーション用
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        # ステータス絞り込み・ソート用
+        Index("ix_tasks_status_priority_score", "status", "priority_score"),
+        Index("ix_tasks_status_rank_priority_score", "status_rank", "priority_score"),
+        Index("ix_tasks_deadline", "deadline"),
+        # 「次にやるべきタスク」の取得用
+        Index("ix_tasks_urgency_score", "urgency_score"),
+        # アーカイブへ移した行の ID を新しい行に使い回さない（app/archive.py は ID のまま移して戻す）
+        {"sqlite_autoincrement": True},
+    )
+
+    @validates("status")
+    def _sync_status_rank(self, key, value):
+        self.status_rank = get_status_rank(value)
+        return value
+
+    @validates("deadline")
+    def _normalize_deadline(self, key, value):
+        return to_jst(value)
 
 class Category(Base):
     __tablename__ = "categories"
@@ -61,9 +112,20 @@ class WorkLog(Base):
     __tablename__ = "work_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"))
+    # 更新前の値を作業時間のロールアップ（models/work_time.py）の差分計算に使うため、変更時に旧値を読み込む
+    task_id = column_property(Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE")), active_history=True)
     description = Column(String)
-    started_at = Column(DateTime, default=get_jst_now)
-    ended_at = Column(DateTime, nullable=True)
-    
-    task = relationship("Task", back_populates="work_logs")
\ No newline at end of file
+    started_at = column_property(Column(DateTime, default=get_jst_now), active_history=True)
+    ended_at = column_property(Column(DateTime, nullable=True), active_history=True)
+
+    task = relationship("Task", back_populates="work_logs")
+
+    __table_args__ = (
+        Index("ix_work_logs_task_id_started_at_id", "task_id", "started_at", "id"),
+        # アーカイブした行の ID を使い回さない（Task と同じ）
+        {"sqlite_autoincrement": True},
+    )
+
+    @validates("started_at", "ended_at")
+    def _normalize_datetime(self, key, value):
+        return to_jst(value)
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""作業時間の日次ロールアップ（タスク × JST の日付ごとの合計）
+
+作業ログの作成・更新・削除（タスク削除に伴うカスケード削除を含む）を flush 時に検出し、
+該当するタスク・日付の行に差分を加算する。日付をまたぐ作業ログは日ごとに按分する。
+集計 API はこのテーブルだけを読むため、期間が長くても work_logs を走査しない。
+差分は flush ごとに1回の INSERT ... ON CONFLICT DO UPDATE（executemany）でまとめて加算する。
+1件の作業ログが触れる日数は入力の検証（schemas/work_log.py の MAX_WORK_LOG_DURATION）で抑えている。
+
+作業ログの日時は書き込み時にタイムゾーンなしの JST に揃えて保存する（models/task.py の to_jst）。
+作成時の加算と更新・削除時の減算はどちらもその保存される値から計算するため、両者が食い違わない。
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, delete, event, inspect, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..database import Base
+from .collection_version import CollectionVersion
+from .task import Task, WorkLog, to_jst
+
+logger = logging.getLogger("bizbuddy")
+
+
+class WorkTimeRollup(Base):
+    __tablename__ = "work_time_rollups"
+
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)  # JST の日付
+    week = Column(Date, nullable=False)  # その週の月曜日
+    seconds = Column(Integer, nullable=False, default=0)
+    log_count = Column(Integer, nullable=False, default=0)  # その日に開始した作業ログの件数
+
+    __table_args__ = (
+        Index("ix_work_time_rollups_day", "day"),
+    )
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def split_by_day(started_at: datetime, ended_at: Optional[datetime]) -> Dict[date, int]:
+    """作業ログを JST の日付ごとの秒数に按分する（終了していないログは開始日に 0 秒）"""
+    start = to_jst(started_at)
+    seconds: Dict[date, int] = {start.date(): 0}
+    if ended_at is None:
+        return seconds
+    end = to_jst(ended_at)
+    while start < end:
+        next_midnight = datetime.combine(start.date() + timedelta(days=1), time.min)
+        boundary = min(end, next_midnight)
+        seconds[start.date()] = seconds.get(start.date(), 0) + int((boundary - start).total_seconds())
+        start = boundary
+    return seconds
+
+
+def _contribution(task_id, started_at, ended_at, sign: int) -> Iterable[Tuple[Tuple[int, date], int, int]]:
+    if task_id is None or started_at is None:
+        return []
+    start_day = to_jst(started_at).date()
+    return [
+        ((task_id, day), sign * seconds, sign if day == start_day else 0)
+        for day, seconds in split_by_day(started_at, ended_at).items()
+    ]
+
+
+def _old_value(state, key):
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    return state.attrs[key].value
+
+
+def _rollup_deltas(session) -> Dict[Tuple[int, date], list]:
+    deltas = defaultdict(lambda: [0, 0])
+    contributions = []
+
+    for log in session.new:
+        if isinstance(log, WorkLog):
+            contributions += _contribution(log.task_id, log.started_at, log.ended_at, 1)
+
+    for log in session.deleted:
+        if isinstance(log, WorkLog):
+            state = inspect(log)
+            contributions += _contribution(
+                _old_value(state, "task_id"), _old_value(state, "started_at"), _old_value(state, "ended_at"), -1
+            )
+
+    for log in session.dirty:
+        if not isinstance(log, WorkLog) or log in session.deleted:
+            continue
+        state = inspect(log)
+        if not any(state.attrs[key].history.has_changes() for key in ("task_id", "started_at", "ended_at")):
+            continue
+        contributions += _contribution(
+            _old_value(state, "task_id"), _old_value(state, "started_at"), _old_value(state, "ended_at"), -1
+        )
+        contributions += _contribution(log.task_id, log.started_at, log.ended_at, 1)
+
+    for key, seconds, count in contributions:
+        deltas[key][0] += seconds
+        deltas[key][1] += count
+    return {key: delta for key, delta in deltas.items() if delta != [0, 0]}
+
+
+# ON CONFLICT での加算に対応する方言（それ以外は行ごとに UPDATE・INSERT する）
+UPSERT_DIALECTS = {"sqlite": sqlite, "postgresql": postgresql}
+
+
+def _add_rows(connection, rows) -> None:
+    """(task_id, day) の行に秒数・件数を加算する（行がなければ作る）"""
+    table = WorkTimeRollup.__table__
+    dialect = UPSERT_DIALECTS.get(connection.dialect.name)
+    if dialect is not None:
+        statement = dialect.insert(table)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.task_id, table.c.day],
+            set_={
+                "seconds": table.c.seconds + statement.excluded.seconds,
+                "log_count": table.c.log_count + statement.excluded.log_count,
+            },
+        ), rows)
+        return
+    for row in rows:
+        result = connection.execute(
+            update(table)
+            .where(table.c.task_id == row["task_id"], table.c.day == row["day"])
+            .values(seconds=table.c.seconds + row["seconds"], log_count=table.c.log_count + row["log_count"])
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(**row))
+
+
+def _apply(connection, deltas, deleted_task_ids=frozenset()) -> None:
+    table = WorkTimeRollup.__table__
+    shrinking = [key for key, (seconds, count) in deltas.items() if seconds < 0 or count < 0]
+    if shrinking:
+        existing = set(connection.execute(
+            select(table.c.task_id, table.c.day).where(tuple_(table.c.task_id, table.c.day).in_(shrinking))
+        ).all())
+        for task_id, day in set(shrinking) - existing:
+            if task_id not in deleted_task_ids:
+                # 減算する行がないのはロールアップが work_logs とずれているとき（rebuild-work-time で修復する）
+                logger.warning(
+                    f"Work time rollup for task {task_id} on {day} is missing; "
+                    "run `python -m app.cli rebuild-work-time`"
+                )
+        # 削除したタスクの行は外部キーのカスケードで既に消えている
+        deltas = {key: delta for key, delta in deltas.items() if key in existing or key not in shrinking}
+        shrinking = [key for key in shrinking if key in existing]
+    if deltas:
+        _add_rows(connection, [
+            {"task_id": task_id, "day": day, "week": week_start(day), "seconds": seconds, "log_count": count}
+            for (task_id, day), (seconds, count) in deltas.items()
+        ])
+    if shrinking:
+        # 作業ログがなくなった日の行は残さない
+        connection.execute(
+            delete(table)
+            .where(tuple_(table.c.task_id, table.c.day).in_(shrinking))
+            .where(table.c.seconds <= 0, table.c.log_count <= 0)
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _update_work_time_rollups(session, flush_context):
+    deltas = _rollup_deltas(session)
+    if deltas:
+        deleted_task_ids = {obj.id for obj in session.deleted if isinstance(obj, Task)}
+        _apply(session.connection(), deltas, deleted_task_ids)
+
+
+def rebuild_work_time_rollups(db: Session, commit: bool = True) -> None:
+    """ロールアップを work_logs から作り直す（不整合の修復・既存 DB の移行用）"""
+    deltas = defaultdict(lambda: [0, 0])
+    rows = db.execute(select(WorkLog.task_id, WorkLog.started_at, WorkLog.ended_at))
+    for task_id, started_at, ended_at in rows:
+        for key, seconds, count in _contribution(task_id, started_at, ended_at, 1):
+            deltas[key][0] += seconds
+            deltas[key][1] += count
+    db.execute(delete(WorkTimeRollup))
+    if deltas:
+        db.execute(WorkTimeRollup.__table__.insert(), [
+            {"task_id": task_id, "day": day, "week": week_start(day), "seconds": seconds, "log_count": count}
+            for (task_id, day), (seconds, count) in deltas.items()
+        ])
+    # タスク一覧の集計（logged_minutes）が変わるため、キャッシュした一覧を使わせない（app/cache.py）
+    db.execute(
+        update(CollectionVersion).where(CollectionVersion.name == "tasks").values(version=CollectionVersion.version + 1)
+    )
+    if commit:
+        db.commit()
@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+# 次ページのカーソルを返すレスポンスヘッダー
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """(ソートキー, id) を不透明なカーソル文字列に変換する"""
+    payload = json.dumps([sort_value.isoformat(), row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset(query, sort_column, id_column, cursor: Optional[str], limit: int, descending: bool = False):
+    """(sort_column, id_column) をキーにしたキーセット条件を Query / Select に適用する
+
+    OFFSET を使わずに複合インデックスをシークするため、どのページでもコストは一定。
+    続きの有無を判定するため limit + 1 件を取得する。
+    """
+    key = tuple_(sort_column, id_column)
+    if cursor:
+        position = tuple_(*decode_cursor(cursor))
+        query = query.filter(key < position if descending else key > position)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column, id_column)
+    return query.limit(limit + 1)
+
+
+def finish_page(rows: List, sort_column, id_column, limit: int, response: Response) -> List:
+    """limit 件に切り詰め、続きがある場合は次ページのカーソルを X-Next-Cursor ヘッダーに設定する"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            getattr(last, sort_column.key), getattr(last, id_column.key)
+        )
+    return rows
+
+
+def keyset_page(query, sort_column, id_column, cursor: Optional[str], limit: int, response: Response, descending: bool = False) -> List:
+    """同期セッションの Query に対するキーセットページネーション"""
+    rows = apply_keyset(query, sort_column, id_column, cursor, limit, descending).all()
+    return finish_page(rows, sort_column, id_column, limit, response)
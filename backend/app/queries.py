@@ -0,0 +1,236 @@
+"""同期・非同期どちらのルートからも使うクエリ組み立てとレスポンス構築のヘルパー"""
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Float, func, select, type_coerce
+from sqlalchemy.orm import selectinload, with_expression
+
+from .models.task import to_jst
+from .models import Task as TaskModel, Memo as MemoModel, WorkLog as WorkLogModel, WorkTimeRollup
+from .models.memo import memo_task
+from .models.action_plan import SubTask as SubTaskModel, LeafTask as LeafTaskModel
+from .schemas.memo import MemoSummary, TaskMemos
+from .schemas.action_plan import (
+    ActionItem, Progress, LeafTaskTree, SubTaskTree, ActionPlanTree,
+    LeafTaskProgress, SubTaskProgress, ActionPlanProgress,
+)
+
+
+def task_load_options():
+    """Task スキーマのシリアライズに必要なリレーションを一括ロードするオプション"""
+    return (
+        selectinload(TaskModel.categories),
+        selectinload(TaskModel.work_logs),
+    )
+
+def _task_summary_expressions():
+    """タスクごとの作業ログ集計（相関サブクエリ。作業ログ・ロールアップの task_id インデックスで引く）"""
+    of_task = WorkLogModel.task_id == TaskModel.id
+    minutes = func.round(func.coalesce(func.sum(WorkTimeRollup.seconds), 0) / 60.0, 1)
+    return {
+        "work_log_count": select(func.count(WorkLogModel.id)).where(of_task).scalar_subquery(),
+        # 合計時間は集計 API と同じく日次ロールアップから計算する
+        "logged_minutes": select(type_coerce(minutes, Float))
+            .where(WorkTimeRollup.task_id == TaskModel.id).scalar_subquery(),
+        "last_activity_at": select(func.max(func.coalesce(WorkLogModel.ended_at, WorkLogModel.started_at)))
+            .where(of_task).scalar_subquery(),
+    }
+
+TASK_SUMMARY_AGGREGATES = ("work_log_count", "logged_minutes", "last_activity_at")
+
+def task_summary_options(names=TASK_SUMMARY_AGGREGATES):
+    """TaskSummary の集計項目をタスクと同じ SELECT で読み込むオプション"""
+    expressions = _task_summary_expressions()
+    return tuple(with_expression(getattr(TaskModel, name), expressions[name]) for name in names)
+
+def memo_load_options():
+    """Memo スキーマ（埋め込みタスクを含む）のシリアライズ用ロードオプション"""
+    tasks = selectinload(MemoModel.tasks)
+    return (
+        tasks.selectinload(TaskModel.categories),
+        tasks.selectinload(TaskModel.work_logs),
+    )
+
+def sub_task_tree_options():
+    """サブタスク → リーフタスク → アクションアイテムを階層ごとに1クエリでロードするオプション"""
+    return (
+        selectinload(SubTaskModel.leaf_tasks).selectinload(LeafTaskModel.action_items),
+    )
+
+def action_plan_tree_options():
+    return (
+        selectinload(TaskModel.sub_tasks)
+        .selectinload(SubTaskModel.leaf_tasks)
+        .selectinload(LeafTaskModel.action_items),
+    )
+
+# GET /tasks/ の sort パラメータで指定できるキー（"-" を前置すると降順）
+TASK_SORT_KEYS = {
+    "status": TaskModel.status_rank,
+    "priority": TaskModel.priority,
+    "priority_score": TaskModel.priority_score,
+    "motivation_score": TaskModel.motivation_score,
+    "deadline": TaskModel.deadline,
+    "created_at": TaskModel.created_at,
+}
+
+def parse_task_sort(sort: str):
+    """"status,-priority_score" 形式のソート指定を ORDER BY 句に変換する"""
+    clauses = []
+    for key in filter(None, (part.strip() for part in sort.split(","))):
+        descending = key.startswith("-")
+        column = TASK_SORT_KEYS.get(key.lstrip("-"))
+        if column is None:
+            raise HTTPException(status_code=400, detail=f"Unknown sort key: {key}")
+        clause = column.desc() if descending else column.asc()
+        # 期限未設定のタスクは常に末尾に並べる
+        clauses.append(clause.nulls_last() if column is TaskModel.deadline else clause)
+    clauses.append(TaskModel.id)
+    return clauses
+
+def filter_tasks(
+    query,
+    status: Optional[List[str]] = None,
+    deadline_from: Optional[datetime] = None,
+    deadline_to: Optional[datetime] = None,
+):
+    """Query / Select のどちらにも GET /tasks/ の絞り込み条件を適用する"""
+    if status:
+        query = query.filter(TaskModel.status.in_(status))
+    # 期限は JST（タイムゾーンなし）で保存しているため、条件も同じ形にそろえて比較する
+    if deadline_from is not None:
+        query = query.filter(TaskModel.deadline >= to_jst(deadline_from))
+    if deadline_to is not None:
+        query = query.filter(TaskModel.deadline <= to_jst(deadline_to))
+    return query
+
+def build_sub_task_tree(sub_task: SubTaskModel) -> SubTaskTree:
+    """ロード済みのサブタスクから進捗率付きのツリーを組み立てる（進捗は保存済みカウンタを使う）"""
+    leaf_trees = []
+    for leaf_task in sub_task.leaf_tasks:
+        leaf_trees.append(LeafTaskTree(
+            id=leaf_task.id,
+            sub_task_id=leaf_task.sub_task_id,
+            title=leaf_task.title,
+            description=leaf_task.description,
+            created_at=leaf_task.created_at,
+            updated_at=leaf_task.updated_at,
+            action_items=[ActionItem.model_validate(item) for item in leaf_task.action_items],
+            completed_count=leaf_task.completed_count,
+            total_count=leaf_task.total_count,
+            progress=Progress.from_counts(leaf_task.completed_count, leaf_task.total_count),
+        ))
+    return SubTaskTree(
+        id=sub_task.id,
+        task_id=sub_task.task_id,
+        title=sub_task.title,
+        description=sub_task.description,
+        created_at=sub_task.created_at,
+        updated_at=sub_task.updated_at,
+        leaf_tasks=leaf_trees,
+        completed_count=sub_task.completed_count,
+        total_count=sub_task.total_count,
+        progress=Progress.from_counts(sub_task.completed_count, sub_task.total_count),
+    )
+
+def build_action_plan_tree(task: TaskModel) -> ActionPlanTree:
+    return ActionPlanTree(
+        task_id=task.id,
+        title=task.title,
+        sub_tasks=[build_sub_task_tree(sub_task) for sub_task in task.sub_tasks],
+        progress=Progress.from_counts(task.completed_count, task.total_count),
+    )
+
+def action_plan_progress_statements(task_id: int):
+    """進捗カウンタだけを読む SELECT（タスク・サブタスク・リーフタスクの3本）"""
+    return (
+        select(TaskModel.id, TaskModel.completed_count, TaskModel.total_count)
+        .where(TaskModel.id == task_id),
+        select(SubTaskModel.id, SubTaskModel.task_id, SubTaskModel.completed_count, SubTaskModel.total_count)
+        .where(SubTaskModel.task_id == task_id)
+        .order_by(SubTaskModel.id),
+        select(LeafTaskModel.id, LeafTaskModel.sub_task_id, LeafTaskModel.completed_count, LeafTaskModel.total_count)
+        .join(SubTaskModel, SubTaskModel.id == LeafTaskModel.sub_task_id)
+        .where(SubTaskModel.task_id == task_id)
+        .order_by(LeafTaskModel.id),
+    )
+
+def build_action_plan_progress(task_row, sub_task_rows, leaf_task_rows) -> ActionPlanProgress:
+    """(id, 親 id, completed_count, total_count) の行から進捗だけのツリーを組み立てる"""
+    leaves_by_sub = {}
+    for leaf_id, sub_task_id, completed, total in leaf_task_rows:
+        leaves_by_sub.setdefault(sub_task_id, []).append(
+            LeafTaskProgress(id=leaf_id, progress=Progress.from_counts(completed, total))
+        )
+    task_id, completed, total = task_row
+    return ActionPlanProgress(
+        task_id=task_id,
+        progress=Progress.from_counts(completed, total),
+        sub_tasks=[
+            SubTaskProgress(
+                id=sub_id,
+                progress=Progress.from_counts(sub_completed, sub_total),
+                leaf_tasks=leaves_by_sub.get(sub_id, []),
+            )
+            for sub_id, _, sub_completed, sub_total in sub_task_rows
+        ],
+    )
+
+def action_item_detail(action_item) -> dict:
+    """GET /action-items/{id} 用に親タスクのタイトルを含めた辞書を作る"""
+    leaf_task = action_item.leaf_task
+    return {
+        "id": action_item.id,
+        "content": action_item.content,
+        "is_completed": action_item.is_completed,
+        "leaf_task_id": action_item.leaf_task_id,
+        "created_at": action_item.created_at,
+        "updated_at": action_item.updated_at,
+        "task_title": leaf_task.sub_task.task.title if leaf_task else "",
+        "subtask_title": leaf_task.sub_task.title if leaf_task else "",
+        "leaf_task_title": leaf_task.title if leaf_task else ""
+    }
+
+def apply_memo_task_diff(memo: MemoModel, task_ids: List[int]) -> set:
+    """メモの関連タスクを指定の ID 集合に合わせる
+
+    外れたタスクだけをコレクションから取り除き、新たに追加すべき ID を返す
+    （呼び出し側でロードして追加する）。変更のない関連には触れないため、
+    flush では差分の DELETE / INSERT だけがまとめて発行される。
+    """
+    requested = set(task_ids)
+    current = {task.id: task for task in memo.tasks}
+    for task_id in current.keys() - requested:
+        memo.tasks.remove(current[task_id])
+    return requested - current.keys()
+
+def task_memo_statements(task_ids: List[int], counts_only: bool = False):
+    """タスクごとのメモ件数と、（counts_only でなければ）タスクに紐づくメモを読む SELECT"""
+    counts = (
+        select(memo_task.c.task_id, func.count())
+        .where(memo_task.c.task_id.in_(task_ids))
+        .group_by(memo_task.c.task_id)
+    )
+    if counts_only:
+        return counts, None
+    memos = (
+        select(memo_task.c.task_id, MemoModel.id, MemoModel.content, MemoModel.created_at)
+        .join(MemoModel, MemoModel.id == memo_task.c.memo_id)
+        .where(memo_task.c.task_id.in_(task_ids))
+        .order_by(memo_task.c.task_id, MemoModel.created_at.desc(), MemoModel.id.desc())
+    )
+    return counts, memos
+
+def group_task_memos(rows) -> dict:
+    memos = {}
+    for task_id, memo_id, content, created_at in rows:
+        memos.setdefault(task_id, []).append(MemoSummary(id=memo_id, content=content, created_at=created_at))
+    return memos
+
+def build_task_memos(task_ids: List[int], counts: dict, memos: dict) -> List[TaskMemos]:
+    """リクエストされた順に（重複は除いて）タスクごとの結果を並べる。メモのないタスクは件数 0"""
+    return [
+        TaskMemos(task_id=task_id, memo_count=counts.get(task_id, 0), memos=memos.get(task_id, []))
+        for task_id in dict.fromkeys(task_ids)
+    ]
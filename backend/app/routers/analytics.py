@@ -0,0 +1,74 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models import Task as TaskModel, WorkTimeRollup
+from ..schemas.analytics import WorkTimeGroup, WorkTimeReport, WorkTimeRow
+
+router = APIRouter()
+
+# group_by のキー -> (レスポンスの項目名, 列) の組
+GROUP_COLUMNS = {
+    "task": (("task_id", WorkTimeRollup.task_id), ("task_title", TaskModel.title)),
+    "status": (("status", TaskModel.status),),
+    "day": (("day", WorkTimeRollup.day),),
+    "week": (("week", WorkTimeRollup.week),),
+}
+
+
+def _minutes(seconds: int) -> float:
+    return round(seconds / 60, 1)
+
+
+@router.get("/analytics/work-time", response_model=WorkTimeReport)
+def work_time_report(
+    group_by: List[WorkTimeGroup] = Query(["task"]),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    task_id: Optional[int] = None,
+    status: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """作業時間をタスク・ステータス・日・週（JST）ごとに集計する（日次ロールアップから計算）"""
+    group_by = list(dict.fromkeys(group_by))
+    columns = [
+        column.label(name)
+        for key in group_by
+        for name, column in GROUP_COLUMNS[key]
+    ]
+    seconds = func.coalesce(func.sum(WorkTimeRollup.seconds), 0)
+    log_count = func.coalesce(func.sum(WorkTimeRollup.log_count), 0)
+    stmt = (
+        select(*columns, seconds.label("seconds"), log_count.label("log_count"))
+        .join(TaskModel, TaskModel.id == WorkTimeRollup.task_id)
+    )
+    if date_from is not None:
+        stmt = stmt.where(WorkTimeRollup.day >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(WorkTimeRollup.day <= date_to)
+    if task_id is not None:
+        stmt = stmt.where(WorkTimeRollup.task_id == task_id)
+    if status:
+        stmt = stmt.where(TaskModel.status.in_(status))
+    if columns:
+        stmt = stmt.group_by(*columns).order_by(*columns)
+
+    rows = [
+        WorkTimeRow(**row._mapping, minutes=_minutes(row.seconds))
+        for row in db.execute(stmt)
+        if row.seconds or row.log_count
+    ]
+    total_seconds = sum(row.seconds for row in rows)
+    return WorkTimeReport(
+        date_from=date_from,
+        date_to=date_to,
+        group_by=group_by,
+        total_seconds=total_seconds,
+        total_minutes=_minutes(total_seconds),
+        log_count=sum(row.log_count for row in rows),
+        rows=rows,
+    )
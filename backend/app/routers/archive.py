@@ -0,0 +1,69 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..archive import ArchiveError, restore_task, subtree_filters
+from ..database import get_db, get_engine
+from ..models import Task as TaskModel
+from ..models.archive import ARCHIVE_TABLES
+from ..pagination import apply_keyset, finish_page
+from ..queries import task_load_options
+from ..schemas.archive import ArchivedTask, ArchivedTaskDetail
+from ..schemas.task import Task
+
+router = APIRouter()
+
+archived_tasks = ARCHIVE_TABLES["tasks"]
+
+
+@router.get("/archive/tasks", response_model=List[ArchivedTask])
+def read_archived_tasks(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """アーカイブ済みのタスクをアーカイブした新しい順に返す（続きは X-Next-Cursor のカーソルで取得する）"""
+    query = apply_keyset(
+        select(archived_tasks), archived_tasks.c.archived_at, archived_tasks.c.id, cursor, limit, descending=True
+    )
+    rows = db.execute(query).all()
+    return [
+        ArchivedTask.model_validate(row._mapping)
+        for row in finish_page(rows, archived_tasks.c.archived_at, archived_tasks.c.id, limit, response)
+    ]
+
+
+@router.get("/archive/tasks/{task_id}", response_model=ArchivedTaskDetail)
+def read_archived_task(task_id: int, db: Session = Depends(get_db)):
+    """アーカイブ済みのタスクと、一緒にアーカイブされた作業ログ・アクションプラン・関連付け"""
+    task = db.execute(select(archived_tasks).where(archived_tasks.c.id == task_id)).first()
+    if task is None:
+        raise HTTPException(status_code=404, detail="Archived task not found")
+    filters = subtree_filters(ARCHIVE_TABLES, [task_id])
+
+    def rows(name, *order):
+        table = ARCHIVE_TABLES[name]
+        return [row._mapping for row in db.execute(select(table).where(filters[name]).order_by(*order))]
+
+    return ArchivedTaskDetail(
+        **task._mapping,
+        work_logs=rows("work_logs", ARCHIVE_TABLES["work_logs"].c.started_at, ARCHIVE_TABLES["work_logs"].c.id),
+        sub_tasks=rows("sub_tasks", ARCHIVE_TABLES["sub_tasks"].c.id),
+        leaf_tasks=rows("leaf_tasks", ARCHIVE_TABLES["leaf_tasks"].c.id),
+        action_items=rows("action_items", ARCHIVE_TABLES["action_items"].c.id),
+        memo_ids=[row["memo_id"] for row in rows("memo_task", ARCHIVE_TABLES["memo_task"].c.memo_id)],
+        category_ids=[row["category_id"] for row in rows("task_category", ARCHIVE_TABLES["task_category"].c.category_id)],
+    )
+
+
+@router.post("/archive/tasks/{task_id}/restore", response_model=Task)
+def restore_archived_task(task_id: int, db: Session = Depends(get_db)):
+    """アーカイブ済みのタスクを配下の行ごと元に戻す"""
+    try:
+        restore_task(get_engine(), task_id)
+    except ArchiveError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc))
+    return db.query(TaskModel).options(*task_load_options()).filter(TaskModel.id == task_id).first()
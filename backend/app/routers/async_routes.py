@@ -0,0 +1,348 @@
+"""非同期エンジン版のタスク・メモ・作業ログ・アクションプランのルート
+
+BIZBUDDY_ASYNC_DB が有効な場合に main.py で同期版より先に登録され、同じパスを受け持つ。
+非同期セッションでは遅延ロードができないため、レスポンスに含むリレーションは必ず明示的にロードする。
+"""
+from datetime import datetime
+from typing import List, Optional
+
+import pytz
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, with_parent
+
+from ..database import get_async_db
+from ..models import Task as TaskModel, Memo as MemoModel, WorkLog as WorkLogModel
+from ..models.action_plan import SubTask as SubTaskModel, LeafTask as LeafTaskModel, ActionItem as ActionItemModel
+from ..pagination import apply_keyset, finish_page
+from ..queries import (
+    task_load_options, memo_load_options, sub_task_tree_options, action_plan_tree_options,
+    parse_task_sort, filter_tasks, build_sub_task_tree, build_action_plan_tree, action_item_detail,
+    action_plan_progress_statements, build_action_plan_progress, apply_memo_task_diff,
+)
+from ..serializers import (
+    TASK_FIELDS, TASK_SUMMARY_FIELDS, MEMO_FIELDS, parse_fields, use_fast_path, fast_response,
+    task_to_dict, task_summary_to_dict, memo_to_dict, task_projection_options, memo_projection_options,
+)
+from ..schemas.task import Task, TaskCreate, TaskSummary, TaskListView
+from ..schemas.memo import Memo, MemoCreate
+from ..schemas.work_log import WorkLog, WorkLogCreate
+from ..schemas.action_plan import (
+    SubTask, SubTaskCreate, LeafTask, LeafTaskCreate, ActionItem, ActionItemCreate,
+    SubTaskTree, ActionPlanTree, ActionPlanProgress,
+)
+
+router = APIRouter()
+
+
+async def get_or_404(db: AsyncSession, model, row_id: int, detail: str, options=()):
+    row = (await db.execute(select(model).options(*options).where(model.id == row_id))).scalar_one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return row
+
+# タスク
+@router.post("/tasks/", response_model=Task)
+async def create_task(task: TaskCreate, db: AsyncSession = Depends(get_async_db)):
+    db_task = TaskModel(
+        **task.dict(),
+        priority_score=task.priority,
+        motivation_score=task.motivation,
+        categories=[],
+        work_logs=[],
+    )
+    db.add(db_task)
+    await db.commit()
+    return db_task
+
+@router.get("/tasks/", response_model=List[TaskSummary])
+async def read_tasks(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status: Optional[List[str]] = Query(None),
+    deadline_from: Optional[datetime] = None,
+    deadline_to: Optional[datetime] = None,
+    sort: Optional[str] = None,
+    view: TaskListView = "summary",
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """タスク一覧（既定は作業ログの集計値を含む TaskSummary。view=full で詳細と同じ Task を返す）"""
+    summary = view == "summary"
+    selected = parse_fields(fields, TASK_SUMMARY_FIELDS if summary else TASK_FIELDS)
+    stmt = filter_tasks(select(TaskModel).options(*task_projection_options(selected, summary)), status, deadline_from, deadline_to)
+
+    if sort:
+        if cursor:
+            raise HTTPException(status_code=400, detail="cursor cannot be combined with sort")
+        stmt = stmt.order_by(*parse_task_sort(sort)).offset(skip).limit(limit)
+        tasks = (await db.execute(stmt)).scalars().all()
+    else:
+        if skip and not cursor:
+            stmt = stmt.offset(skip)
+        stmt = apply_keyset(stmt, TaskModel.created_at, TaskModel.id, cursor, limit)
+        rows = (await db.execute(stmt)).scalars().all()
+        tasks = finish_page(rows, TaskModel.created_at, TaskModel.id, limit, response)
+
+    if summary and not use_fast_path(selected):
+        return tasks
+    # Task の表現は response_model と異なるため常に serializers で組み立てる
+    return fast_response(tasks, task_summary_to_dict if summary else task_to_dict, selected, response)
+
+@router.get("/tasks/{task_id}", response_model=Task)
+async def read_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await get_or_404(db, TaskModel, task_id, "Task not found", task_load_options())
+
+@router.put("/tasks/{task_id}", response_model=Task)
+async def update_task(task_id: int, task: TaskCreate, db: AsyncSession = Depends(get_async_db)):
+    db_task = await get_or_404(db, TaskModel, task_id, "Task not found", task_load_options())
+    for key, value in task.dict().items():
+        setattr(db_task, key, value)
+
+    db_task.last_updated = datetime.now(pytz.timezone('Asia/Tokyo'))
+    await db.commit()
+    return db_task
+
+@router.delete("/tasks/{task_id}")
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    task = await get_or_404(db, TaskModel, task_id, "Task not found")
+    await db.delete(task)
+    await db.commit()
+    return {"message": "Task deleted successfully"}
+
+# メモ
+@router.post("/memos/", response_model=Memo)
+async def create_memo(memo: MemoCreate, db: AsyncSession = Depends(get_async_db)):
+    db_memo = MemoModel(content=memo.content, created_at=datetime.utcnow(), tasks=[])
+    db.add(db_memo)
+    await db.commit()
+    return db_memo
+
+@router.get("/memos/", response_model=List[Memo])
+async def read_memos(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    selected = parse_fields(fields, MEMO_FIELDS)
+    stmt = select(MemoModel).options(*memo_projection_options(selected))
+    if skip and not cursor:
+        stmt = stmt.offset(skip)
+    stmt = apply_keyset(stmt, MemoModel.created_at, MemoModel.id, cursor, limit, descending=True)
+    rows = (await db.execute(stmt)).scalars().all()
+    memos = finish_page(rows, MemoModel.created_at, MemoModel.id, limit, response)
+    if use_fast_path(selected):
+        return fast_response(memos, memo_to_dict, selected, response)
+    return memos
+
+@router.get("/memos/{memo_id}", response_model=Memo)
+async def read_memo(memo_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await get_or_404(db, MemoModel, memo_id, "Memo not found", memo_load_options())
+
+@router.put("/memos/{memo_id}", response_model=Memo)
+async def update_memo(memo_id: int, memo: MemoCreate, db: AsyncSession = Depends(get_async_db)):
+    db_memo = await get_or_404(db, MemoModel, memo_id, "Memo not found", memo_load_options())
+
+    # コンテンツが変更された場合のみ時刻を更新
+    if db_memo.content != memo.content:
+        db_memo.content = memo.content
+        db_memo.created_at = datetime.utcnow()
+
+    # タスクの関連付けを差分で更新
+    added_task_ids = apply_memo_task_diff(db_memo, memo.task_ids)
+    if added_task_ids:
+        stmt = select(TaskModel).options(*task_load_options()).where(TaskModel.id.in_(added_task_ids))
+        db_memo.tasks.extend((await db.execute(stmt)).scalars().all())
+
+    await db.commit()
+    return db_memo
+
+@router.delete("/memos/{memo_id}")
+async def delete_memo(memo_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_memo = await get_or_404(db, MemoModel, memo_id, "Memo not found")
+    await db.delete(db_memo)
+    await db.commit()
+    return {"message": "Memo deleted successfully"}
+
+@router.get("/tasks/{task_id}/memos/", response_model=List[Memo])
+async def read_task_memos(
+    task_id: int,
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    task = await get_or_404(db, TaskModel, task_id, "Task not found")
+    stmt = select(MemoModel).options(*memo_load_options()).where(with_parent(task, TaskModel.memos))
+    stmt = apply_keyset(stmt, MemoModel.created_at, MemoModel.id, cursor, limit, descending=True)
+    rows = (await db.execute(stmt)).scalars().all()
+    return finish_page(rows, MemoModel.created_at, MemoModel.id, limit, response)
+
+# 作業ログ
+@router.get("/tasks/{task_id}/work-logs/", response_model=List[WorkLog])
+async def get_work_logs(
+    task_id: int,
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    await get_or_404(db, TaskModel, task_id, "Task not found")
+    stmt = select(WorkLogModel).where(WorkLogModel.task_id == task_id)
+    stmt = apply_keyset(stmt, WorkLogModel.started_at, WorkLogModel.id, cursor, limit, descending=True)
+    rows = (await db.execute(stmt)).scalars().all()
+    return finish_page(rows, WorkLogModel.started_at, WorkLogModel.id, limit, response)
+
+@router.post("/tasks/{task_id}/work-logs/", response_model=WorkLog)
+async def create_work_log(task_id: int, work_log: WorkLogCreate, db: AsyncSession = Depends(get_async_db)):
+    await get_or_404(db, TaskModel, task_id, "Task not found")
+    db_work_log = WorkLogModel(**work_log.dict(), task_id=task_id)
+    db.add(db_work_log)
+    await db.commit()
+    return db_work_log
+
+async def get_work_log_or_404(db: AsyncSession, task_id: int, work_log_id: int):
+    stmt = select(WorkLogModel).where(WorkLogModel.id == work_log_id, WorkLogModel.task_id == task_id)
+    db_work_log = (await db.execute(stmt)).scalar_one_or_none()
+    if not db_work_log:
+        raise HTTPException(status_code=404, detail="Work log not found")
+    return db_work_log
+
+@router.put("/tasks/{task_id}/work-logs/{work_log_id}", response_model=WorkLog)
+async def update_work_log(
+    task_id: int,
+    work_log_id: int,
+    work_log_update: WorkLogCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_work_log = await get_work_log_or_404(db, task_id, work_log_id)
+    for key, value in work_log_update.dict().items():
+        setattr(db_work_log, key, value)
+    await db.commit()
+    return db_work_log
+
+@router.delete("/tasks/{task_id}/work-logs/{work_log_id}")
+async def delete_work_log(task_id: int, work_log_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_work_log = await get_work_log_or_404(db, task_id, work_log_id)
+    await db.delete(db_work_log)
+    await db.commit()
+    return {"message": "Work log deleted successfully"}
+
+# アクションプラン
+@router.get("/tasks/{task_id}/sub-tasks", response_model=List[SubTask])
+async def get_sub_tasks(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    await get_or_404(db, TaskModel, task_id, "Task not found")
+    stmt = (
+        select(SubTaskModel)
+        .options(*sub_task_tree_options())
+        .where(SubTaskModel.task_id == task_id)
+        .order_by(SubTaskModel.id)
+    )
+    return (await db.execute(stmt)).scalars().all()
+
+@router.get("/tasks/{task_id}/action-plan", response_model=ActionPlanTree)
+async def get_action_plan_tree(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    task = await get_or_404(db, TaskModel, task_id, "Task not found", action_plan_tree_options())
+    return build_action_plan_tree(task)
+
+@router.get("/tasks/{task_id}/progress", response_model=ActionPlanProgress)
+async def get_action_plan_progress(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    task_stmt, sub_task_stmt, leaf_task_stmt = action_plan_progress_statements(task_id)
+    task_row = (await db.execute(task_stmt)).first()
+    if task_row is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return build_action_plan_progress(
+        task_row, (await db.execute(sub_task_stmt)).all(), (await db.execute(leaf_task_stmt)).all()
+    )
+
+@router.get("/sub-tasks/{sub_task_id}/details", response_model=SubTaskTree)
+async def get_sub_task_details(sub_task_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_sub_task = await get_or_404(db, SubTaskModel, sub_task_id, "Sub task not found", sub_task_tree_options())
+    return build_sub_task_tree(db_sub_task)
+
+@router.post("/tasks/{task_id}/sub-tasks", response_model=SubTask)
+async def create_sub_task(task_id: int, sub_task: SubTaskCreate, db: AsyncSession = Depends(get_async_db)):
+    await get_or_404(db, TaskModel, task_id, "Task not found")
+    db_sub_task = SubTaskModel(**sub_task.dict(), task_id=task_id, leaf_tasks=[])
+    db.add(db_sub_task)
+    await db.commit()
+    return db_sub_task
+
+@router.put("/sub-tasks/{sub_task_id}", response_model=SubTask)
+async def update_sub_task(sub_task_id: int, sub_task: SubTaskCreate, db: AsyncSession = Depends(get_async_db)):
+    db_sub_task = await get_or_404(db, SubTaskModel, sub_task_id, "Sub task not found", sub_task_tree_options())
+    for key, value in sub_task.dict().items():
+        setattr(db_sub_task, key, value)
+    await db.commit()
+    return db_sub_task
+
+@router.delete("/sub-tasks/{sub_task_id}")
+async def delete_sub_task(sub_task_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_sub_task = await get_or_404(db, SubTaskModel, sub_task_id, "Sub task not found")
+    await db.delete(db_sub_task)
+    await db.commit()
+    return {"message": "Sub task deleted"}
+
+@router.post("/sub-tasks/{sub_task_id}/leaf-tasks", response_model=LeafTask)
+async def create_leaf_task(sub_task_id: int, leaf_task: LeafTaskCreate, db: AsyncSession = Depends(get_async_db)):
+    await get_or_404(db, SubTaskModel, sub_task_id, "Sub task not found")
+    db_leaf_task = LeafTaskModel(**leaf_task.dict(), sub_task_id=sub_task_id, action_items=[])
+    db.add(db_leaf_task)
+    await db.commit()
+    return db_leaf_task
+
+@router.put("/leaf-tasks/{leaf_task_id}", response_model=LeafTask)
+async def update_leaf_task(leaf_task_id: int, leaf_task: LeafTaskCreate, db: AsyncSession = Depends(get_async_db)):
+    db_leaf_task = await get_or_404(
+        db, LeafTaskModel, leaf_task_id, "Leaf task not found", (selectinload(LeafTaskModel.action_items),)
+    )
+    for key, value in leaf_task.dict().items():
+        setattr(db_leaf_task, key, value)
+    await db.commit()
+    return db_leaf_task
+
+@router.delete("/leaf-tasks/{leaf_task_id}")
+async def delete_leaf_task(leaf_task_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_leaf_task = await get_or_404(db, LeafTaskModel, leaf_task_id, "Leaf task not found")
+    await db.delete(db_leaf_task)
+    await db.commit()
+    return {"message": "Leaf task deleted"}
+
+@router.post("/leaf-tasks/{leaf_task_id}/action-items", response_model=ActionItem)
+async def create_action_item(leaf_task_id: int, action_item: ActionItemCreate, db: AsyncSession = Depends(get_async_db)):
+    await get_or_404(db, LeafTaskModel, leaf_task_id, "Leaf task not found")
+    db_action_item = ActionItemModel(**action_item.dict(), leaf_task_id=leaf_task_id)
+    db.add(db_action_item)
+    await db.commit()
+    return db_action_item
+
+@router.put("/action-items/{action_item_id}", response_model=ActionItem)
+async def update_action_item(action_item_id: int, action_item: ActionItemCreate, db: AsyncSession = Depends(get_async_db)):
+    db_action_item = await get_or_404(db, ActionItemModel, action_item_id, "Action item not found")
+    for key, value in action_item.dict().items():
+        setattr(db_action_item, key, value)
+    await db.commit()
+    return db_action_item
+
+@router.delete("/action-items/{action_item_id}")
+async def delete_action_item(action_item_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_action_item = await get_or_404(db, ActionItemModel, action_item_id, "Action item not found")
+    await db.delete(db_action_item)
+    await db.commit()
+    return {"message": "Action item deleted"}
+
+@router.get("/action-items/{action_item_id}", response_model=ActionItem)
+async def get_action_item(action_item_id: int, db: AsyncSession = Depends(get_async_db)):
+    options = (
+        selectinload(ActionItemModel.leaf_task)
+        .selectinload(LeafTaskModel.sub_task)
+        .selectinload(SubTaskModel.task),
+    )
+    action_item = await get_or_404(db, ActionItemModel, action_item_id, "Action item not found", options)
+    return action_item_detail(action_item)
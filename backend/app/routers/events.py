@@ -0,0 +1,44 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from ..database import current_database
+from ..events import broker
+
+router = APIRouter()
+
+# 接続維持のためのコメント行を送る間隔（秒）
+HEARTBEAT_INTERVAL = 15
+
+
+def _format(change: dict) -> str:
+    # 期限の通知（app/urgency.py）は変更とは別のイベント名で送る
+    name = "reminder" if change.get("op") == "reminder" else "change"
+    return f"event: {name}\ndata: {json.dumps(change, ensure_ascii=False)}\n\n"
+
+
+@router.get("/events")
+async def stream_events(request: Request):
+    """タスク・メモ・作業ログ・アクションプランの変更を Server-Sent Events で配信する"""
+    subscriber = await broker.subscribe(current_database())
+
+    async def event_stream():
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    change = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield _format(change)
+        finally:
+            broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,65 @@
+import os
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..database import engine
+from ..migrate import current_revision, head_revision, schema_differences
+from ..tenants import TENANT_DATA_DIRS, TENANT_MODE
+
+router = APIRouter()
+
+# 起動時点のコードが前提とするリビジョン（移行は `python -m app.cli migrate` で別に行う）
+HEAD_REVISION = head_revision()
+
+# スキーマがモデルと一致することを確かめたか（一致した後は移行なしに変わらないため、以降は確かめない）
+_schema_verified = False
+
+
+@router.get("/healthz")
+def healthz():
+    """プロセスが応答できるか（DB には触れない）"""
+    return {"status": "ok"}
+
+
+def _writable(path: str) -> bool:
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        return False
+    return os.access(path, os.W_OK)
+
+
+@router.get("/readyz")
+def readyz():
+    """DB に接続でき、スキーマが最新のリビジョンまで移行済みでモデルと一致するか。そうでなければ 503 を返す
+
+    テナントモードではテナントの DB は開くときに移行するため、データディレクトリに書き込めるかを確認する。
+    """
+    if TENANT_MODE:
+        unwritable = [path for path in TENANT_DATA_DIRS if not _writable(path)]
+        if unwritable:
+            return JSONResponse(status_code=503, content={"status": "unavailable", "unwritable": unwritable})
+        return {"status": "ready", "head": HEAD_REVISION}
+    global _schema_verified
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            revision = current_revision(connection)
+            differences = [] if _schema_verified or revision != HEAD_REVISION else schema_differences(connection)
+    except SQLAlchemyError as exc:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "detail": str(exc)})
+    if revision != HEAD_REVISION:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "migration required", "revision": revision, "head": HEAD_REVISION},
+        )
+    if differences:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "schema mismatch", "revision": revision, "differences": differences},
+        )
+    _schema_verified = True
+    return {"status": "ready", "revision": revision}
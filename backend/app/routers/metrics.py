@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..metrics import registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """ルートごとのレイテンシ・DB 時間・クエリ数のヒストグラム（Prometheus テキスト形式）"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from ..database import get_db
+from ..schemas.search import SearchEntity, SearchHit
+from .. import search as search_index
+
+router = APIRouter()
+
+@router.get("/search", response_model=List[SearchHit])
+def search(
+    q: str = Query(..., min_length=1),
+    types: Optional[List[SearchEntity]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """タスク・メモ・作業ログ・アクションアイテムを横断して全文検索する"""
+    if not search_index.is_supported(db.get_bind()):
+        raise HTTPException(status_code=501, detail="Full-text search requires SQLite")
+    return search_index.search(db.connection(), q, types, limit)
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..schemas.sync import SyncResponse
+from ..sync import MAX_SYNC_LIMIT, sync_changes
+
+router = APIRouter()
+
+
+@router.get("/sync", response_model=SyncResponse)
+def sync(
+    since: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=MAX_SYNC_LIMIT),
+    db: Session = Depends(get_db)
+):
+    """since（前回のレスポンスの version）以降に変更・削除されたエンティティを返す
+
+    has_more が true の間は version を since にして繰り返し取得する。
+    410 の場合は全件を取り直し、detail.version から同期を再開する。
+    """
+    return sync_changes(db, since, limit)
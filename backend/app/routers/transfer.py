@@ -0,0 +1,48 @@
+import io
+import tempfile
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+
+from ..database import get_engine
+from ..transfer import TransferError, export_chunks, import_file
+
+router = APIRouter()
+
+
+@router.get("/export")
+def export_workspace():
+    """ワークスペース全体を NDJSON でストリーミング出力する"""
+    filename = f"bizbuddy-{datetime.now().strftime('%Y%m%d-%H%M%S')}.ndjson"
+    return StreamingResponse(
+        export_chunks(get_engine()),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/import")
+async def import_workspace(request: Request, replace: bool = False):
+    """エクスポートした NDJSON を取り込む（replace=true で既存データを置き換える）
+
+    本文はメモリに載せず一時ファイルに書き出してから、スレッドプールで1行ずつ取り込む。
+    """
+    with tempfile.TemporaryFile() as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        lines = io.TextIOWrapper(upload, encoding="utf-8")
+        try:
+            counts = await run_in_threadpool(import_file, get_engine(), lines, replace)
+        except TransferError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        except IntegrityError as exc:
+            raise HTTPException(status_code=409, detail=f"Import violates a constraint: {exc.orig}")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Import file must be UTF-8")
+        finally:
+            lines.detach()
+    return {"imported": counts}
@@ -0,0 +1,48 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models import Task as TaskModel, DeadlineReminder as DeadlineReminderModel
+from ..queries import task_summary_options
+from ..schemas.urgency import NextTask, DeadlineReminder
+from ..urgency import CLOSED_STATUS
+
+router = APIRouter()
+
+
+@router.get("/tasks/next", response_model=List[NextTask])
+def read_next_tasks(limit: int = Query(10, ge=1, le=100), db: Session = Depends(get_db)):
+    """緊急度の高い未完了タスク（緊急度はバックグラウンドで定期的に再計算した値）"""
+    return db.execute(
+        select(TaskModel)
+        .where(TaskModel.status != CLOSED_STATUS, TaskModel.urgency_score.is_not(None))
+        .order_by(TaskModel.urgency_score.desc(), TaskModel.id)
+        .limit(limit)
+        .options(*task_summary_options())
+    ).scalars().all()
+
+
+@router.get("/reminders", response_model=List[DeadlineReminder])
+def read_reminders(
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """期限の通知を登録順に返す（前回の最後の id を after_id に指定して続きを取得する）"""
+    rows = db.execute(
+        select(DeadlineReminderModel, TaskModel.title)
+        .join(TaskModel, TaskModel.id == DeadlineReminderModel.task_id)
+        .where(DeadlineReminderModel.id > after_id)
+        .order_by(DeadlineReminderModel.id)
+        .limit(limit)
+    ).all()
+    return [
+        DeadlineReminder(
+            id=reminder.id, task_id=reminder.task_id, task_title=title,
+            kind=reminder.kind, deadline=reminder.deadline, created_at=reminder.created_at,
+        )
+        for reminder, title in rows
+    ]
@@ -0,0 +1,106 @@
+"""アプリ内のバックグラウンドスケジューラ
+
+アプリの起動時に asyncio のタスクとして動き、登録したジョブを一定間隔で実行する。
+ジョブは DB を使う同期関数のため、ワーカースレッドで実行してイベントループを止めない。
+ジョブが例外を出してもログに残して次の周期で再実行する（スケジューラ自体は止めない）。
+
+複数ワーカー（gunicorn.conf.py）で起動した場合も、同じ DB に対してジョブを実行するのは1プロセスだけにする。
+各ワーカーは周期ごとにロックファイルの排他ロック（flock）を取りにいき、取れたワーカーだけが実行する。
+ロックはプロセスの終了で OS が解放するため、実行中のワーカーが落ちても次の周期で別のワーカーが引き継ぐ。
+プロセス内の状態を扱うジョブ（leader_only=False）はロックを取らずに全ワーカーで実行する。
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows ではロックせずに実行する（複数ワーカーでの起動は想定しない）
+    fcntl = None
+
+from .database import SQLALCHEMY_DATABASE_URL
+
+logger = logging.getLogger("bizbuddy")
+
+# ジョブの実行間隔（秒）。0 でスケジューラを無効にする
+SCHEDULER_INTERVAL = float(os.getenv("BIZBUDDY_SCHEDULER_INTERVAL", "300"))
+# ワーカー間でジョブの実行者を1つに決めるロックファイル（既定は一時ディレクトリに DB の URL ごとに作る）
+SCHEDULER_LOCK = os.getenv("BIZBUDDY_SCHEDULER_LOCK") or os.path.join(
+    tempfile.gettempdir(),
+    f"bizbuddy-scheduler-{hashlib.sha1(SQLALCHEMY_DATABASE_URL.encode()).hexdigest()[:12]}.lock",
+)
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], object]
+    interval: float
+    leader_only: bool = True
+
+
+class LeaderLock:
+    """ロックファイルの排他ロック。取れたプロセスがジョブを実行する（取れたら終了まで持ち続ける）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        if fcntl is None or self._file is not None:
+            return True
+        file = open(self.path, "a")
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            file.close()
+            return False
+        self._file = file
+        return True
+
+    def release(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Scheduler:
+    def __init__(self, lock: Optional[LeaderLock] = None):
+        self.jobs: List[Job] = []
+        self.lock = lock or LeaderLock(SCHEDULER_LOCK)
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, func: Callable[[], object], interval: float, leader_only: bool = True) -> None:
+        self.jobs.append(Job(name, func, interval, leader_only))
+
+    def start(self) -> None:
+        """起動直後に1回実行し、以降は interval ごとに実行する"""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._run(job), name=f"scheduler:{job.name}") for job in self.jobs]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.lock.release()
+
+    async def _run(self, job: Job) -> None:
+        while True:
+            started = time.perf_counter()
+            if job.leader_only and not self.lock.acquire():
+                # 別のワーカーが実行している
+                await asyncio.sleep(job.interval)
+                continue
+            try:
+                result = await asyncio.to_thread(job.func)
+                logger.debug(f"Scheduled job {job.name} finished in {time.perf_counter() - started:.3f}s: {result}")
+            except Exception:
+                logger.exception(f"Scheduled job {job.name} failed")
+            await asyncio.sleep(max(job.interval - (time.perf_counter() - started), 0))
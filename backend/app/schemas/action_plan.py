@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
 
 class ActionItemBase(BaseModel):
@@ -29,6 +29,8 @@ class LeafTask(LeafTaskBase):
     id: int
     sub_task_id: int
     action_items: List[ActionItem] = []
+    completed_count: int = 0
+    total_count: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -46,8 +48,63 @@ class SubTask(SubTaskBase):
     id: int
     task_id: int
     leaf_tasks: List[LeafTask] = []
+    completed_count: int = 0
+    total_count: int = 0
     created_at: datetime
     updated_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class Progress(BaseModel):
+    completed: int = 0
+    total: int = 0
+    percentage: int = 0
+
+    @classmethod
+    def from_counts(cls, completed: int, total: int) -> "Progress":
+        percentage = round(completed / total * 100) if total else 0
+        return cls(completed=completed, total=total, percentage=percentage)
+
+class LeafTaskTree(LeafTask):
+    progress: Progress
+
+class SubTaskTree(SubTask):
+    leaf_tasks: List[LeafTaskTree] = []
+    progress: Progress
+
+class LeafTaskProgress(BaseModel):
+    id: int
+    progress: Progress
+
+class SubTaskProgress(BaseModel):
+    id: int
+    progress: Progress
+    leaf_tasks: List[LeafTaskProgress] = []
+
+class ActionPlanProgress(BaseModel):
+    task_id: int
+    progress: Progress
+    sub_tasks: List[SubTaskProgress] = []
+
+class ActionPlanTree(BaseModel):
+    task_id: int
+    title: str
+    sub_tasks: List[SubTaskTree] = []
+    progress: Progress
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    entity: Literal["sub_task", "leaf_task", "action_item"]
+    id: Optional[int] = None  # update / delete の対象
+    parent_id: Optional[int] = None  # create 時の親（task / sub_task / leaf_task）
+    data: Dict[str, Any] = {}
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., max_length=500)
+
+class BatchResult(BaseModel):
+    op: str
+    entity: str
+    id: int
+    data: Optional[Dict[str, Any]] = None  # delete の場合は None
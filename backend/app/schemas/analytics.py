@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Literal, Optional
+
+WorkTimeGroup = Literal["task", "status", "day", "week"]
+
+class WorkTimeRow(BaseModel):
+    # group_by に含まれない項目は None
+    task_id: Optional[int] = None
+    task_title: Optional[str] = None
+    status: Optional[str] = None
+    day: Optional[date] = None
+    week: Optional[date] = None  # 週の開始日（月曜日）
+    seconds: int
+    minutes: float
+    log_count: int
+
+class WorkTimeReport(BaseModel):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    group_by: List[WorkTimeGroup]
+    total_seconds: int
+    total_minutes: float
+    log_count: int
+    rows: List[WorkTimeRow]
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import List
+from .task import TaskBase
+from .work_log import WorkLog
+from .action_plan import ActionItem
+from .sync import SyncSubTask, SyncLeafTask
+
+# アーカイブ済みタスクの一覧（GET /archive/tasks）の1件
+class ArchivedTask(TaskBase):
+    id: int
+    priority_score: float
+    motivation_score: float
+    completed_count: int = 0
+    total_count: int = 0
+    created_at: datetime
+    last_updated: datetime
+    archived_at: datetime
+
+# アーカイブ済みタスクの詳細（アクションプランは差分同期と同じフラットな形で返す）
+class ArchivedTaskDetail(ArchivedTask):
+    work_logs: List[WorkLog] = []
+    sub_tasks: List[SyncSubTask] = []
+    leaf_tasks: List[SyncLeafTask] = []
+    action_items: List[ActionItem] = []
+    memo_ids: List[int] = []
+    category_ids: List[int] = []
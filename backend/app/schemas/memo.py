@@ -20,4 +20,17 @@ class Memo(MemoBase):
         return [task.id for task in self.tasks]
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+# GET /task-memos で一度に指定できるタスク数
+MAX_TASK_MEMO_IDS = 500
+
+class MemoSummary(BaseModel):
+    id: int
+    content: str
+    created_at: datetime
+
+class TaskMemos(BaseModel):
+    task_id: int
+    memo_count: int
+    memos: List[MemoSummary] = []  # counts_only=true のときは空
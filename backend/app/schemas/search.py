@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Literal, Optional
+
+SearchEntity = Literal["task", "memo", "work_log", "action_item"]
+
+class SearchHit(BaseModel):
+    entity: SearchEntity
+    id: int
+    title: Optional[str] = None
+    snippet: str  # 一致箇所を <mark> で囲んだ抜粋（HTML。本文はエスケープ済み）
+    score: Optional[float] = None  # bm25（小さいほど関連度が高い）
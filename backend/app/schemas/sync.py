@@ -0,0 +1,65 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Literal
+from .task import TaskBase
+from .memo import MemoBase
+from .work_log import WorkLog
+from .action_plan import ActionItem, SubTaskBase, LeafTaskBase
+
+SyncEntity = Literal["task", "work_log", "memo", "sub_task", "leaf_task", "action_item"]
+
+# 差分同期ではリレーションを埋め込まず、各エンティティを親の ID だけを持つフラットな形で返す
+class SyncTask(TaskBase):
+    id: int
+    priority_score: float
+    motivation_score: float
+    completed_count: int = 0
+    total_count: int = 0
+    created_at: datetime
+    last_updated: datetime
+
+    class Config:
+        from_attributes = True
+
+class SyncMemo(MemoBase):
+    id: int
+    created_at: datetime
+    task_ids: List[int] = []
+
+class SyncSubTask(SubTaskBase):
+    id: int
+    task_id: int
+    completed_count: int = 0
+    total_count: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class SyncLeafTask(LeafTaskBase):
+    id: int
+    sub_task_id: int
+    completed_count: int = 0
+    total_count: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class SyncTombstone(BaseModel):
+    entity: SyncEntity
+    id: int
+
+class SyncResponse(BaseModel):
+    since: int
+    version: int  # 次回の since に指定する値
+    has_more: bool  # true なら version を since にして続きを取得する
+    tasks: List[SyncTask] = []
+    work_logs: List[WorkLog] = []
+    memos: List[SyncMemo] = []
+    sub_tasks: List[SyncSubTask] = []
+    leaf_tasks: List[SyncLeafTask] = []
+    action_items: List[ActionItem] = []
+    deleted: List[SyncTombstone] = []
@@ -1,21 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-class WorkLogBase(BaseModel):
-    description: str
-    started_at: datetime
-    ended_at: Optional[datetime] = None
-
-class WorkLogCreate(WorkLogBase):
-    pass
-
-class WorkLog(WorkLogBase):
-    id: int
-    task_id: int
-
-    class Config:
-        from_attributes = True
+# 作業ログのスキーマ（入力の検証を含む）は work_log.py の定義を使う
+from .work_log import WorkLogBase, WorkLogCreate, WorkLog  # noqa: F401
 
 class CategoryBase(BaseModel):
     name: str
@@ -46,10 +34,40 @@ class Task(TaskBase):
     id: int
     priority_score: float
     motivation_score: float
+    completed_count: int = 0
+    total_count: int = 0
     created_at: datetime
     last_updated: datetime
     categories: List[Category] = []
     work_logs: List[WorkLog] = []
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+# GET /tasks/ の表現（summary: TaskSummary / full: 詳細と同じ Task）
+TaskListView = Literal["summary", "full"]
+
+# 一覧用の軽量な表現（categories / work_logs の代わりに作業ログの集計値を返す）
+class TaskSummary(TaskBase):
+    id: int
+    priority_score: float
+    motivation_score: float
+    completed_count: int = 0
+    total_count: int = 0
+    created_at: datetime
+    last_updated: datetime
+    work_log_count: int = 0
+    logged_minutes: float = 0
+    last_activity_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# POST /tasks/bulk の操作（子・関連付けは DB のカスケード削除で消える）
+class TaskBulkRequest(BaseModel):
+    action: Literal["delete", "complete"]
+    task_ids: List[int] = Field(..., min_length=1, max_length=500)
+
+class TaskBulkResult(BaseModel):
+    action: str
+    task_ids: List[int]
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Literal, Optional
+from .task import TaskSummary
+
+ReminderKind = Literal["approaching", "overdue"]
+
+# GET /tasks/next の1件（緊急度の高い順）
+class NextTask(TaskSummary):
+    urgency_score: float
+    urgency_updated_at: Optional[datetime] = None
+
+class DeadlineReminder(BaseModel):
+    id: int
+    task_id: int
+    task_title: str
+    kind: ReminderKind
+    deadline: datetime
+    created_at: datetime
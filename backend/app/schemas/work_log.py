@@ -1,18 +1,32 @@
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, model_validator
+from datetime import datetime, timedelta
 from typing import Optional
 
+from ..models.task import to_jst
+
+# 1件の作業ログとして受け付ける最長の期間（日付をまたぐ分は日ごとに集計するため、誤入力で膨らませない）
+MAX_WORK_LOG_DURATION = timedelta(days=7)
+
 class WorkLogBase(BaseModel):
     description: str
     started_at: datetime
     ended_at: Optional[datetime] = None
 
 class WorkLogCreate(WorkLogBase):
-    pass
+    @model_validator(mode="after")
+    def _check_duration(self):
+        if self.ended_at is not None:
+            # タイムゾーンの有無が混ざっていても比べられるよう、保存するときと同じ JST にそろえる
+            duration = to_jst(self.ended_at) - to_jst(self.started_at)
+            if duration < timedelta(0):
+                raise ValueError("ended_at must not be earlier than started_at")
+            if duration > MAX_WORK_LOG_DURATION:
+                raise ValueError(f"A work log cannot be longer than {MAX_WORK_LOG_DURATION.days} days")
+        return self
 
 class WorkLog(WorkLogBase):
     id: int
     task_id: int
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
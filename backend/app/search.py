@@ -0,0 +1,186 @@
+"""SQLite FTS5 による全文検索インデックス
+
+タスク・メモ・作業ログ・アクションアイテムの本文を1つの FTS5 テーブル（trigram トークナイザ）に集約する。
+rowid は「元の id * 4 + 種別番号」とし、元テーブルのトリガーから rowid 指定で同期するため
+更新・削除もインデックス全体を走査しない。
+"""
+import html
+import re
+from typing import List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+SEARCH_TABLE = "search_index"
+
+# 種別 -> (rowid 上の番号, 元テーブル, タイトル列, 本文列)
+SEARCH_SOURCES = {
+    "task": (0, "tasks", "title", "description"),
+    "memo": (1, "memos", None, "content"),
+    "work_log": (2, "work_logs", None, "description"),
+    "action_item": (3, "action_items", None, "content"),
+}
+ENTITY_BY_CODE = {code: entity for entity, (code, _, _, _) in SEARCH_SOURCES.items()}
+KINDS = len(SEARCH_SOURCES)
+
+# trigram トークナイザは3文字未満の語を MATCH できないため、短い語は LIKE で絞り込む
+MIN_MATCH_LENGTH = 3
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# snippet() に渡す一致箇所の目印。本文をエスケープしてから <mark> に置き換える（本文に現れない制御文字）
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+SNIPPET_TOKENS = 16
+# タイトルの一致を本文より重く評価する（bm25 の列ごとの重み）
+TITLE_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+
+
+def _trigger_statements(entity: str) -> List[str]:
+    code, table, title_column, body_column = SEARCH_SOURCES[entity]
+    title = f"new.{title_column}" if title_column else "''"
+    columns = ", ".join(column for column in (title_column, body_column) if column)
+    insert = (
+        f"INSERT INTO {SEARCH_TABLE}(rowid, title, body) "
+        f"VALUES (new.id * {KINDS} + {code}, {title}, new.{body_column});"
+    )
+    delete = f"DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id * {KINDS} + {code};"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE OF {columns} ON {table} "
+        f"BEGIN {delete} {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN {delete} END",
+    ]
+
+
+def is_supported(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def install_search_index(engine: Engine) -> None:
+    """FTS テーブルと同期用トリガーを作成する。テーブルを新規作成した場合は既存データを取り込む"""
+    if not is_supported(engine):
+        return
+    with engine.begin() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SEARCH_TABLE},
+        ).first()
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+            "USING fts5(title, body, tokenize = 'trigram')"
+        ))
+        install_search_triggers(connection)
+        if not exists:
+            rebuild_search_index(connection)
+
+
+def install_search_triggers(connection: Connection) -> None:
+    for entity in SEARCH_SOURCES:
+        for statement in _trigger_statements(entity):
+            connection.execute(text(statement))
+
+
+def drop_search_triggers(connection: Connection) -> None:
+    """一括投入の間だけ行ごとの同期を止める（投入後に rebuild_search_index と install_search_triggers を呼ぶ）"""
+    for _, table, _, _ in SEARCH_SOURCES.values():
+        for suffix in ("ai", "au", "ad"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {table}_search_{suffix}"))
+
+
+def rebuild_search_index(connection: Connection) -> None:
+    """インデックスを元テーブルから作り直す"""
+    connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    for code, table, title_column, body_column in SEARCH_SOURCES.values():
+        title = title_column or "''"
+        connection.execute(text(
+            f"INSERT INTO {SEARCH_TABLE}(rowid, title, body) "
+            f"SELECT id * {KINDS} + {code}, {title}, {body_column} FROM {table}"
+        ))
+    connection.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"))
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _like_pattern(term: str) -> str:
+    return "%" + re.sub(r"([\\%_])", r"\\\1", term) + "%"
+
+
+def _escape_snippet(snippet: Optional[str]) -> str:
+    """snippet() の結果を HTML としてエスケープし、一致箇所の目印だけを <mark> にする"""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(SNIPPET_START, HIGHLIGHT_START).replace(SNIPPET_END, HIGHLIGHT_END)
+
+
+def highlight(value: Optional[str], terms: Sequence[str], width: int = 60) -> str:
+    """MATCH を使わない検索結果向けに、最初の一致箇所の周辺を切り出して強調する（本文は HTML としてエスケープする）"""
+    value = value or ""
+    lowered = value.lower()
+    positions = [lowered.find(term.lower()) for term in terms if term]
+    positions = [position for position in positions if position >= 0]
+    start = max(min(positions) - width // 2, 0) if positions else 0
+    excerpt = value[start:start + width]
+    words = sorted({term for term in terms if term}, key=len, reverse=True)
+    parts = []
+    last = 0
+    if words:
+        # 長い語を優先して1回で走査する（強調済みの部分を再び置き換えない）
+        for m in re.finditer("|".join(map(re.escape, words)), excerpt, flags=re.IGNORECASE):
+            parts.append(html.escape(excerpt[last:m.start()]))
+            parts.append(f"{HIGHLIGHT_START}{html.escape(m.group(0))}{HIGHLIGHT_END}")
+            last = m.end()
+    parts.append(html.escape(excerpt[last:]))
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + width < len(value) else ""
+    return prefix + "".join(parts) + suffix
+
+
+def search(connection: Connection, q: str, entities: Optional[Sequence[str]] = None, limit: int = 20) -> List[dict]:
+    """全文検索を行い、関連度順（MATCH できない短い語だけの場合は新しい順）に返す"""
+    terms = q.split()
+    match_terms = [term for term in terms if len(term) >= MIN_MATCH_LENGTH]
+    like_terms = [term for term in terms if len(term) < MIN_MATCH_LENGTH]
+    if not terms:
+        return []
+
+    conditions = []
+    params = {"limit": limit}
+    if match_terms:
+        conditions.append(f"{SEARCH_TABLE} MATCH :match")
+        params["match"] = " ".join(_quote(term) for term in match_terms)
+    for index, term in enumerate(like_terms):
+        conditions.append(f"(title LIKE :like{index} ESCAPE '\\' OR body LIKE :like{index} ESCAPE '\\')")
+        params[f"like{index}"] = _like_pattern(term)
+    if entities:
+        codes = ", ".join(str(SEARCH_SOURCES[entity][0]) for entity in entities)
+        conditions.append(f"rowid % {KINDS} IN ({codes})")
+
+    if match_terms:
+        columns = (
+            f"snippet({SEARCH_TABLE}, -1, char({ord(SNIPPET_START)}), char({ord(SNIPPET_END)}), '…', {SNIPPET_TOKENS}) AS snippet, "
+            f"bm25({SEARCH_TABLE}, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score"
+        )
+        order = "score"
+    else:
+        columns = "body AS snippet, NULL AS score"
+        order = "rowid DESC"
+
+    rows = connection.execute(text(
+        f"SELECT rowid, title, {columns} FROM {SEARCH_TABLE} "
+        f"WHERE {' AND '.join(conditions)} ORDER BY {order} LIMIT :limit"
+    ), params)
+
+    hits = []
+    for rowid, title, snippet, score in rows:
+        snippet = _escape_snippet(snippet) if match_terms else highlight(snippet, like_terms)
+        hits.append({
+            "entity": ENTITY_BY_CODE[rowid % KINDS],
+            "id": rowid // KINDS,
+            "title": title or None,
+            "snippet": snippet,
+            "score": score,
+        })
+    return hits
@@ -0,0 +1,121 @@
+"""高速レスポンスモード用のシリアライザ
+
+ORM から読んだ行は型が保証されているため、Pydantic での再検証と jsonable_encoder を通さず、
+スキーマ（schemas/task.py・schemas/memo.py）と同じキー順の dict を直接組み立てて orjson で出力する。
+BIZBUDDY_FAST_RESPONSES を有効にすると一覧系のエンドポイントがこの経路を使う。
+?fields= による項目の絞り込みは設定に関わらずこの経路で処理する。
+"""
+import os
+from typing import Callable, Iterable, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import load_only, selectinload
+
+from .metrics import measure_serialization
+from .models import Task as TaskModel, Memo as MemoModel
+from .queries import TASK_SUMMARY_AGGREGATES, task_load_options, task_summary_options, memo_load_options
+
+FAST_RESPONSES = os.getenv("BIZBUDDY_FAST_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+# スキーマの出力順と同じ並び
+TASK_FIELDS = (
+    "title", "description", "motivation", "priority", "deadline", "estimated_time", "status",
+    "id", "priority_score", "motivation_score", "completed_count", "total_count",
+    "created_at", "last_updated", "categories", "work_logs",
+)
+TASK_RELATIONS = {"categories": TaskModel.categories, "work_logs": TaskModel.work_logs}
+TASK_SUMMARY_FIELDS = tuple(field for field in TASK_FIELDS if field not in TASK_RELATIONS) + TASK_SUMMARY_AGGREGATES
+MEMO_FIELDS = ("content", "id", "created_at", "tasks", "task_ids")
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[Tuple[str, ...]]:
+    """"id,title,status" 形式の指定を検証し、スキーマの順に並べた項目名を返す（未指定なら None）"""
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in allowed if field in requested)
+
+
+def task_projection_options(fields: Optional[Sequence[str]], summary: bool = False):
+    """指定された項目に必要な列・リレーション・集計だけをロードするオプション"""
+    if fields is None:
+        return task_summary_options() if summary else task_load_options()
+    columns = [
+        getattr(TaskModel, field) for field in fields
+        if field not in TASK_RELATIONS and field not in TASK_SUMMARY_AGGREGATES
+    ]
+    # キーセットページネーションのカーソルに使う列は常に読む
+    columns += [TaskModel.id, TaskModel.created_at]
+    return (
+        (load_only(*columns),)
+        + tuple(selectinload(relation) for field, relation in TASK_RELATIONS.items() if field in fields)
+        + task_summary_options([field for field in TASK_SUMMARY_AGGREGATES if field in fields])
+    )
+
+
+def category_to_dict(category) -> dict:
+    return {"name": category.name, "type": category.type, "id": category.id}
+
+
+def work_log_to_dict(work_log) -> dict:
+    return {
+        "description": work_log.description,
+        "started_at": work_log.started_at,
+        "ended_at": work_log.ended_at,
+        "id": work_log.id,
+        "task_id": work_log.task_id,
+    }
+
+
+def task_to_dict(task, fields: Sequence[str] = TASK_FIELDS) -> dict:
+    data = {}
+    for field in fields:
+        if field == "categories":
+            data[field] = [category_to_dict(category) for category in task.categories]
+        elif field == "work_logs":
+            data[field] = [work_log_to_dict(work_log) for work_log in task.work_logs]
+        else:
+            data[field] = getattr(task, field)
+    return data
+
+
+def task_summary_to_dict(task, fields: Sequence[str] = TASK_SUMMARY_FIELDS) -> dict:
+    return task_to_dict(task, fields)
+
+
+def memo_to_dict(memo, fields: Sequence[str] = MEMO_FIELDS) -> dict:
+    data = {}
+    for field in fields:
+        if field == "tasks":
+            data[field] = [task_to_dict(task) for task in memo.tasks]
+        elif field == "task_ids":
+            data[field] = [task.id for task in memo.tasks]
+        else:
+            data[field] = getattr(memo, field)
+    return data
+
+
+def use_fast_path(fields: Optional[Sequence[str]]) -> bool:
+    """設定で有効にした場合か、?fields= が指定された場合に高速経路を使う"""
+    return FAST_RESPONSES or fields is not None
+
+
+def fast_response(rows: Iterable, serialize: Callable, fields: Optional[Sequence[str]], response: Response) -> ORJSONResponse:
+    """検証を通さずに orjson でレスポンスを作る。依存関係の Response に設定したヘッダーも引き継ぐ"""
+    with measure_serialization():
+        content = [serialize(row, fields) if fields is not None else serialize(row) for row in rows]
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+        return ORJSONResponse(content, headers=headers)
+
+
+def memo_projection_options(fields: Optional[Sequence[str]]):
+    """埋め込みタスクは必要な場合だけロードする（task_ids だけならタスクの ID のみ）"""
+    if fields is None or "tasks" in fields:
+        return memo_load_options()
+    if "task_ids" in fields:
+        return (selectinload(MemoModel.tasks).load_only(TaskModel.id),)
+    return ()
@@ -0,0 +1,199 @@
+"""差分同期（GET /sync?since=N）のための変更履歴
+
+flush のたびに、変更されたエンティティ（events.py と同じ検出）を同じトランザクション内で
+change_log に追記する。ORM のオブジェクトを通らない変更も記録する:
+進捗カウンタの UPDATE（models/progress.py）で値が変わった親の行と、
+タスクの削除で関連付け（memo_task）が外れたメモは更新として扱う。
+
+/sync は since より後の履歴を (エンティティ, id) ごとにまとめ、現在の行を返す。
+行が存在しなければ削除（トゥームストーン）として返す。
+履歴が since まで遡れない場合（古い履歴の削除・インポート）は 410 を返し、全件の再取得を求める。
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from .events import CHANGE_LOG_WRITTEN_KEY, EVENT_ENTITIES, changed_entities
+from .models import Task, WorkLog as WorkLogModel, Memo, SubTask, LeafTask, ActionItem as ActionItemModel, ChangeLogEntry
+from .models.change_log import RESET_OP
+from .models.memo import memo_task
+from .models.progress import COUNTER_UPDATES_KEY
+from .schemas.sync import SyncResponse, SyncTask, SyncMemo, SyncSubTask, SyncLeafTask, SyncTombstone
+from .schemas.work_log import WorkLog
+from .schemas.action_plan import ActionItem
+
+PENDING_KEY = "pending_change_log"
+
+# エンティティ名 -> (モデル, レスポンスの項目名, スキーマ)
+SYNC_ENTITIES = {
+    "task": (Task, "tasks", SyncTask),
+    "work_log": (WorkLogModel, "work_logs", WorkLog),
+    "memo": (Memo, "memos", SyncMemo),
+    "sub_task": (SubTask, "sub_tasks", SyncSubTask),
+    "leaf_task": (LeafTask, "leaf_tasks", SyncLeafTask),
+    "action_item": (ActionItemModel, "action_items", ActionItem),
+}
+
+# /sync の1回で返すエンティティ数の上限
+MAX_SYNC_LIMIT = 5000
+
+# IN 句に並べる ID の数（SQLite のパラメータ数上限より十分小さく）
+ID_CHUNK_SIZE = 500
+
+
+def _pending(session) -> List[Tuple[str, int, str, Optional[int]]]:
+    return session.info.setdefault(PENDING_KEY, [])
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_unlinked_memos(session, flush_context, instances):
+    """削除されるタスクに関連付けられたメモ（関連付けの行は flush 中に消えるため先に引く）"""
+    task_ids = [obj.id for obj in session.deleted if isinstance(obj, Task) and obj.id is not None]
+    if not task_ids:
+        return
+    memo_ids = session.connection().execute(
+        select(memo_task.c.memo_id).where(memo_task.c.task_id.in_(task_ids))
+    ).scalars()
+    _pending(session).extend(("memo", memo_id, "update", None) for memo_id in memo_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    _pending(session).extend(
+        (change["entity"], change["id"], change["op"], change["task_id"]) for change in changed_entities(session)
+    )
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _write_change_log(session, flush_context):
+    """進捗カウンタは after_flush で更新されるため、その後に書き込む"""
+    entries = session.info.pop(PENDING_KEY, [])
+    for model, row_id in session.info.pop(COUNTER_UPDATES_KEY, ()):
+        entity, _, task_key = EVENT_ENTITIES[model]
+        # 親の ID は読み込んでいないため、記録できるのはタスク自身だけ
+        entries.append((entity, row_id, "update", row_id if task_key == "id" else None))
+    if not entries:
+        return
+    now = datetime.utcnow()
+    seen = set()
+    rows = []
+    for entity, row_id, op, task_id in entries:
+        if (entity, row_id) in seen:
+            continue
+        seen.add((entity, row_id))
+        rows.append({"entity": entity, "row_id": row_id, "op": op, "task_id": task_id, "changed_at": now})
+    session.connection().execute(insert(ChangeLogEntry), rows)
+    # このプロセスの /events にはポーリングを待たずに読ませる（コミット後。app/events.py）
+    session.info[CHANGE_LOG_WRITTEN_KEY] = True
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changes(session, previous_transaction):
+    session.info.pop(PENDING_KEY, None)
+    session.info.pop(COUNTER_UPDATES_KEY, None)
+
+
+def mark_reset(connection: Connection) -> None:
+    """これより前の履歴を差分同期に使えないことを記録する（一括インポートの後など）"""
+    connection.execute(insert(ChangeLogEntry).values(
+        entity="workspace", row_id=0, op=RESET_OP, changed_at=datetime.utcnow()
+    ))
+
+
+def install_change_log(engine) -> None:
+    """履歴が空のまま既存のデータがある DB（履歴の導入前から使っている DB）には reset を記録する"""
+    with engine.begin() as connection:
+        if connection.execute(select(ChangeLogEntry.seq).limit(1)).first() is not None:
+            return
+        if any(connection.execute(select(model.id).limit(1)).first() is not None for model, _, _ in SYNC_ENTITIES.values()):
+            mark_reset(connection)
+
+
+def prune_change_log(db: Session, older_than_days: int) -> int:
+    """古い履歴を削除し、削除件数を返す（最新の1件は現在のバージョンを保つため残す）"""
+    latest = db.scalar(select(func.max(ChangeLogEntry.seq)))
+    if latest is None:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    result = db.execute(
+        delete(ChangeLogEntry).where(ChangeLogEntry.changed_at < cutoff, ChangeLogEntry.seq < latest)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def _gone(version: int) -> HTTPException:
+    return HTTPException(
+        status_code=410,
+        detail={"message": "Change history is not available; reload everything and sync from version", "version": version},
+    )
+
+
+def _memo_task_ids(db: Session, memo_ids: List[int]) -> Dict[int, List[int]]:
+    task_ids = defaultdict(list)
+    for start in range(0, len(memo_ids), ID_CHUNK_SIZE):
+        rows = db.execute(
+            select(memo_task.c.memo_id, memo_task.c.task_id)
+            .where(memo_task.c.memo_id.in_(memo_ids[start:start + ID_CHUNK_SIZE]))
+            .order_by(memo_task.c.memo_id, memo_task.c.task_id)
+        )
+        for memo_id, task_id in rows:
+            task_ids[memo_id].append(task_id)
+    return task_ids
+
+
+def sync_changes(db: Session, since: int, limit: int) -> SyncResponse:
+    """since より後に変更されたエンティティの現在の状態と、削除されたエンティティを返す"""
+    current = db.scalar(select(func.max(ChangeLogEntry.seq))) or 0
+    oldest = db.scalar(select(func.min(ChangeLogEntry.seq)))
+    if since > current or (oldest is not None and oldest - 1 > since):
+        raise _gone(current)
+    reset = db.scalar(select(ChangeLogEntry.seq).where(ChangeLogEntry.seq > since, ChangeLogEntry.op == RESET_OP).limit(1))
+    if reset is not None:
+        raise _gone(current)
+
+    # 同じ行の変更は最後の1回にまとめ、その順に limit 件を返す
+    last_seq = func.max(ChangeLogEntry.seq).label("seq")
+    changed = db.execute(
+        select(ChangeLogEntry.entity, ChangeLogEntry.row_id, last_seq)
+        .where(ChangeLogEntry.seq > since)
+        .group_by(ChangeLogEntry.entity, ChangeLogEntry.row_id)
+        .order_by(last_seq)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(changed) > limit
+    changed = changed[:limit]
+    if has_more:
+        version = changed[-1].seq
+    else:
+        version = max([current] + [row.seq for row in changed])
+
+    ids_by_entity = defaultdict(list)
+    for entity, row_id, _ in changed:
+        ids_by_entity[entity].append(row_id)
+
+    response = SyncResponse(since=since, version=version, has_more=has_more)
+    for entity, ids in ids_by_entity.items():
+        model, key, schema = SYNC_ENTITIES[entity]
+        found = {}
+        for start in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[start:start + ID_CHUNK_SIZE]
+            found.update((row.id, row) for row in db.execute(select(model).where(model.id.in_(chunk))).scalars())
+        if entity == "memo":
+            task_ids = _memo_task_ids(db, list(found))
+            items = [
+                SyncMemo(id=memo.id, content=memo.content, created_at=memo.created_at, task_ids=task_ids.get(memo.id, []))
+                for memo in found.values()
+            ]
+        else:
+            items = [schema.model_validate(row) for row in found.values()]
+        setattr(response, key, sorted(items, key=lambda item: item.id))
+        response.deleted.extend(
+            SyncTombstone(entity=entity, id=row_id) for row_id in sorted(set(ids) - set(found))
+        )
+    return response
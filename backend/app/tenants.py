@@ -0,0 +1,298 @@
+"""マルチテナントモード（ユーザー・ワークスペースごとの SQLite ファイル）
+
+BIZBUDDY_TENANT_MODE を有効にすると、リクエストヘッダー（TENANT_HEADER）で指定されたテナントごとに
+別の SQLite ファイルを使う。書き込みロックはファイル単位のため、テナントが増えても互いの書き込みを待たない。
+
+- テナントのファイルは TENANT_DATA_DIRS のいずれかに置く。既にあるファイルはその場所を使い、新しいテナントは
+  rendezvous hashing で決めたディレクトリに作る（ディレクトリを追加しても既存のテナントは移らない）。
+  ディレクトリを別のディスクに分ければ、書き込みの I/O もテナント数に応じて分散できる
+- 開いたエンジンは TENANT_MAX_ENGINES 個まで LRU で保持し、あふれた分と TENANT_IDLE_SECONDS 以上使われていない分は
+  接続を閉じる（次のリクエストで開き直す）。使われていない分は新しいテナントを開くときのほか、
+  各ワーカーのスケジューラ（TENANT_EVICT_INTERVAL ごと）でも閉じる
+- 初めて開くときにスキーマを最新のリビジョンまで移行する（ファイルロックで同じテナントの移行が競合しないようにする）。
+  このプロセスで一度確かめたテナントは、閉じて開き直しても確かめない
+- テナントの指定は認証済みのプロキシ等が付ける前提で、このアプリでは名前の形式だけを検証する
+- 非同期モード（BIZBUDDY_ASYNC_DB）とは併用できない
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows ではロックしない（複数プロセスでの起動は想定しない）
+    fcntl = None
+
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+from .database import Database, USE_ASYNC_DB, create_db_engine, default_database, use_database
+from .migrate import current_revision, head_revision, upgrade_database
+
+logger = logging.getLogger("bizbuddy")
+
+TENANT_MODE = os.getenv("BIZBUDDY_TENANT_MODE", "false").lower() in ("1", "true", "yes")
+TENANT_HEADER = os.getenv("BIZBUDDY_TENANT_HEADER", "X-BizBuddy-Workspace")
+# テナントのファイルを置くディレクトリ（os.pathsep 区切りで複数指定するとテナントを振り分ける）
+TENANT_DATA_DIRS = [path for path in os.getenv("BIZBUDDY_TENANT_DATA_DIRS", "./tenants").split(os.pathsep) if path]
+# 接続を開いたままにするテナント数
+TENANT_MAX_ENGINES = int(os.getenv("BIZBUDDY_TENANT_MAX_ENGINES", "64"))
+# この秒数使われていないテナントの接続を閉じる
+TENANT_IDLE_SECONDS = float(os.getenv("BIZBUDDY_TENANT_IDLE_SECONDS", "600"))
+# 使われていないテナントの接続を閉じに行く間隔（秒）
+TENANT_EVICT_INTERVAL = min(TENANT_IDLE_SECONDS, 60.0)
+# テナントごとのコネクションプールのサイズ（SQLite の書き込みは1つずつのため小さくてよい）
+TENANT_POOL_SIZE = int(os.getenv("BIZBUDDY_TENANT_POOL_SIZE", "2"))
+
+TENANT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+TENANT_FILE_SUFFIX = ".db"
+
+# テナントを指定せずに呼べるパス
+PUBLIC_PATHS = {"/", "/healthz", "/readyz", "/metrics", "/docs", "/redoc", "/openapi.json"}
+
+if TENANT_MODE and USE_ASYNC_DB:
+    raise RuntimeError("BIZBUDDY_TENANT_MODE cannot be combined with BIZBUDDY_ASYNC_DB")
+
+
+class TenantError(ValueError):
+    """テナントが指定されていない・名前が不正"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def validate_tenant(name: Optional[str]) -> str:
+    if not name:
+        raise TenantError(f"{TENANT_HEADER} header is required")
+    if not TENANT_NAME_PATTERN.match(name):
+        raise TenantError("Invalid tenant name")
+    return name
+
+
+def shard_for(tenant: str, data_dirs: List[str] = TENANT_DATA_DIRS) -> str:
+    """新しいテナントを置くディレクトリ（rendezvous hashing。ディレクトリを足しても移るのは新しい分だけ）"""
+    return max(data_dirs, key=lambda path: hashlib.sha1(f"{path}\0{tenant}".encode()).digest())
+
+
+def tenant_path(tenant: str, data_dirs: List[str] = TENANT_DATA_DIRS) -> str:
+    filename = tenant + TENANT_FILE_SUFFIX
+    for path in data_dirs:
+        if os.path.exists(os.path.join(path, filename)):
+            return os.path.abspath(os.path.join(path, filename))
+    return os.path.abspath(os.path.join(shard_for(tenant, data_dirs), filename))
+
+
+def list_tenants(data_dirs: List[str] = TENANT_DATA_DIRS) -> List[str]:
+    tenants = set()
+    for path in data_dirs:
+        if not os.path.isdir(path):
+            continue
+        for filename in os.listdir(path):
+            name, suffix = os.path.splitext(filename)
+            if suffix == TENANT_FILE_SUFFIX and TENANT_NAME_PATTERN.match(name):
+                tenants.add(name)
+    return sorted(tenants)
+
+
+@contextmanager
+def _file_lock(path: str):
+    with open(path, "a") as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        yield
+
+
+_head_revision: Optional[str] = None
+# このプロセスで最新のリビジョンであることを確かめたテナントのファイル
+_migrated_paths: Set[str] = set()
+
+
+def ensure_schema(database: Database, path: str) -> None:
+    """最新のリビジョンでなければ移行する（他のワーカーが移行中なら終わるまで待つ）"""
+    global _head_revision
+    if path in _migrated_paths:
+        return
+    if _head_revision is None:
+        _head_revision = head_revision()
+    with database.engine.connect() as connection:
+        migrated = current_revision(connection) == _head_revision
+    if not migrated:
+        with _file_lock(path + ".lock"):
+            upgrade_database(database.engine)
+    _migrated_paths.add(path)
+
+
+def _create_tenant_engine(path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return create_db_engine(f"sqlite:///{path}", pool_size=TENANT_POOL_SIZE)
+
+
+def open_tenant_database(tenant: str) -> Database:
+    path = tenant_path(tenant)
+    engine = _create_tenant_engine(path)
+    # セッションにテナント名を持たせる（コミット後の変更イベントの配信先）
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine, info={"tenant": tenant})
+    database = Database(engine, session_factory, tenant)
+    try:
+        ensure_schema(database, path)
+    except Exception:
+        engine.dispose()
+        raise
+    return database
+
+
+def migrate_tenants(revision: str = "head", tenants: Optional[List[str]] = None) -> List[str]:
+    """テナントの DB を指定したリビジョンへ移行する（省略時は既存の全テナント）"""
+    tenants = list_tenants() if tenants is None else tenants
+    for tenant in tenants:
+        path = tenant_path(tenant)
+        engine = _create_tenant_engine(path)
+        try:
+            with _file_lock(path + ".lock"):
+                upgrade_database(engine, revision)
+            # 最新以外のリビジョンにもできるため、次に開くときに確かめ直す
+            _migrated_paths.discard(path)
+        finally:
+            engine.dispose()
+    return tenants
+
+
+class TenantRouter:
+    """テナント名 -> 開いている DB の LRU"""
+
+    OPEN_LOCKS = 64
+
+    def __init__(self, max_engines: int = TENANT_MAX_ENGINES, idle_seconds: float = TENANT_IDLE_SECONDS):
+        self.max_engines = max_engines
+        self.idle_seconds = idle_seconds
+        self._databases: "OrderedDict[str, Database]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # 同じテナントを同時に開かないためのロック（テナント名のハッシュで振り分ける）
+        self._open_locks = [threading.Lock() for _ in range(self.OPEN_LOCKS)]
+
+    def cached(self, tenant: str) -> Optional[Database]:
+        with self._lock:
+            database = self._databases.get(tenant)
+            if database is not None:
+                self._databases.move_to_end(tenant)
+                self._last_used[tenant] = time.monotonic()
+            return database
+
+    def get(self, tenant: str) -> Database:
+        database = self.cached(tenant)
+        if database is not None:
+            return database
+        lock = self._open_locks[int(hashlib.sha1(tenant.encode()).hexdigest(), 16) % self.OPEN_LOCKS]
+        with lock:
+            database = self.cached(tenant)
+            if database is not None:
+                return database
+            database = open_tenant_database(tenant)
+            with self._lock:
+                self._databases[tenant] = database
+                self._last_used[tenant] = time.monotonic()
+                evicted = self._evict()
+        for stale in evicted:
+            # 使用中の接続は返却時に閉じられる
+            stale.engine.dispose()
+        return database
+
+    def evict_idle(self) -> int:
+        """TENANT_IDLE_SECONDS 以上使われていないテナントの接続を閉じ、閉じた数を返す（スケジューラから呼ぶ）"""
+        with self._lock:
+            evicted = self._evict()
+        for stale in evicted:
+            stale.engine.dispose()
+        return len(evicted)
+
+    def _evict(self) -> List[Database]:
+        evicted = []
+        deadline = time.monotonic() - self.idle_seconds
+        while self._databases:
+            tenant = next(iter(self._databases))
+            if len(self._databases) <= self.max_engines and self._last_used[tenant] > deadline:
+                break
+            evicted.append(self._databases.pop(tenant))
+            del self._last_used[tenant]
+        return evicted
+
+    @contextmanager
+    def borrow(self, tenant: str) -> Iterator[Database]:
+        """LRU を動かさずに使う（スケジューラ・管理コマンドで全テナントを順に処理するとき）"""
+        with self._lock:
+            database = self._databases.get(tenant)
+        if database is not None:
+            yield database
+            return
+        database = open_tenant_database(tenant)
+        try:
+            yield database
+        finally:
+            database.engine.dispose()
+
+    def close_all(self) -> None:
+        with self._lock:
+            databases = list(self._databases.values())
+            self._databases.clear()
+            self._last_used.clear()
+        for database in databases:
+            database.engine.dispose()
+
+
+tenant_router = TenantRouter()
+
+
+def for_each_database(job: Callable[[Database], object]):
+    """job を DB ごとに実行する（テナントモードでは全テナント、それ以外は既定の DB）
+
+    テナントごとの失敗はログに残して次のテナントへ進む。
+    """
+    if not TENANT_MODE:
+        with use_database(default_database):
+            return job(default_database)
+    results = {}
+    for tenant in list_tenants():
+        try:
+            with tenant_router.borrow(tenant) as database, use_database(database):
+                results[tenant] = job(database)
+        except Exception:
+            logger.exception(f"Job failed for tenant {tenant}")
+    return results
+
+
+class TenantMiddleware:
+    """ヘッダーのテナントの DB をリクエストの間 current_database() に設定する"""
+
+    def __init__(self, app, router: TenantRouter = tenant_router):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in PUBLIC_PATHS:
+            return await self.app(scope, receive, send)
+        try:
+            tenant = validate_tenant(Headers(scope=scope).get(TENANT_HEADER))
+            # 開いていなければ接続・移行を行うため、イベントループを止めないようスレッドで開く
+            database = self.router.cached(tenant) or await run_in_threadpool(self.router.get, tenant)
+        except TenantError as exc:
+            response = JSONResponse({"detail": str(exc)}, status_code=exc.status_code)
+            return await response(scope, receive, send)
+
+        async def send_with_vary(message):
+            if message["type"] == "http.response.start":
+                # 同じ URL でもテナントごとに内容が違うため、ブラウザ等のキャッシュにヘッダーで区別させる
+                MutableHeaders(scope=message).add_vary_header(TENANT_HEADER)
+            await send(message)
+
+        with use_database(database):
+            await self.app(scope, receive, send_with_vary)
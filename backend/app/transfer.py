@@ -0,0 +1,220 @@
+"""ワークスペース全体の NDJSON エクスポート / インポート
+
+1行目はヘッダー、以降は {"table": テーブル名, "row": {列: 値}} を1行ずつ並べる。
+エクスポートはサーバーサイドカーソル（stream_results）で読みながら行を生成するため、
+データ量によらずメモリ使用量は一定。インポートは ID を保ったままテーブルごとに
+executemany でまとめて INSERT し、最後に派生データ（全文検索・進捗カウンタ・作業時間ロールアップ・
+コレクションバージョン）を作り直す。
+"""
+import json
+from datetime import date, datetime
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Optional
+
+from sqlalchemy import Date, DateTime, Table, delete, func, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .models import Base, CollectionVersion, rebuild_progress_counters, rebuild_work_time_rollups
+from .sync import mark_reset
+from .search import (
+    drop_search_triggers, install_search_triggers, is_supported as search_supported, rebuild_search_index,
+)
+
+FORMAT = "bizbuddy-ndjson"
+FORMAT_VERSION = 1
+
+# 外部キーの参照先が先に来る順序
+EXPORT_TABLES = (
+    "categories",
+    "tasks",
+    "task_category",
+    "memos",
+    "memo_task",
+    "work_logs",
+    "sub_tasks",
+    "leaf_tasks",
+    "action_items",
+    # アーカイブ（models/archive.py）。ロールアップはアーカイブ側だけ作り直せないため書き出す
+    "archive_tasks",
+    "archive_sub_tasks",
+    "archive_leaf_tasks",
+    "archive_action_items",
+    "archive_work_logs",
+    "archive_memo_task",
+    "archive_task_category",
+    "archive_work_time_rollups",
+)
+
+# 1回の executemany にまとめる行数
+IMPORT_BATCH_SIZE = 5000
+# エクスポート時にサーバーサイドカーソルから一度に取り出す行数
+EXPORT_FETCH_SIZE = 1000
+
+
+class TransferError(ValueError):
+    """インポートデータが不正、またはインポート先が空でない"""
+
+
+def _table(name: str) -> Table:
+    return Base.metadata.tables[name]
+
+
+def _encode(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def export_lines(connection: Connection) -> Iterator[str]:
+    """全テーブルを NDJSON の行（改行付き）として順に生成する"""
+    yield json.dumps({"format": FORMAT, "version": FORMAT_VERSION, "tables": list(EXPORT_TABLES)}) + "\n"
+    streaming = connection.execution_options(stream_results=True, yield_per=EXPORT_FETCH_SIZE)
+    for name in EXPORT_TABLES:
+        table = _table(name)
+        columns = [column.name for column in table.columns]
+        order = list(table.primary_key.columns) or list(table.columns)
+        for row in streaming.execute(select(table).order_by(*order)):
+            record = {column: _encode(value) for column, value in zip(columns, row)}
+            yield json.dumps({"table": name, "row": record}, ensure_ascii=False) + "\n"
+
+
+def export_chunks(engine: Engine, lines_per_chunk: int = 500) -> Iterator[bytes]:
+    """StreamingResponse 用に、複数行をまとめたバイト列を生成する"""
+    with engine.connect() as connection:
+        buffer: List[str] = []
+        for line in export_lines(connection):
+            buffer.append(line)
+            if len(buffer) >= lines_per_chunk:
+                yield "".join(buffer).encode("utf-8")
+                buffer = []
+        if buffer:
+            yield "".join(buffer).encode("utf-8")
+
+
+class _TableWriter:
+    """1テーブル分の INSERT を DBAPI の executemany で直接実行する
+
+    SQLAlchemy の Core insert() に行の辞書を渡すと、行ごとのパラメータ組み立てが
+    取り込み時間の大半を占めるため、INSERT 文と列ごとの型変換は最初に1度だけ用意する。
+    """
+
+    def __init__(self, connection: Connection, table: Table):
+        dialect = connection.dialect
+        self.columns = [column.name for column in table.columns]
+        compiled = table.insert().compile(dialect=dialect, column_keys=self.columns)
+        self.sql = compiled.string
+        self.positional = compiled.positional
+        if self.positional:
+            # 位置パラメータの並びは INSERT 文の列順に従う
+            self.columns = list(compiled.positiontup)
+        self.converters = [self._converter(table.columns[name], dialect) for name in self.columns]
+        # 古いエクスポートに無い列は、モデルの既定値（スカラーのもの）で埋める
+        self.defaults = [self._default(table.columns[name]) for name in self.columns]
+
+    @staticmethod
+    def _converter(column, dialect) -> Optional[Callable]:
+        """JSON の値を DBAPI に渡せる値に変換する（日時・日付は ISO 文字列から戻す）"""
+        process = column.type.dialect_impl(dialect).bind_processor(dialect)
+        parse = None
+        if isinstance(column.type, DateTime):
+            parse = datetime.fromisoformat
+        elif isinstance(column.type, Date):
+            parse = date.fromisoformat
+        if parse and process:
+            return lambda value: process(parse(value))
+        return parse or process
+
+    @staticmethod
+    def _default(column):
+        default = column.default
+        return default.arg if default is not None and default.is_scalar else None
+
+    def params(self, row: dict):
+        values = []
+        for name, convert, default in zip(self.columns, self.converters, self.defaults):
+            value = row.get(name, default)
+            values.append(value if value is None or convert is None else convert(value))
+        return tuple(values) if self.positional else dict(zip(self.columns, values))
+
+    def write(self, connection: Connection, batch: List[dict]) -> None:
+        connection.exec_driver_sql(self.sql, [self.params(row) for row in batch])
+
+
+def _is_empty(connection: Connection) -> bool:
+    return all(
+        connection.execute(select(func.count()).select_from(_table(name))).scalar() == 0
+        for name in EXPORT_TABLES
+    )
+
+
+def import_lines(connection: Connection, lines: Iterable[str], replace: bool = False) -> Dict[str, int]:
+    """NDJSON の行を読み込んで挿入し、テーブルごとの件数を返す（呼び出し側のトランザクション内で実行）"""
+    if replace:
+        for name in reversed(EXPORT_TABLES):
+            connection.execute(delete(_table(name)))
+    elif not _is_empty(connection):
+        raise TransferError("Workspace is not empty; import with replace to overwrite it")
+
+    if search_supported(connection):
+        drop_search_triggers(connection)
+
+    writers = {name: _TableWriter(connection, _table(name)) for name in EXPORT_TABLES}
+    counts = {name: 0 for name in EXPORT_TABLES}
+    batch: List[dict] = []
+    batch_table = None
+    header_seen = False
+
+    def flush():
+        if batch:
+            writers[batch_table].write(connection, batch)
+            counts[batch_table] += len(batch)
+            batch.clear()
+
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise TransferError(f"Line {number}: invalid JSON ({exc.msg})")
+        if not header_seen:
+            if record.get("format") != FORMAT or record.get("version") != FORMAT_VERSION:
+                raise TransferError("Unsupported export format")
+            header_seen = True
+            continue
+
+        name = record.get("table")
+        if name not in counts or not isinstance(record.get("row"), dict):
+            raise TransferError(f"Line {number}: unknown table {name!r}")
+        if name != batch_table or len(batch) >= IMPORT_BATCH_SIZE:
+            flush()
+            batch_table = name
+        batch.append(record["row"])
+    flush()
+
+    if not header_seen:
+        raise TransferError("Empty import file")
+    _rebuild_derived(connection)
+    return counts
+
+
+def _rebuild_derived(connection: Connection) -> None:
+    """インポートで一括挿入した後、ORM のイベントで維持している派生データを作り直す"""
+    if search_supported(connection):
+        rebuild_search_index(connection)
+        install_search_triggers(connection)
+    session = Session(bind=connection)
+    # 進捗カウンタはファイルの値を信用せず、取り込んだアクションアイテムから数え直す
+    rebuild_progress_counters(session, commit=False)
+    rebuild_work_time_rollups(session, commit=False)
+    session.close()
+    connection.execute(update(CollectionVersion).values(version=CollectionVersion.version + 1))
+    # 一括挿入は変更履歴に残らないため、差分同期中のクライアントには全件を取り直させる
+    mark_reset(connection)
+
+
+def import_file(engine: Engine, file: IO[str], replace: bool = False) -> Dict[str, int]:
+    """全文検索テーブルとコレクションバージョンは事前に作成されている前提（install_* を参照）"""
+    with engine.begin() as connection:
+        return import_lines(connection, file, replace=replace)
@@ -0,0 +1,173 @@
+"""タスクの緊急度スコアと期限通知（バックグラウンド処理）
+
+urgency_score は優先度とモチベーションに、期限までの残り時間（期限がなければ作成からの経過日数）による
+係数を掛けたもの。時間の経過だけで値が変わるため、リクエストの処理中には計算せず、
+app/scheduler.py から定期的にまとめて再計算する。あわせて期限が近い・過ぎた未完了タスクの通知を
+deadline_reminders に登録する（/events は app/events.py がこのテーブルから配信する）。
+
+どちらも id 順に BATCH_SIZE 件ずつ、バッチごとに別のトランザクションで処理するため、
+タスクが多くても書き込みのロックを長く握らない。日時は models/work_time.py と同じく JST で扱う。
+"""
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, select, tuple_, update
+from sqlalchemy.engine import Engine
+
+from .database import current_database
+from .events import broker
+from .models import Task, DeadlineReminder
+from .models.task import jst, to_jst
+
+# 1トランザクションで処理するタスク数
+BATCH_SIZE = int(os.getenv("BIZBUDDY_SCHEDULER_BATCH_SIZE", "500"))
+# 期限のこの時間前から「期限が近い」通知を出す
+REMINDER_WINDOW_HOURS = float(os.getenv("BIZBUDDY_REMINDER_WINDOW_HOURS", "24"))
+
+CLOSED_STATUS = "完了"
+
+MOTIVATION_WEIGHT = 0.5
+# 期限切れで係数は 1 + DEADLINE_WEIGHT になり、残り時間が半減期ごとに上乗せ分が半分になる
+DEADLINE_WEIGHT = 3.0
+DEADLINE_HALF_LIFE_HOURS = 48.0
+# 期限のないタスクは放置された日数に応じて緩やかに上げる
+AGE_WEIGHT = 0.1
+
+# 再計算で値がこれ以上変わらなければ書き込まない
+SCORE_TOLERANCE = 1e-4
+
+tasks_table = Task.__table__
+
+
+def now_jst() -> datetime:
+    return datetime.now(jst).replace(tzinfo=None)
+
+
+def urgency_score(priority, motivation, deadline: Optional[datetime], created_at: Optional[datetime], now: datetime) -> float:
+    base = (priority or 0) + MOTIVATION_WEIGHT * (motivation or 0)
+    if deadline is not None:
+        hours_left = (to_jst(deadline) - now).total_seconds() / 3600
+        decay = 1.0 if hours_left <= 0 else 0.5 ** (hours_left / DEADLINE_HALF_LIFE_HOURS)
+        factor = 1 + DEADLINE_WEIGHT * decay
+    else:
+        age_days = max((now - to_jst(created_at)).total_seconds(), 0) / 86400 if created_at else 0
+        factor = 1 + AGE_WEIGHT * math.log1p(age_days)
+    return round(base * factor, 4)
+
+
+def refresh_urgency_scores(engine: Engine, now: Optional[datetime] = None, batch_size: int = BATCH_SIZE) -> int:
+    """未完了タスクの緊急度を再計算し（完了タスクは NULL に戻す）、書き込んだ件数を返す
+
+    派生値の更新なので最終更新日時は動かさない。
+    """
+    now = now or now_jst()
+    written = 0
+    last_id = 0
+    statement = (
+        update(tasks_table)
+        .where(tasks_table.c.id == bindparam("row_id"))
+        .values(
+            urgency_score=bindparam("score"),
+            urgency_updated_at=now,
+            last_updated=tasks_table.c.last_updated,
+        )
+    )
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                select(
+                    tasks_table.c.id, tasks_table.c.priority, tasks_table.c.motivation,
+                    tasks_table.c.deadline, tasks_table.c.created_at, tasks_table.c.urgency_score,
+                )
+                .where(tasks_table.c.id > last_id, tasks_table.c.status != CLOSED_STATUS)
+                .order_by(tasks_table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            params = []
+            for row in rows:
+                score = urgency_score(row.priority, row.motivation, row.deadline, row.created_at, now)
+                if row.urgency_score is None or abs(score - row.urgency_score) > SCORE_TOLERANCE:
+                    params.append({"row_id": row.id, "score": score})
+            if params:
+                connection.execute(statement, params)
+                written += len(params)
+
+    with engine.begin() as connection:
+        result = connection.execute(
+            update(tasks_table)
+            .where(tasks_table.c.status == CLOSED_STATUS, tasks_table.c.urgency_score.is_not(None))
+            .values(urgency_score=None, urgency_updated_at=now, last_updated=tasks_table.c.last_updated)
+        )
+        written += result.rowcount
+    return written
+
+
+def queue_deadline_reminders(engine: Engine, now: Optional[datetime] = None, batch_size: int = BATCH_SIZE) -> List[Dict]:
+    """期限が REMINDER_WINDOW_HOURS 以内か期限切れの未完了タスクの通知を登録する
+
+    同じタスク・期限・種類の通知は一度だけ。新しく登録した通知を返す。
+    """
+    now = now or now_jst()
+    window_end = now + timedelta(hours=REMINDER_WINDOW_HOURS)
+    reminders_table = DeadlineReminder.__table__
+    queued: List[Dict] = []
+    last_id = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                select(tasks_table.c.id, tasks_table.c.title, tasks_table.c.deadline)
+                .where(
+                    tasks_table.c.id > last_id,
+                    tasks_table.c.status != CLOSED_STATUS,
+                    tasks_table.c.deadline.is_not(None),
+                    tasks_table.c.deadline <= window_end,
+                )
+                .order_by(tasks_table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            candidates = {
+                (row.id, "overdue" if to_jst(row.deadline) <= now else "approaching", row.deadline): row.title
+                for row in rows
+            }
+            existing = set(connection.execute(
+                select(reminders_table.c.task_id, reminders_table.c.kind, reminders_table.c.deadline)
+                .where(tuple_(reminders_table.c.task_id, reminders_table.c.kind, reminders_table.c.deadline).in_(list(candidates)))
+            ).all())
+            batch = []
+            for (task_id, kind, deadline), title in candidates.items():
+                if (task_id, kind, deadline) in existing:
+                    continue
+                result = connection.execute(
+                    reminders_table.insert().values(task_id=task_id, kind=kind, deadline=deadline, created_at=now)
+                )
+                batch.append({
+                    "op": "reminder",
+                    "entity": "task",
+                    "id": task_id,
+                    "reminder_id": result.inserted_primary_key[0],
+                    "kind": kind,
+                    "title": title,
+                    "deadline": deadline.isoformat(),
+                })
+        if batch:
+            # コミットしたので、このプロセスの /events にはポーリングを待たずに読ませる
+            broker.notify(current_database().tenant)
+            queued.extend(batch)
+    return queued
+
+
+def run_urgency_jobs(engine: Engine) -> Dict[str, int]:
+    """スケジューラから定期的に呼ばれる処理"""
+    now = now_jst()
+    return {
+        "scores": refresh_urgency_scores(engine, now),
+        "reminders": len(queue_deadline_reminders(engine, now)),
+    }
@@ -0,0 +1,8 @@
+"""BizBuddy API のベンチマーク・負荷試験
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks --tasks 200 --output results.json
+
+合成データを一時 DB に生成し、シリアライズのマイクロベンチマークと
+アプリ内（ASGI 直結）の負荷試験を行って、p50/p95/p99 とスループットを JSON で出力する。
+"""
@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="BizBuddy API benchmarks")
+    parser.add_argument("--tasks", type=int, default=200, help="合成データのタスク数")
+    parser.add_argument("--work-logs-per-task", type=int, default=5)
+    parser.add_argument("--memos-per-task", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=200, help="エンドポイントごとのリクエスト数")
+    parser.add_argument("--concurrency", type=int, default=8, help="同時リクエスト数")
+    parser.add_argument("--warmup", type=int, default=10, help="計測前に投げるリクエスト数")
+    parser.add_argument("--rounds", type=int, default=20, help="マイクロベンチマークの繰り返し回数")
+    parser.add_argument("--only", action="append", help="名前にこの文字列を含むエンドポイントだけ計測する")
+    parser.add_argument("--skip-serialization", action="store_true")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--no-response-cache", action="store_true", help="GET レスポンスのメモリキャッシュを無効にする")
+    parser.add_argument("--async-db", action="store_true", help="非同期 DB ルートで計測する")
+    parser.add_argument("--fast-responses", action="store_true", help="一覧を検証なしの orjson 経路で返す")
+    parser.add_argument("--group-commit", action="store_true", help="書き込みをグループコミットでまとめてコミットする")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("-o", "--output", help="結果の JSON を書き出すファイル（省略時は標準出力）")
+    return parser.parse_args(argv)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="bizbuddy-bench-")
+    # アプリの import 前に設定する（接続先やキャッシュはモジュール読み込み時に決まる）
+    os.environ["BIZBUDDY_DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["BIZBUDDY_ASYNC_DB"] = "true" if args.async_db else "false"
+    os.environ["BIZBUDDY_FAST_RESPONSES"] = "true" if args.fast_responses else "false"
+    os.environ["BIZBUDDY_GROUP_COMMIT"] = "true" if args.group_commit else "false"
+    if args.no_response_cache:
+        os.environ["BIZBUDDY_RESPONSE_CACHE_SIZE"] = "0"
+
+    from app.database import engine
+    from app.main import app
+    from app.migrate import upgrade_database
+    from . import data, load, serialization
+
+    upgrade_database(engine)
+
+    scale = data.Scale(
+        tasks=args.tasks,
+        work_logs_per_task=args.work_logs_per_task,
+        memos_per_task=args.memos_per_task,
+        seed=args.seed,
+    )
+    started = time.perf_counter()
+    counts = data.populate(engine, scale)
+    populate_seconds = time.perf_counter() - started
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {key: value for key, value in vars(args).items() if key != "output"},
+            "rows": counts,
+            "populate_seconds": round(populate_seconds, 3),
+        },
+    }
+    if not args.skip_serialization:
+        results["serialization"] = serialization.run(rounds=args.rounds)
+    if not args.skip_load:
+        targets = load.endpoints(
+            tasks=counts["tasks"], sub_tasks=counts["sub_tasks"], action_items=counts["action_items"],
+            memos=counts["memos"],
+        )
+        if args.only:
+            targets = [target for target in targets if any(name in target.name for name in args.only)]
+        results["endpoints"] = load.run(
+            app, targets, requests=args.requests, concurrency=args.concurrency, warmup=args.warmup, seed=args.seed
+        )
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
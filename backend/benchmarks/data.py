@@ -0,0 +1,135 @@
+"""合成データの生成
+
+タスクごとに 3×3 のサブタスク／リーフタスクのツリーとアクションアイテム、
+作業ログ、タスクに紐づくメモを作る。行はエクスポート形式で組み立てて
+app.transfer の一括インポートで投入し、進捗カウンタなどの派生データもまとめて作る。
+"""
+import json
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from app.database import SessionLocal
+from app.models import rebuild_progress_counters
+from app.models.task import STATUS_RANK
+from app.transfer import FORMAT, FORMAT_VERSION, import_lines
+
+STATUSES = list(STATUS_RANK)
+WORDS = ["資料", "作成", "レビュー", "顧客", "提案", "調査", "設計", "実装", "テスト", "会議", "報告", "改善"]
+
+
+@dataclass
+class Scale:
+    tasks: int = 200
+    sub_tasks_per_task: int = 3
+    leaf_tasks_per_sub_task: int = 3
+    action_items_per_leaf_task: int = 3
+    work_logs_per_task: int = 5
+    memos_per_task: int = 2
+    seed: int = 42
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _timestamp(value: datetime) -> str:
+    return value.isoformat()
+
+
+def generate_lines(scale: Scale) -> Iterator[str]:
+    """エクスポート形式（NDJSON）の行を生成する"""
+    rng = random.Random(scale.seed)
+    base = datetime(2024, 1, 1, 9, 0)
+
+    def line(table: str, row: dict) -> str:
+        return json.dumps({"table": table, "row": row}, ensure_ascii=False)
+
+    yield json.dumps({"format": FORMAT, "version": FORMAT_VERSION})
+
+    for task_id in range(1, scale.tasks + 1):
+        created = base + timedelta(hours=task_id)
+        status = rng.choice(STATUSES)
+        priority, motivation = rng.randint(1, 10), rng.randint(1, 10)
+        yield line("tasks", {
+            "id": task_id,
+            "title": f"タスク{task_id} {_text(rng, 2)}",
+            "description": _text(rng, 12),
+            "motivation": motivation,
+            "priority": priority,
+            "deadline": _timestamp(created + timedelta(days=rng.randint(1, 60))) if rng.random() < 0.7 else None,
+            "estimated_time": rng.choice([None, 0.5, 1.0, 2.0, 4.0]),
+            "priority_score": float(priority),
+            "motivation_score": float(motivation),
+            "created_at": _timestamp(created),
+            "last_updated": _timestamp(created),
+            "status": status,
+            "status_rank": STATUS_RANK[status],
+        })
+
+    memo_id = 0
+    for task_id in range(1, scale.tasks + 1):
+        for _ in range(scale.memos_per_task):
+            memo_id += 1
+            yield line("memos", {
+                "id": memo_id,
+                "content": _text(rng, 20),
+                "created_at": _timestamp(base + timedelta(minutes=memo_id)),
+            })
+    memo_id = 0
+    for task_id in range(1, scale.tasks + 1):
+        for _ in range(scale.memos_per_task):
+            memo_id += 1
+            yield line("memo_task", {"memo_id": memo_id, "task_id": task_id})
+
+    work_log_id = 0
+    for task_id in range(1, scale.tasks + 1):
+        for _ in range(scale.work_logs_per_task):
+            work_log_id += 1
+            started = base + timedelta(days=rng.randint(0, 180), hours=rng.randint(0, 23))
+            yield line("work_logs", {
+                "id": work_log_id,
+                "task_id": task_id,
+                "description": _text(rng, 8),
+                "started_at": _timestamp(started),
+                "ended_at": _timestamp(started + timedelta(minutes=rng.randint(5, 180))),
+            })
+
+    sub_task_id = leaf_task_id = action_item_id = 0
+    sub_tasks, leaf_tasks, action_items = [], [], []
+    for task_id in range(1, scale.tasks + 1):
+        for _ in range(scale.sub_tasks_per_task):
+            sub_task_id += 1
+            created = _timestamp(base + timedelta(minutes=sub_task_id))
+            sub_tasks.append({
+                "id": sub_task_id, "task_id": task_id, "title": _text(rng, 3),
+                "description": None, "created_at": created, "updated_at": created,
+            })
+            for _ in range(scale.leaf_tasks_per_sub_task):
+                leaf_task_id += 1
+                leaf_tasks.append({
+                    "id": leaf_task_id, "sub_task_id": sub_task_id, "title": _text(rng, 3),
+                    "description": None, "created_at": created, "updated_at": created,
+                })
+                for _ in range(scale.action_items_per_leaf_task):
+                    action_item_id += 1
+                    action_items.append({
+                        "id": action_item_id, "leaf_task_id": leaf_task_id, "content": _text(rng, 5),
+                        "is_completed": rng.random() < 0.4, "created_at": created, "updated_at": created,
+                    })
+    for table, rows in (("sub_tasks", sub_tasks), ("leaf_tasks", leaf_tasks), ("action_items", action_items)):
+        for row in rows:
+            yield line(table, row)
+
+
+def populate(engine, scale: Scale) -> dict:
+    """空の DB に合成データを投入し、テーブルごとの件数を返す"""
+    with engine.begin() as connection:
+        counts = import_lines(connection, generate_lines(scale))
+    db = SessionLocal()
+    try:
+        rebuild_progress_counters(db)
+    finally:
+        db.close()
+    return counts
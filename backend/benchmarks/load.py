@@ -0,0 +1,100 @@
+"""アプリ内負荷試験
+
+httpx の ASGITransport でアプリを直接呼び出し（ネットワークを介さない）、
+エンドポイントごとに指定件数のリクエストを指定の同時実行数で投げて計測する。
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from .stats import summarize
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    path: Callable[[random.Random], str]
+    body: Optional[Callable[[random.Random], dict]] = None
+
+
+def endpoints(tasks: int, sub_tasks: int, action_items: int, memos: int) -> List[Endpoint]:
+    """合成データの件数に合わせて、ID を散らしたリクエストを作る"""
+    task_id = lambda rng: rng.randint(1, tasks)
+    return [
+        Endpoint("GET /tasks/", "GET", lambda rng: "/tasks/"),
+        Endpoint("GET /tasks/?view=full", "GET", lambda rng: "/tasks/?view=full"),
+        Endpoint("GET /tasks/?sort", "GET", lambda rng: "/tasks/?sort=status,-priority_score"),
+        Endpoint("GET /tasks/?fields", "GET", lambda rng: "/tasks/?fields=id,title,status,deadline,priority_score"),
+        Endpoint("GET /tasks/{id}", "GET", lambda rng: f"/tasks/{task_id(rng)}"),
+        Endpoint("GET /tasks/{id}/action-plan", "GET", lambda rng: f"/tasks/{task_id(rng)}/action-plan"),
+        Endpoint("GET /tasks/{id}/progress", "GET", lambda rng: f"/tasks/{task_id(rng)}/progress"),
+        Endpoint("GET /sub-tasks/{id}/details", "GET", lambda rng: f"/sub-tasks/{rng.randint(1, sub_tasks)}/details"),
+        Endpoint("GET /tasks/{id}/work-logs/", "GET", lambda rng: f"/tasks/{task_id(rng)}/work-logs/"),
+        Endpoint("GET /memos/", "GET", lambda rng: "/memos/"),
+        Endpoint("GET /search", "GET", lambda rng: f"/search?q={rng.choice(['資料作成', 'レビュー', '顧客 提案'])}"),
+        Endpoint("GET /analytics/work-time", "GET", lambda rng: "/analytics/work-time?group_by=task&group_by=week"),
+        Endpoint(
+            "POST /tasks/{id}/work-logs/", "POST",
+            lambda rng: f"/tasks/{task_id(rng)}/work-logs/",
+            lambda rng: {
+                "description": "benchmark",
+                "started_at": "2024-06-01T10:00:00",
+                "ended_at": "2024-06-01T10:30:00",
+            },
+        ),
+        Endpoint(
+            "PUT /action-items/{id}", "PUT",
+            lambda rng: f"/action-items/{rng.randint(1, action_items)}",
+            lambda rng: {"content": "benchmark", "is_completed": rng.random() < 0.5},
+        ),
+        Endpoint(
+            "PUT /memos/{id}", "PUT",
+            lambda rng: f"/memos/{rng.randint(1, memos)}",
+            lambda rng: {"content": f"benchmark {rng.random()}", "task_ids": [task_id(rng)]},
+        ),
+    ]
+
+
+async def _run_endpoint(client: httpx.AsyncClient, endpoint: Endpoint, requests: int, concurrency: int, seed: int):
+    rng = random.Random(seed)
+    plan = [(endpoint.path(rng), endpoint.body(rng) if endpoint.body else None) for _ in range(requests)]
+    durations: List[float] = []
+    errors = 0
+    queue: "asyncio.Queue" = asyncio.Queue()
+    for item in plan:
+        queue.put_nowait(item)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            path, body = queue.get_nowait()
+            begin = time.perf_counter()
+            response = await client.request(endpoint.method, path, json=body)
+            await response.aread()
+            durations.append(time.perf_counter() - begin)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(durations, time.perf_counter() - started, errors=errors)
+
+
+async def _run(app, targets: List[Endpoint], requests: int, concurrency: int, warmup: int, seed: int):
+    transport = httpx.ASGITransport(app=app)
+    results: Dict[str, Dict[str, float]] = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for index, endpoint in enumerate(targets):
+            if warmup:
+                await _run_endpoint(client, endpoint, warmup, 1, seed + index)
+            results[endpoint.name] = await _run_endpoint(client, endpoint, requests, concurrency, seed + index)
+    return results
+
+
+def run(app, targets: List[Endpoint], requests: int = 200, concurrency: int = 8, warmup: int = 10, seed: int = 42):
+    return asyncio.run(_run(app, targets, requests, concurrency, warmup, seed))
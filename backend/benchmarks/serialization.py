@@ -0,0 +1,66 @@
+"""Task / SubTask スキーマのシリアライズ経路のマイクロベンチマーク
+
+ORM オブジェクトはリレーションを読み込み済みの状態で用意し、DB アクセスを含めずに計測する。
+"""
+import json
+import time
+from typing import Callable, Dict, List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.database import SessionLocal
+from app.models import Task as TaskModel
+from app.models.action_plan import SubTask as SubTaskModel
+from app.queries import build_sub_task_tree, sub_task_tree_options, task_load_options
+from app.schemas.action_plan import SubTask
+from app.schemas.task import Task
+from app.serializers import task_to_dict
+
+from .stats import summarize
+
+
+def _measure(objects: List, serialize: Callable, rounds: int) -> Dict[str, float]:
+    """1オブジェクトあたりの所要時間を rounds 回計測する"""
+    for obj in objects[:10]:
+        serialize(obj)  # ウォームアップ
+    durations = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for obj in objects:
+            begin = time.perf_counter()
+            serialize(obj)
+            durations.append(time.perf_counter() - begin)
+    return summarize(durations, time.perf_counter() - started, unit="us")
+
+
+def run(sample_size: int = 100, rounds: int = 20) -> Dict[str, Dict[str, float]]:
+    db = SessionLocal()
+    try:
+        tasks = db.query(TaskModel).options(*task_load_options()).order_by(TaskModel.id).limit(sample_size).all()
+        sub_tasks = (
+            db.query(SubTaskModel).options(*sub_task_tree_options())
+            .order_by(SubTaskModel.id).limit(sample_size).all()
+        )
+        return {
+            # response_model=Task と同じ検証（from_attributes）
+            "Task.model_validate": _measure(tasks, Task.model_validate, rounds),
+            # FastAPI のレスポンス生成に近い経路（検証 → jsonable_encoder → JSON 文字列）
+            "Task.response": _measure(
+                tasks, lambda task: json.dumps(jsonable_encoder(Task.model_validate(task))), rounds
+            ),
+            "Task.model_dump_json": _measure(
+                tasks, lambda task: Task.model_validate(task).model_dump_json(), rounds
+            ),
+            # BIZBUDDY_FAST_RESPONSES の経路（検証なしで dict を組み立てて orjson）
+            "Task.fast": _measure(tasks, lambda task: orjson.dumps(task_to_dict(task)), rounds),
+            "SubTask.model_validate": _measure(sub_tasks, SubTask.model_validate, rounds),
+            "SubTask.response": _measure(
+                sub_tasks, lambda sub_task: json.dumps(jsonable_encoder(SubTask.model_validate(sub_task))), rounds
+            ),
+            "SubTaskTree.build": _measure(
+                sub_tasks, lambda sub_task: build_sub_task_tree(sub_task).model_dump_json(), rounds
+            ),
+        }
+    finally:
+        db.close()
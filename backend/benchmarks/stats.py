@@ -0,0 +1,28 @@
+"""計測値の集計"""
+import math
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """nearest-rank 法のパーセンタイル（sorted_values は昇順）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(durations: List[float], elapsed: float, errors: int = 0, unit: str = "ms") -> Dict[str, float]:
+    """秒単位の所要時間の一覧から p50/p95/p99・平均・スループットを求める"""
+    scale = {"ms": 1e3, "us": 1e6}[unit]
+    values = sorted(duration * scale for duration in durations)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        f"p50_{unit}": round(percentile(values, 0.50), 3),
+        f"p95_{unit}": round(percentile(values, 0.95), 3),
+        f"p99_{unit}": round(percentile(values, 0.99), 3),
+        f"mean_{unit}": round(sum(values) / count, 3) if count else 0.0,
+        f"max_{unit}": round(values[-1], 3) if count else 0.0,
+        "throughput_per_sec": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+    }
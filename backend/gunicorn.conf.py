@@ -0,0 +1,24 @@
+"""本番用の起動設定（gunicorn -c gunicorn.conf.py app.main:app）
+
+マスタープロセスでアプリを1回だけ読み込み（preload_app）、uvicorn のワーカーを fork する。
+スキーマの移行は起動前に `python -m app.cli migrate` で済ませておく（アプリの読み込みでは移行しない）。
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIZBUDDY_BIND", "127.0.0.1:8000")
+workers = int(os.getenv("BIZBUDDY_WORKERS", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+graceful_timeout = 30
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    # 読み込み時にマスターで開いた接続をワーカーで共有しないよう、プールを作り直す
+    # （close=False: 接続はマスター側のものなので、ここでは閉じずに手放すだけにする）
+    from app.database import engine, async_engine
+
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
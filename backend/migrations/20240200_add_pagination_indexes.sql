@@ -0,0 +1,7 @@
+-- キーセットページネーション用の複合インデックス
+
+CREATE INDEX IF NOT EXISTS ix_tasks_created_at_id ON tasks(created_at, id);
+
+CREATE INDEX IF NOT EXISTS ix_memos_created_at_id ON memos(created_at, id);
+
+CREATE INDEX IF NOT EXISTS ix_work_logs_task_id_started_at_id ON work_logs(task_id, started_at, id);
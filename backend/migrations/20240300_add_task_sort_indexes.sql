@@ -0,0 +1,18 @@
+-- タスク一覧のサーバーサイドソート・絞り込み用
+
+ALTER TABLE tasks ADD COLUMN status_rank INTEGER;
+
+UPDATE tasks SET status_rank = CASE status
+    WHEN '進行中' THEN 0
+    WHEN '未着手' THEN 1
+    WHEN 'casual' THEN 2
+    WHEN 'backlog' THEN 3
+    WHEN '完了' THEN 4
+    ELSE 5
+END;
+
+CREATE INDEX IF NOT EXISTS ix_tasks_status_priority_score ON tasks(status, priority_score);
+
+CREATE INDEX IF NOT EXISTS ix_tasks_status_rank_priority_score ON tasks(status_rank, priority_score);
+
+CREATE INDEX IF NOT EXISTS ix_tasks_deadline ON tasks(deadline);
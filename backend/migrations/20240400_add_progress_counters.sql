@@ -0,0 +1,11 @@
+-- アクションプランの進捗カウンタ
+-- 追加後に `python -m app.cli rebuild-progress` で既存データのカウンタを計算する
+
+ALTER TABLE tasks ADD COLUMN completed_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE tasks ADD COLUMN total_count INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE sub_tasks ADD COLUMN completed_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE sub_tasks ADD COLUMN total_count INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE leaf_tasks ADD COLUMN completed_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE leaf_tasks ADD COLUMN total_count INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,8 @@
+-- GET の ETag 用のコレクションバージョン
+
+CREATE TABLE IF NOT EXISTS collection_versions (
+    name VARCHAR NOT NULL PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO collection_versions (name, version) VALUES ('tasks', 0), ('memos', 0), ('action_plan', 0);
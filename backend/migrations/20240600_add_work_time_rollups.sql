@@ -0,0 +1,13 @@
+-- 作業時間の日次ロールアップ
+-- 追加後に `python -m app.cli rebuild-work-time` で既存の作業ログから集計する
+
+CREATE TABLE IF NOT EXISTS work_time_rollups (
+    task_id INTEGER NOT NULL REFERENCES tasks (id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    week DATE NOT NULL,
+    seconds INTEGER NOT NULL DEFAULT 0,
+    log_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (task_id, day)
+);
+
+CREATE INDEX IF NOT EXISTS ix_work_time_rollups_day ON work_time_rollups (day);
@@ -0,0 +1,20 @@
+-- メモとタスクの中間テーブルを memo_task に一本化し、主キーとタスク側のインデックスを付ける
+-- （旧 memo_task_association の行も重複を除いて取り込む）
+
+CREATE TABLE memo_task_new (
+    memo_id INTEGER NOT NULL REFERENCES memos (id),
+    task_id INTEGER NOT NULL REFERENCES tasks (id),
+    PRIMARY KEY (memo_id, task_id)
+);
+
+INSERT OR IGNORE INTO memo_task_new (memo_id, task_id)
+SELECT memo_id, task_id FROM memo_task WHERE memo_id IS NOT NULL AND task_id IS NOT NULL;
+
+INSERT OR IGNORE INTO memo_task_new (memo_id, task_id)
+SELECT memo_id, task_id FROM memo_task_association WHERE memo_id IS NOT NULL AND task_id IS NOT NULL;
+
+DROP TABLE memo_task;
+DROP TABLE IF EXISTS memo_task_association;
+ALTER TABLE memo_task_new RENAME TO memo_task;
+
+CREATE INDEX ix_memo_task_task_id ON memo_task (task_id);
@@ -0,0 +1,14 @@
+-- 差分同期（GET /sync）用の変更履歴
+-- 既存の行には履歴がないため reset を1件入れ、同期するクライアントに全件を取り直させる
+
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity VARCHAR NOT NULL,
+    row_id INTEGER NOT NULL,
+    op VARCHAR NOT NULL,
+    changed_at DATETIME NOT NULL
+);
+
+INSERT INTO change_log (entity, row_id, op, changed_at)
+SELECT 'workspace', 0, 'reset', CURRENT_TIMESTAMP
+WHERE EXISTS (SELECT 1 FROM tasks) OR EXISTS (SELECT 1 FROM memos);
@@ -0,0 +1,15 @@
+-- バックグラウンドで再計算するタスクの緊急度と、期限の通知
+-- 緊急度は次回のスケジューラ実行（起動直後）で埋まる
+
+ALTER TABLE tasks ADD COLUMN urgency_score FLOAT;
+ALTER TABLE tasks ADD COLUMN urgency_updated_at DATETIME;
+CREATE INDEX IF NOT EXISTS ix_tasks_urgency_score ON tasks (urgency_score);
+
+CREATE TABLE IF NOT EXISTS deadline_reminders (
+    id INTEGER PRIMARY KEY,
+    task_id INTEGER NOT NULL REFERENCES tasks (id) ON DELETE CASCADE,
+    kind VARCHAR NOT NULL,
+    deadline DATETIME NOT NULL,
+    created_at DATETIME NOT NULL,
+    CONSTRAINT uq_deadline_reminders_task_kind_deadline UNIQUE (task_id, kind, deadline)
+);
@@ -0,0 +1,54 @@
+-- 子の削除を外部キーの ON DELETE CASCADE に任せるため、作業ログ・中間テーブルの外部キーを作り直す
+-- （SQLite は外部キーを ALTER できないため、テーブルを作り直して行を移す）
+-- 外部キーが無効だった頃に親が削除されて残った行はここで取り除く
+-- work_logs の全文検索用トリガーはテーブルと一緒に消えるため、次回の起動時に作り直される
+
+PRAGMA foreign_keys = OFF;
+
+CREATE TABLE work_logs_new (
+    id INTEGER NOT NULL,
+    task_id INTEGER,
+    description VARCHAR,
+    started_at DATETIME,
+    ended_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE
+);
+INSERT INTO work_logs_new (id, task_id, description, started_at, ended_at)
+SELECT id, task_id, description, started_at, ended_at FROM work_logs
+WHERE task_id IS NULL OR task_id IN (SELECT id FROM tasks);
+DROP TABLE work_logs;
+ALTER TABLE work_logs_new RENAME TO work_logs;
+CREATE INDEX ix_work_logs_id ON work_logs (id);
+CREATE INDEX ix_work_logs_task_id_started_at_id ON work_logs (task_id, started_at, id);
+
+CREATE TABLE task_category_new (
+    task_id INTEGER,
+    category_id INTEGER,
+    FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE,
+    FOREIGN KEY (category_id) REFERENCES categories (id) ON DELETE CASCADE
+);
+INSERT INTO task_category_new (task_id, category_id)
+SELECT task_id, category_id FROM task_category
+WHERE task_id IN (SELECT id FROM tasks) AND category_id IN (SELECT id FROM categories);
+DROP TABLE task_category;
+ALTER TABLE task_category_new RENAME TO task_category;
+
+CREATE TABLE memo_task_new (
+    memo_id INTEGER NOT NULL REFERENCES memos (id) ON DELETE CASCADE,
+    task_id INTEGER NOT NULL REFERENCES tasks (id) ON DELETE CASCADE,
+    PRIMARY KEY (memo_id, task_id)
+);
+INSERT INTO memo_task_new (memo_id, task_id)
+SELECT memo_id, task_id FROM memo_task
+WHERE memo_id IN (SELECT id FROM memos) AND task_id IN (SELECT id FROM tasks);
+DROP TABLE memo_task;
+ALTER TABLE memo_task_new RENAME TO memo_task;
+CREATE INDEX ix_memo_task_task_id ON memo_task (task_id);
+
+-- 同じく親が消えて残ったアクションプランの行
+DELETE FROM sub_tasks WHERE task_id NOT IN (SELECT id FROM tasks);
+DELETE FROM leaf_tasks WHERE sub_task_id NOT IN (SELECT id FROM sub_tasks);
+DELETE FROM action_items WHERE leaf_task_id NOT IN (SELECT id FROM leaf_tasks);
+
+PRAGMA foreign_keys = ON;
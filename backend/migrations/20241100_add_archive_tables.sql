@@ -0,0 +1,94 @@
+-- 完了タスクのアーカイブ先（配下の行・関連付け・作業時間ロールアップも同じ列構成で保存する）
+-- 移動は python -m app.cli archive-tasks --days N か、BIZBUDDY_ARCHIVE_AFTER_DAYS を設定したスケジューラで行う
+
+CREATE TABLE IF NOT EXISTS archive_tasks (
+    id INTEGER NOT NULL,
+    title VARCHAR,
+    description VARCHAR,
+    motivation INTEGER,
+    priority INTEGER,
+    deadline DATETIME,
+    estimated_time FLOAT,
+    priority_score FLOAT,
+    motivation_score FLOAT,
+    created_at DATETIME,
+    last_updated DATETIME,
+    status VARCHAR,
+    status_rank INTEGER,
+    completed_count INTEGER NOT NULL,
+    total_count INTEGER NOT NULL,
+    urgency_score FLOAT,
+    urgency_updated_at DATETIME,
+    archived_at DATETIME NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_archive_tasks_archived_at_id ON archive_tasks (archived_at, id);
+
+CREATE TABLE IF NOT EXISTS archive_sub_tasks (
+    id INTEGER NOT NULL,
+    task_id INTEGER,
+    title VARCHAR,
+    description VARCHAR,
+    created_at DATETIME,
+    updated_at DATETIME,
+    completed_count INTEGER NOT NULL,
+    total_count INTEGER NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_archive_sub_tasks_task_id ON archive_sub_tasks (task_id);
+
+CREATE TABLE IF NOT EXISTS archive_leaf_tasks (
+    id INTEGER NOT NULL,
+    sub_task_id INTEGER,
+    title VARCHAR,
+    description VARCHAR,
+    created_at DATETIME,
+    updated_at DATETIME,
+    completed_count INTEGER NOT NULL,
+    total_count INTEGER NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_archive_leaf_tasks_sub_task_id ON archive_leaf_tasks (sub_task_id);
+
+CREATE TABLE IF NOT EXISTS archive_action_items (
+    id INTEGER NOT NULL,
+    leaf_task_id INTEGER,
+    content VARCHAR,
+    is_completed BOOLEAN,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_archive_action_items_leaf_task_id ON archive_action_items (leaf_task_id);
+
+CREATE TABLE IF NOT EXISTS archive_work_logs (
+    id INTEGER NOT NULL,
+    task_id INTEGER,
+    description VARCHAR,
+    started_at DATETIME,
+    ended_at DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_archive_work_logs_task_id ON archive_work_logs (task_id);
+
+CREATE TABLE IF NOT EXISTS archive_memo_task (
+    memo_id INTEGER NOT NULL,
+    task_id INTEGER NOT NULL,
+    PRIMARY KEY (memo_id, task_id)
+);
+CREATE INDEX IF NOT EXISTS ix_archive_memo_task_task_id ON archive_memo_task (task_id);
+
+CREATE TABLE IF NOT EXISTS archive_task_category (
+    task_id INTEGER,
+    category_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_archive_task_category_task_id ON archive_task_category (task_id);
+
+CREATE TABLE IF NOT EXISTS archive_work_time_rollups (
+    task_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    week DATE NOT NULL,
+    seconds INTEGER NOT NULL,
+    log_count INTEGER NOT NULL,
+    PRIMARY KEY (task_id, day)
+);
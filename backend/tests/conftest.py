@@ -0,0 +1,127 @@
+"""テストの共通設定
+
+アプリは import 時に BIZBUDDY_* の環境変数を読むため、app を import する前に一時ディレクトリの DB などを設定する。
+DB はテストセッションで1回だけ移行し、テストごとに全テーブルを空にする。
+"""
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+TEST_DIR = tempfile.mkdtemp(prefix="bizbuddy-test-")
+os.environ.update({
+    "BIZBUDDY_DATABASE_URL": f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}",
+    "BIZBUDDY_ASYNC_DB": "false",
+    "BIZBUDDY_GROUP_COMMIT": "false",
+    "BIZBUDDY_TENANT_MODE": "false",
+    "BIZBUDDY_TENANT_DATA_DIRS": os.path.join(TEST_DIR, "tenants"),
+    "BIZBUDDY_SCHEDULER_INTERVAL": "0",
+    "BIZBUDDY_SCHEDULER_LOCK": os.path.join(TEST_DIR, "scheduler.lock"),
+})
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+from app.cache import install_collection_versions, response_cache  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.migrate import upgrade_database  # noqa: E402
+from app.models import Base  # noqa: E402
+from app.search import rebuild_search_index  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    upgrade_database(engine)
+    yield engine
+    engine.dispose()
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def clean_database(database):
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+        # 変更履歴の seq（AUTOINCREMENT）も振り直し、各テストを履歴が空の状態から始める
+        connection.execute(text("DELETE FROM sqlite_sequence"))
+        rebuild_search_index(connection)
+    install_collection_versions(engine)
+    # バージョンが 0 に戻るため、前のテストでキャッシュした応答を残さない
+    response_cache.clear()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@contextmanager
+def count_statements():
+    """ブロック内で既定の DB に発行された SQL を集める"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def create_task(client, title="task", **values):
+    payload = {"title": title, "description": "", "motivation": 50, "priority": 50, **values}
+    response = client.post("/tasks/", json=payload)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def create_action_plan(client, task_id, sub_tasks=1, leaf_tasks=1, action_items=2):
+    """サブタスク -> リーフタスク -> アクションアイテムを作り、作成した行を入れ子の dict で返す"""
+    plan = []
+    for i in range(sub_tasks):
+        sub_task = client.post(f"/tasks/{task_id}/sub-tasks", json={"title": f"sub {i}"}).json()
+        sub_task["leaf_tasks"] = []
+        for j in range(leaf_tasks):
+            leaf_task = client.post(f"/sub-tasks/{sub_task['id']}/leaf-tasks", json={"title": f"leaf {i}-{j}"}).json()
+            leaf_task["action_items"] = [
+                client.post(f"/leaf-tasks/{leaf_task['id']}/action-items", json={"content": f"item {i}-{j}-{k}"}).json()
+                for k in range(action_items)
+            ]
+            sub_task["leaf_tasks"].append(leaf_task)
+        plan.append(sub_task)
+    return plan
+
+
+def progress_counters(db):
+    """タスク・サブタスク・リーフタスクの進捗カウンタ（(テーブル, id) -> (完了数, 総数)）"""
+    from app.models import LeafTask, SubTask, Task
+
+    db.expire_all()
+    return {
+        (model.__tablename__, row.id): (row.completed_count, row.total_count)
+        for model in (Task, SubTask, LeafTask)
+        for row in db.query(model)
+    }
+
+
+def assert_counters_match_rebuild(db):
+    from app.models import rebuild_progress_counters
+
+    incremental = progress_counters(db)
+    rebuild_progress_counters(db)
+    assert progress_counters(db) == incremental
+    return incremental
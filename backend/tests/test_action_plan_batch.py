@@ -0,0 +1,59 @@
+"""POST /action-plan/batch"""
+from app.models import ActionItem, LeafTask
+
+from .conftest import create_action_plan, create_task
+
+
+def test_batch_applies_operations_in_one_transaction(client, db):
+    task = create_task(client)
+    [sub_task] = create_action_plan(client, task["id"])
+    [leaf_task] = sub_task["leaf_tasks"]
+    first, second = leaf_task["action_items"]
+
+    response = client.post("/action-plan/batch", json={"operations": [
+        {"op": "create", "entity": "action_item", "parent_id": leaf_task["id"], "data": {"content": "new"}},
+        {"op": "update", "entity": "action_item", "id": first["id"], "data": {"is_completed": True}},
+        {"op": "delete", "entity": "action_item", "id": second["id"]},
+    ]})
+    assert response.status_code == 200, response.text
+    created, updated, deleted = response.json()
+    assert created["data"]["content"] == "new"
+    assert updated["data"]["is_completed"] is True
+    assert deleted["data"] is None
+    assert sorted(item.content for item in db.query(ActionItem)) == ["item 0-0-0", "new"]
+
+
+def test_batch_rejects_create_under_parent_deleted_in_same_batch(client, db):
+    task = create_task(client)
+    [sub_task] = create_action_plan(client, task["id"])
+    [leaf_task] = sub_task["leaf_tasks"]
+
+    response = client.post("/action-plan/batch", json={"operations": [
+        {"op": "update", "entity": "action_item", "id": leaf_task["action_items"][0]["id"], "data": {"content": "x"}},
+        {"op": "delete", "entity": "sub_task", "id": sub_task["id"]},
+        {"op": "create", "entity": "action_item", "parent_id": leaf_task["id"], "data": {"content": "orphan"}},
+    ]})
+    assert response.status_code == 409
+    assert response.json()["detail"].startswith("operations[0]:")
+    # どの操作も適用されていない
+    assert db.query(LeafTask).count() == 1
+    assert sorted(item.content for item in db.query(ActionItem)) == ["item 0-0-0", "item 0-0-1"]
+
+
+def test_batch_rejects_update_of_row_deleted_in_same_batch(client):
+    task = create_task(client)
+    [sub_task] = create_action_plan(client, task["id"])
+    [leaf_task] = sub_task["leaf_tasks"]
+
+    response = client.post("/action-plan/batch", json={"operations": [
+        {"op": "delete", "entity": "leaf_task", "id": leaf_task["id"]},
+        {"op": "update", "entity": "leaf_task", "id": leaf_task["id"], "data": {"title": "renamed"}},
+    ]})
+    assert response.status_code == 409
+
+
+def test_batch_unknown_parent_is_404(client):
+    response = client.post("/action-plan/batch", json={"operations": [
+        {"op": "create", "entity": "action_item", "parent_id": 999, "data": {"content": "x"}},
+    ]})
+    assert response.status_code == 404
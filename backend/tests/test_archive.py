@@ -0,0 +1,87 @@
+"""完了タスクのアーカイブと復元"""
+from app.archive import archive_completed_tasks
+from app.database import engine
+from app.models import ActionItem, Task, WorkLog
+
+from .conftest import create_action_plan, create_task, progress_counters
+
+
+def search_ids(client, query):
+    return {(hit["entity"], hit["id"]) for hit in client.get("/search", params={"q": query}).json()}
+
+
+def archived_task(client):
+    task = create_task(client, "walrus task")
+    [sub_task] = create_action_plan(client, task["id"], leaf_tasks=2)
+    item = sub_task["leaf_tasks"][0]["action_items"][0]
+    client.put(f"/action-items/{item['id']}", json={"content": "walrus item", "is_completed": True})
+    client.post(f"/tasks/{task['id']}/work-logs/", json={
+        "description": "walrus log", "started_at": "2024-01-01T10:00:00", "ended_at": "2024-01-01T11:00:00",
+    })
+    memo = client.post("/memos/", json={"content": "memo"}).json()
+    client.put(f"/memos/{memo['id']}", json={"content": "memo", "task_ids": [task["id"]]})
+    client.put(f"/tasks/{task['id']}", json={
+        "title": "walrus task", "description": "", "motivation": 50, "priority": 50, "status": "完了",
+    })
+    return task, sub_task, memo
+
+
+def test_archive_and_restore_round_trip(client, db):
+    kept = create_task(client, "kept")
+    task, sub_task, memo = archived_task(client)
+    counters = progress_counters(db)
+    search_before = search_ids(client, "walrus")
+    assert len(search_before) == 3
+    since = client.get("/sync", params={"since": 0}).json()["version"]
+
+    assert archive_completed_tasks(engine, older_than_days=0) == 1
+    assert [row.id for row in db.query(Task)] == [kept["id"]]
+    assert db.query(ActionItem).count() == 0 and db.query(WorkLog).count() == 0
+    assert search_ids(client, "walrus") == set()
+    delta = client.get("/sync", params={"since": since}).json()
+    tombstones = {(item["entity"], item["id"]) for item in delta["deleted"]}
+    assert ("task", task["id"]) in tombstones and ("sub_task", sub_task["id"]) in tombstones
+    assert len([entity for entity, _ in tombstones if entity == "action_item"]) == 4
+    assert [(row["id"], row["task_ids"]) for row in delta["memos"]] == [(memo["id"], [])]
+
+    assert [row["id"] for row in client.get("/archive/tasks").json()] == [task["id"]]
+    detail = client.get(f"/archive/tasks/{task['id']}").json()
+    assert len(detail["work_logs"]) == 1
+
+    response = client.post(f"/archive/tasks/{task['id']}/restore")
+    assert response.status_code == 200, response.text
+    assert response.json()["completed_count"] == 1
+    assert client.get("/archive/tasks").json() == []
+    assert search_ids(client, "walrus") == search_before
+    assert progress_counters(db) == counters
+    assert client.get(f"/memos/{memo['id']}").json()["task_ids"] == [task["id"]]
+    assert {row["id"] for row in client.get("/tasks/").json()} == {kept["id"], task["id"]}
+
+
+def test_restore_unknown_task_is_404(client):
+    assert client.post("/archive/tasks/999/restore").status_code == 404
+
+
+def test_open_tasks_are_not_archived(client):
+    create_task(client, "open")
+    assert archive_completed_tasks(engine, older_than_days=0) == 0
+
+
+def test_archived_ids_are_not_reused(client):
+    done = {"description": "", "motivation": 50, "priority": 50, "status": "完了"}
+    first, second = create_task(client, "first", **done), create_task(client, "second", **done)
+    [sub_task] = create_action_plan(client, second["id"])
+    assert archive_completed_tasks(engine, older_than_days=0) == 2
+
+    # アーカイブ済みの ID より後ろから採番される
+    third = create_task(client, "third", **done)
+    [new_sub_task] = create_action_plan(client, third["id"])
+    assert third["id"] > second["id"]
+    assert new_sub_task["id"] > sub_task["id"]
+    assert new_sub_task["leaf_tasks"][0]["action_items"][0]["id"] > sub_task["leaf_tasks"][0]["action_items"][-1]["id"]
+
+    assert archive_completed_tasks(engine, older_than_days=0) == 1
+    for task in (first, second, third):
+        response = client.post(f"/archive/tasks/{task['id']}/restore")
+        assert response.status_code == 200, response.text
+    assert {row["title"] for row in client.get("/tasks/").json()} == {"first", "second", "third"}
@@ -0,0 +1,105 @@
+"""タスク・アクションプランの削除（ON DELETE CASCADE）と派生データの整合"""
+import pytest
+
+from app.models import ActionItem, LeafTask, SubTask, Task, WorkLog
+
+from .conftest import assert_counters_match_rebuild, create_action_plan, create_task
+
+
+def sync_tombstones(client, since):
+    response = client.get("/sync", params={"since": since})
+    assert response.status_code == 200, response.text
+    return {(item["entity"], item["id"]) for item in response.json()["deleted"]}
+
+
+def search_ids(client, query):
+    return {(hit["entity"], hit["id"]) for hit in client.get("/search", params={"q": query}).json()}
+
+
+@pytest.fixture
+def plan(client):
+    task = create_task(client, "zebra task")
+    plan = create_action_plan(client, task["id"], sub_tasks=2, leaf_tasks=2, action_items=2)
+    for sub_task in plan:
+        for leaf_task in sub_task["leaf_tasks"]:
+            item = leaf_task["action_items"][0]
+            client.put(f"/action-items/{item['id']}", json={"content": "zebra item", "is_completed": True})
+    client.post(f"/tasks/{task['id']}/work-logs/", json={
+        "description": "zebra log", "started_at": "2024-01-01T10:00:00", "ended_at": "2024-01-01T11:00:00",
+    })
+    return task, plan
+
+
+def version(client):
+    return client.get("/sync", params={"since": 0}).json()["version"]
+
+
+def test_delete_leaf_task(client, db, plan):
+    task, [sub_task, _] = plan
+    leaf_task = sub_task["leaf_tasks"][0]
+    since = version(client)
+
+    assert client.delete(f"/leaf-tasks/{leaf_task['id']}").status_code == 200
+    assert db.query(ActionItem).filter_by(leaf_task_id=leaf_task["id"]).count() == 0
+    assert sync_tombstones(client, since) == {
+        ("leaf_task", leaf_task["id"]),
+        *{("action_item", item["id"]) for item in leaf_task["action_items"]},
+    }
+    counters = assert_counters_match_rebuild(db)
+    assert counters[("tasks", task["id"])] == (3, 6)
+    assert counters[("sub_tasks", sub_task["id"])] == (1, 2)
+
+
+def test_delete_sub_task(client, db, plan):
+    task, [sub_task, _] = plan
+    since = version(client)
+
+    assert client.delete(f"/sub-tasks/{sub_task['id']}").status_code == 200
+    leaf_ids = [leaf_task["id"] for leaf_task in sub_task["leaf_tasks"]]
+    assert db.query(LeafTask).filter(LeafTask.id.in_(leaf_ids)).count() == 0
+    assert db.query(ActionItem).filter(ActionItem.leaf_task_id.in_(leaf_ids)).count() == 0
+    assert sync_tombstones(client, since) == {
+        ("sub_task", sub_task["id"]),
+        *{("leaf_task", leaf_id) for leaf_id in leaf_ids},
+        *{("action_item", item["id"]) for leaf_task in sub_task["leaf_tasks"] for item in leaf_task["action_items"]},
+    }
+    counters = assert_counters_match_rebuild(db)
+    assert counters[("tasks", task["id"])] == (2, 4)
+    # 削除した行の全文検索エントリも消える
+    assert {entity for entity, _ in search_ids(client, "zebra")} == {"task", "action_item", "work_log"}
+    assert len([hit for hit in search_ids(client, "zebra") if hit[0] == "action_item"]) == 2
+
+
+def test_delete_task(client, db, plan):
+    task, sub_tasks = plan
+    since = version(client)
+
+    assert client.delete(f"/tasks/{task['id']}").status_code == 200
+    for model in (Task, SubTask, LeafTask, ActionItem, WorkLog):
+        assert db.query(model).count() == 0
+    tombstones = sync_tombstones(client, since)
+    assert ("task", task["id"]) in tombstones
+    assert {entity for entity, _ in tombstones} == {"task", "sub_task", "leaf_task", "action_item", "work_log"}
+    assert len(tombstones) == 1 + 2 + 4 + 8 + 1
+    assert assert_counters_match_rebuild(db) == {}
+    assert search_ids(client, "zebra") == set()
+
+
+def test_bulk_delete_and_complete(client, db):
+    tasks = [create_task(client, f"task {i}") for i in range(3)]
+    for task in tasks:
+        create_action_plan(client, task["id"])
+    since = version(client)
+
+    response = client.post("/tasks/bulk", json={"action": "complete", "task_ids": [tasks[0]["id"]]})
+    assert response.status_code == 200, response.text
+    response = client.post("/tasks/bulk", json={"action": "delete", "task_ids": [tasks[1]["id"], tasks[2]["id"]]})
+    assert response.status_code == 200, response.text
+
+    assert [task.status for task in db.query(Task)] == ["完了"]
+    assert db.query(SubTask).count() == 1
+    assert db.query(ActionItem).count() == 2
+    tombstones = sync_tombstones(client, since)
+    assert {("task", tasks[1]["id"]), ("task", tasks[2]["id"])} <= tombstones
+    assert len(tombstones) == 2 * (1 + 1 + 1 + 2)
+    assert_counters_match_rebuild(db)
@@ -0,0 +1,37 @@
+"""ETag による条件付き GET とレスポンスキャッシュ"""
+import asyncio
+
+from app import cache
+
+from .conftest import create_task
+
+
+def test_etag_returns_304_until_collection_changes(client):
+    create_task(client, "first")
+    response = client.get("/tasks/")
+    etag = response.headers["ETag"]
+
+    assert client.get("/tasks/", headers={"If-None-Match": etag}).status_code == 304
+
+    create_task(client, "second")
+    response = client.get("/tasks/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [task["title"] for task in response.json()] == ["first", "second"]
+
+
+def test_version_is_read_outside_event_loop(client, monkeypatch):
+    threads = []
+    original = cache.current_etag
+
+    def current_etag(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            threads.append("event loop")
+        except RuntimeError:
+            threads.append("worker")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(cache, "current_etag", current_etag)
+    assert client.get("/tasks/").status_code == 200
+    assert threads == ["worker", "worker"]
@@ -0,0 +1,65 @@
+"""/events の配信（どのワーカーで書き込まれた変更も、DB の変更履歴から届くこと）"""
+import asyncio
+from datetime import timedelta
+
+from app import events
+from app.database import default_database, engine
+from app.events import ChangeBroker, broker
+from app.urgency import queue_deadline_reminders
+
+from .conftest import create_action_plan, create_task
+from .test_urgency import utc_iso
+
+
+async def _next(subscriber, timeout=5):
+    return await asyncio.wait_for(subscriber.queue.get(), timeout)
+
+
+def test_changes_written_by_another_worker_are_delivered(client, monkeypatch):
+    monkeypatch.setattr(events, "EVENTS_POLL_INTERVAL", 0.05)
+    # 別の ChangeBroker は、このプロセスのコミットで起こされない（別のワーカーと同じく読み込みだけで知る）
+    other_worker = ChangeBroker()
+    before = create_task(client, "before subscribing")
+
+    async def receive():
+        subscriber = await other_worker.subscribe(default_database)
+        try:
+            task = await asyncio.to_thread(create_task, client, "written elsewhere")
+            [sub_task] = await asyncio.to_thread(create_action_plan, client, task["id"], action_items=0)
+            received = [await _next(subscriber) for _ in range(3)]
+            return task, sub_task, received
+        finally:
+            other_worker.unsubscribe(subscriber)
+
+    task, sub_task, received = asyncio.run(receive())
+    # 購読を始める前の変更は届かず、コミットされた順に届く
+    assert [(change["entity"], change["id"], change["op"], change["task_id"]) for change in received] == [
+        ("task", task["id"], "create", task["id"]),
+        ("sub_task", sub_task["id"], "create", task["id"]),
+        ("leaf_task", sub_task["leaf_tasks"][0]["id"], "create", None),
+    ]
+    assert before["id"] not in {change["id"] for change in received if change["entity"] == "task"}
+    assert all(change["version"] > 0 for change in received)
+    # 購読者がいなくなった DB は読まない
+    assert other_worker._feeds == {}
+
+
+def test_own_writes_and_reminders_do_not_wait_for_polling(client, monkeypatch):
+    monkeypatch.setattr(events, "EVENTS_POLL_INTERVAL", 60)
+    task = create_task(client, "due soon", deadline=utc_iso(timedelta(hours=3)))
+
+    async def receive():
+        subscriber = await broker.subscribe(default_database)
+        try:
+            await asyncio.to_thread(queue_deadline_reminders, engine)
+            reminder = await _next(subscriber)
+            await asyncio.to_thread(client.delete, f"/tasks/{task['id']}")
+            deleted = await _next(subscriber)
+            return reminder, deleted
+        finally:
+            broker.unsubscribe(subscriber)
+
+    reminder, deleted = asyncio.run(receive())
+    assert reminder["op"] == "reminder"
+    assert (reminder["id"], reminder["kind"], reminder["title"]) == (task["id"], "approaching", "due soon")
+    assert (deleted["entity"], deleted["id"], deleted["op"]) == ("task", task["id"], "delete")
@@ -0,0 +1,105 @@
+"""高速レスポンスモード（BIZBUDDY_FAST_RESPONSES）と ?fields= の出力
+
+serializers.py は Pydantic のスキーマを通さずに dict を組み立てるため、キー・キー順・値の型が
+スキーマ（schemas/task.py・schemas/memo.py）を通した出力と同じであることを確かめる。
+"""
+import json
+
+import pytest
+
+from app import serializers
+from app.models import Category, Task
+
+from .conftest import create_action_plan, create_task
+
+
+def canonical(data) -> str:
+    """キー順と数値の型（50 と 50.0）も区別して比べる"""
+    return json.dumps(data, ensure_ascii=False)
+
+
+def get_json(client, path, **params):
+    response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.fixture
+def workspace(client, db):
+    first = create_task(client, "first", deadline="2026-10-20T09:30:00", estimated_time=1.5)
+    second = create_task(client, "second", status="進行中")
+    create_task(client, "third")
+    [sub_task] = create_action_plan(client, first["id"], action_items=2)
+    item = sub_task["leaf_tasks"][0]["action_items"][0]
+    client.put(f"/action-items/{item['id']}", json={"content": "done", "is_completed": True})
+    for task in (first, second):
+        client.post(f"/tasks/{task['id']}/work-logs/", json={
+            "description": "log", "started_at": "2026-10-17T10:00:00", "ended_at": "2026-10-17T11:15:30",
+        })
+    category = Category(name="仕事", type="major")
+    db.add(category)
+    task = db.get(Task, first["id"])
+    task.categories.append(category)
+    db.commit()
+    linked = client.post("/memos/", json={"content": "linked"}).json()
+    client.put(f"/memos/{linked['id']}", json={"content": "linked", "task_ids": [first["id"], second["id"]]})
+    client.post("/memos/", json={"content": "alone"})
+    return first, linked
+
+
+@pytest.mark.parametrize("path,params", [
+    ("/tasks/", {}),
+    ("/tasks/", {"view": "full"}),
+    ("/tasks/", {"sort": "-priority,deadline"}),
+    ("/memos/", {}),
+])
+def test_fast_responses_match_schema_output(client, monkeypatch, workspace, path, params):
+    monkeypatch.setattr(serializers, "FAST_RESPONSES", False)
+    validated = get_json(client, path, **params)
+    monkeypatch.setattr(serializers, "FAST_RESPONSES", True)
+    fast = get_json(client, path, **params)
+    assert validated and canonical(fast) == canonical(validated)
+
+
+def test_full_view_matches_task_detail(client, workspace):
+    # view=full は常に serializers で組み立てるため、response_model=Task を通す詳細と比べる
+    tasks = get_json(client, "/tasks/", view="full")
+    assert [canonical(task) for task in tasks] == [
+        canonical(get_json(client, f"/tasks/{task['id']}")) for task in tasks
+    ]
+    first, linked = workspace
+    [detail] = [task for task in tasks if task["id"] == first["id"]]
+    assert [category["name"] for category in detail["categories"]] == ["仕事"]
+    assert (detail["completed_count"], detail["total_count"]) == (1, 2)
+    # メモに埋め込まれたタスクも同じ表現
+    memo = next(memo for memo in get_json(client, "/memos/") if memo["id"] == linked["id"])
+    assert canonical(memo["tasks"][0]) == canonical(get_json(client, f"/tasks/{memo['task_ids'][0]}"))
+
+
+@pytest.mark.parametrize("path,params,keys", [
+    ("/tasks/", {"fields": "title,id"}, ["title", "id"]),
+    ("/tasks/", {"fields": "id,logged_minutes,status"}, ["status", "id", "logged_minutes"]),
+    ("/tasks/", {"view": "full", "fields": "work_logs,id"}, ["id", "work_logs"]),
+    ("/memos/", {"fields": "task_ids"}, ["task_ids"]),
+    ("/memos/", {"fields": "id,tasks"}, ["id", "tasks"]),
+])
+def test_fields_returns_only_requested_keys(client, workspace, path, params, keys):
+    full = {item["id"]: item for item in get_json(client, path, **{k: v for k, v in params.items() if k != "fields"})}
+    items = get_json(client, path, **params)
+    assert len(items) == len(full) > 0
+    for item in items:
+        # キーはスキーマの順に並び、値は項目を絞らない場合と同じ
+        assert list(item) == keys
+        if "id" in item:
+            assert canonical(item) == canonical({key: full[item["id"]][key] for key in keys})
+
+
+@pytest.mark.parametrize("path,params", [
+    ("/tasks/", {"fields": "id,work_logs"}),
+    ("/tasks/", {"view": "full", "fields": "id,logged_minutes"}),
+    ("/memos/", {"fields": "id,title"}),
+])
+def test_unknown_fields_are_rejected(client, path, params):
+    response = client.get(path, params=params)
+    assert response.status_code == 400
+    assert "Unknown fields" in response.json()["detail"]
@@ -0,0 +1,113 @@
+"""グループコミット（1件の失敗がまとめてコミットされる他の書き込みに影響しないこと）"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+from app import group_commit
+from app.database import SessionLocal, default_database
+from app.group_commit import WriteCoordinator
+from app.models import ActionItem, WorkLog
+from app.schemas.action_plan import ActionItem as ActionItemSchema
+
+from .conftest import assert_counters_match_rebuild, create_action_plan, create_task
+
+# 同じ時点に投入した書き込みが1つのトランザクションにまとまるよう、待ち時間を長めにする
+WINDOW_MS = 200
+
+
+@pytest.fixture
+def coordinator():
+    coordinator = WriteCoordinator(SessionLocal, window_ms=WINDOW_MS)
+    yield coordinator
+    coordinator.stop()
+
+
+@pytest.fixture
+def plan(client):
+    task = create_task(client)
+    [sub_task] = create_action_plan(client, task["id"], action_items=3)
+    [leaf_task] = sub_task["leaf_tasks"]
+    return task, leaf_task
+
+
+def _complete(action_item_id, sessions):
+    def write(session):
+        sessions.append(session)
+        item = session.get(ActionItem, action_item_id)
+        if item is None:
+            raise HTTPException(status_code=404, detail="Action item not found")
+        item.is_completed = True
+        return item
+    return write
+
+
+def test_failed_writes_fail_only_their_own_request(client, db, coordinator, plan):
+    task, leaf_task = plan
+    first, second, third = (item["id"] for item in leaf_task["action_items"])
+    version = client.get("/sync", params={"since": 0}).json()["version"]
+    sessions = []
+
+    def complete_then_violate(session):
+        # 進捗カウンタを動かした後で制約違反になる（SAVEPOINT のロールバックでカウンタも戻る）
+        sessions.append(session)
+        session.get(ActionItem, second).is_completed = True
+        session.flush()
+        session.add(WorkLog(task_id=999999, description="no such task"))
+        return None
+
+    futures = [
+        coordinator.submit(_complete(first, sessions), response_model=ActionItemSchema),
+        coordinator.submit(_complete(999999, sessions), response_model=ActionItemSchema),
+        coordinator.submit(complete_then_violate),
+        coordinator.submit(_complete(third, sessions), response_model=ActionItemSchema),
+    ]
+
+    assert futures[0].result(timeout=5).is_completed
+    with pytest.raises(HTTPException) as excinfo:
+        futures[1].result(timeout=5)
+    assert excinfo.value.status_code == 404
+    with pytest.raises(IntegrityError):
+        futures[2].result(timeout=5)
+    assert futures[3].result(timeout=5).is_completed
+    # 4件が同じトランザクションで実行された
+    assert len(sessions) == 4 and len(set(map(id, sessions))) == 1
+
+    completed = {item.id: item.is_completed for item in db.query(ActionItem)}
+    assert completed == {first: True, second: False, third: True}
+    assert db.query(WorkLog).count() == 0
+    counters = assert_counters_match_rebuild(db)
+    assert counters[("leaf_tasks", leaf_task["id"])] == (2, 3)
+    assert counters[("tasks", task["id"])] == (2, 3)
+
+    # 失敗した書き込みの変更は差分同期にも出ない
+    delta = client.get("/sync", params={"since": version}).json()
+    assert {item["id"] for item in delta["action_items"]} == {first, third}
+
+
+def test_routes_share_a_batch_and_fail_independently(client, db, monkeypatch, plan):
+    task, leaf_task = plan
+    items = [item["id"] for item in leaf_task["action_items"]]
+    coordinator = WriteCoordinator(default_database.session_factory, window_ms=WINDOW_MS)
+    monkeypatch.setattr(group_commit, "GROUP_COMMIT", True)
+    monkeypatch.setitem(group_commit._coordinators, default_database, coordinator)
+    batches = []
+    commit = coordinator._commit
+    monkeypatch.setattr(coordinator, "_commit", lambda batch: (batches.append(len(batch)), commit(batch))[1])
+
+    def put(action_item_id):
+        return client.put(f"/action-items/{action_item_id}", json={"content": "done", "is_completed": True})
+
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            responses = list(executor.map(put, items + [999999]))
+    finally:
+        coordinator.stop()
+
+    assert [response.status_code for response in responses] == [200, 200, 200, 404]
+    assert sum(batches) == 4 and len(batches) < 4
+    assert all(response.json()["is_completed"] for response in responses[:3])
+    counters = assert_counters_match_rebuild(db)
+    assert counters[("leaf_tasks", leaf_task["id"])] == (3, 3)
+    assert counters[("tasks", task["id"])] == (3, 3)
@@ -0,0 +1,35 @@
+"""リクエスト単位の計測（失敗したクエリも件数・DB 時間に含めること）"""
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import metrics
+from app.database import engine
+from app.metrics import RequestStats, registry
+
+
+def failed_queries(route):
+    return registry.failed_queries._values.get(route, 0)
+
+
+def test_failed_statements_are_counted_and_timed(monkeypatch):
+    monkeypatch.setattr(metrics, "SLOW_QUERY_MS", 1e-6)
+    stats = RequestStats({})
+    failed_before = failed_queries("unmatched")
+    slow_before = registry.slow_queries._values.get("unmatched", 0)
+    token = metrics._current.set(stats)
+    try:
+        with engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.exec_driver_sql("SELECT * FROM no_such_table")
+            connection.exec_driver_sql("SELECT 1").all()
+            # 失敗した文の開始時刻が接続に残らない
+            assert not any(key.startswith("query_started") for key in connection.info)
+    finally:
+        metrics._current.reset(token)
+
+    assert stats.queries == 2
+    assert stats.db_seconds > 0
+    assert failed_queries("unmatched") == failed_before + 1
+    assert registry.slow_queries._values.get("unmatched", 0) == slow_before + 2
+    assert 'bizbuddy_failed_queries_total{route="unmatched"}' in registry.render()
+
@@ -0,0 +1,181 @@
+"""スキーマの移行（Alembic の導入前の DB の取り込みと /readyz の確認）"""
+import pytest
+from alembic import command
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Database, use_database
+from app.main import app
+from app.migrate import (
+    SchemaMismatchError, alembic_config, current_revision, head_revision, schema_differences, upgrade_database,
+)
+from app.routers import health
+
+# Alembic の導入前（create_all だけで作っていた頃）のスキーマ
+BASELINE_SCHEMA = """
+CREATE TABLE memos (id INTEGER NOT NULL, content VARCHAR, created_at DATETIME, PRIMARY KEY (id));
+CREATE INDEX ix_memos_id ON memos (id);
+CREATE TABLE tasks (
+    id INTEGER NOT NULL, title VARCHAR, description VARCHAR, motivation INTEGER, priority INTEGER,
+    deadline DATETIME, estimated_time FLOAT, priority_score FLOAT, motivation_score FLOAT,
+    created_at DATETIME, last_updated DATETIME, status VARCHAR, PRIMARY KEY (id)
+);
+CREATE INDEX ix_tasks_title ON tasks (title);
+CREATE INDEX ix_tasks_id ON tasks (id);
+CREATE TABLE categories (id INTEGER NOT NULL, name VARCHAR, type VARCHAR, PRIMARY KEY (id));
+CREATE INDEX ix_categories_id ON categories (id);
+CREATE INDEX ix_categories_name ON categories (name);
+CREATE TABLE memo_task (
+    memo_id INTEGER, task_id INTEGER,
+    FOREIGN KEY(memo_id) REFERENCES memos (id), FOREIGN KEY(task_id) REFERENCES tasks (id)
+);
+CREATE TABLE task_category (
+    task_id INTEGER, category_id INTEGER,
+    FOREIGN KEY(task_id) REFERENCES tasks (id), FOREIGN KEY(category_id) REFERENCES categories (id)
+);
+CREATE TABLE memo_task_association (
+    memo_id INTEGER, task_id INTEGER,
+    FOREIGN KEY(memo_id) REFERENCES memos (id), FOREIGN KEY(task_id) REFERENCES tasks (id)
+);
+CREATE TABLE work_logs (
+    id INTEGER NOT NULL, task_id INTEGER, description VARCHAR, started_at DATETIME, ended_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(task_id) REFERENCES tasks (id)
+);
+CREATE INDEX ix_work_logs_id ON work_logs (id);
+CREATE TABLE sub_tasks (
+    id INTEGER NOT NULL, task_id INTEGER, title VARCHAR, description VARCHAR, created_at DATETIME, updated_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(task_id) REFERENCES tasks (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_sub_tasks_id ON sub_tasks (id);
+CREATE TABLE leaf_tasks (
+    id INTEGER NOT NULL, sub_task_id INTEGER, title VARCHAR, description VARCHAR, created_at DATETIME, updated_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(sub_task_id) REFERENCES sub_tasks (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_leaf_tasks_id ON leaf_tasks (id);
+CREATE TABLE action_items (
+    id INTEGER NOT NULL, leaf_task_id INTEGER, content VARCHAR, is_completed BOOLEAN, created_at DATETIME, updated_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(leaf_task_id) REFERENCES leaf_tasks (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_action_items_id ON action_items (id);
+"""
+
+BASELINE_ROWS = """
+INSERT INTO tasks (id, title, description, motivation, priority, priority_score, motivation_score, status, created_at, last_updated)
+VALUES (1, 'doing', '', 50, 50, 50.0, 50.0, '進行中', '2024-01-01 09:00:00', '2024-01-01 09:00:00'),
+       (2, 'done', '', 50, 50, 50.0, 50.0, '完了', '2024-01-01 09:00:00', '2024-01-01 09:00:00');
+INSERT INTO work_logs (id, task_id, description, started_at, ended_at)
+VALUES (1, 1, '', '2024-01-02 09:00:00', '2024-01-02 10:30:00'),
+       (2, 99, 'orphan', '2024-01-02 09:00:00', '2024-01-02 10:00:00');
+INSERT INTO memos (id, content, created_at) VALUES (1, 'memo', '2024-01-01 09:00:00');
+INSERT INTO memo_task (memo_id, task_id) VALUES (1, 1), (1, 1);
+INSERT INTO memo_task_association (memo_id, task_id) VALUES (1, 1), (1, 2);
+INSERT INTO sub_tasks (id, task_id, title, created_at, updated_at) VALUES (1, 1, 'sub', '2024-01-01 09:00:00', '2024-01-01 09:00:00');
+INSERT INTO leaf_tasks (id, sub_task_id, title, created_at, updated_at) VALUES (1, 1, 'leaf', '2024-01-01 09:00:00', '2024-01-01 09:00:00');
+INSERT INTO action_items (id, leaf_task_id, content, is_completed, created_at, updated_at)
+VALUES (1, 1, 'a', 1, '2024-01-01 09:00:00', '2024-01-01 09:00:00'), (2, 1, 'b', 0, '2024-01-01 09:00:00', '2024-01-01 09:00:00');
+"""
+
+
+def _execute_script(engine, script):
+    connection = engine.raw_connection()
+    try:
+        connection.executescript(script)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    _execute_script(engine, BASELINE_SCHEMA + BASELINE_ROWS)
+    yield engine
+    engine.dispose()
+
+
+def _client(engine):
+    """既定の DB の代わりに engine を使うアプリ"""
+    database = Database(engine, sessionmaker(autocommit=False, autoflush=False, bind=engine))
+
+    async def asgi(scope, receive, send):
+        with use_database(database):
+            await app(scope, receive, send)
+
+    return TestClient(asgi)
+
+
+def _assert_upgraded(engine):
+    with engine.connect() as connection:
+        assert current_revision(connection) == head_revision()
+        assert schema_differences(connection) == []
+        assert connection.execute(text("SELECT id, status_rank FROM tasks ORDER BY id")).all() == [(1, 0), (2, 4)]
+        assert connection.execute(text("SELECT completed_count, total_count FROM tasks WHERE id = 1")).one() == (1, 2)
+        assert connection.execute(text("SELECT task_id, seconds FROM work_time_rollups")).all() == [(1, 5400)]
+        assert connection.execute(text("SELECT memo_id, task_id FROM memo_task ORDER BY task_id")).all() == [(1, 1), (1, 2)]
+        # 外部キーが無効だった頃に残った、存在しないタスクの作業ログ
+        assert connection.execute(text("SELECT id FROM work_logs")).scalars().all() == [1]
+        assert "memo_task_association" not in inspect(connection).get_table_names()
+
+    with _client(engine) as client:
+        response = client.get("/tasks/", params={"sort": "status"})
+        assert response.status_code == 200, response.text
+        assert [task["title"] for task in response.json()] == ["doing", "done"]
+        assert client.get("/tasks/1/action-plan").json()["progress"]["completed"] == 1
+        # 作り直した外部キーのカスケード削除
+        assert client.delete("/tasks/1").status_code == 200
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM work_logs")).scalar() == 0
+        assert connection.execute(text("SELECT count(*) FROM action_items")).scalar() == 0
+
+
+def test_pre_alembic_database_is_upgraded_before_stamping(legacy_engine):
+    upgrade_database(legacy_engine)
+    _assert_upgraded(legacy_engine)
+
+
+def test_database_stamped_without_baseline_schema_is_repaired(legacy_engine):
+    # 以前の版の移行（足りないテーブルだけを作ってベースラインを登録した）を再現する
+    config = alembic_config()
+    with legacy_engine.connect() as connection:
+        config.attributes["connection"] = connection
+        command.stamp(config, "0001")
+        command.upgrade(config, "0002")
+        assert "tasks.status_rank: missing column" in schema_differences(connection)
+    upgrade_database(legacy_engine)
+    _assert_upgraded(legacy_engine)
+
+
+def test_unrecoverable_legacy_schema_is_not_stamped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'broken.db'}")
+    # NOT NULL で既定値のない列がない（補えない）
+    _execute_script(engine, BASELINE_SCHEMA + "CREATE TABLE collection_versions (name VARCHAR NOT NULL PRIMARY KEY);")
+    try:
+        with pytest.raises(SchemaMismatchError, match="collection_versions.version"):
+            upgrade_database(engine)
+        with engine.connect() as connection:
+            assert current_revision(connection) is None
+            assert "status_rank" not in {column["name"] for column in inspect(connection).get_columns("tasks")}
+    finally:
+        engine.dispose()
+
+
+def test_readyz_reports_schema_mismatch(client, legacy_engine, monkeypatch):
+    config = alembic_config()
+    with legacy_engine.connect() as connection:
+        config.attributes["connection"] = connection
+        command.stamp(config, "head")
+    monkeypatch.setattr(health, "engine", legacy_engine)
+    monkeypatch.setattr(health, "_schema_verified", False)
+
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "schema mismatch"
+    assert "tasks.status_rank: missing column" in response.json()["differences"]
+
+    # 以前の版が登録しえたリビジョンに戻し、移行で補う
+    with legacy_engine.connect() as connection:
+        config.attributes["connection"] = connection
+        command.stamp(config, "0002", purge=True)
+    upgrade_database(legacy_engine)
+    assert client.get("/readyz").status_code == 200
@@ -0,0 +1,58 @@
+"""全文検索（トリガーによるインデックスの同期と、抜粋の HTML エスケープ）"""
+import pytest
+
+from .conftest import create_action_plan, create_task
+
+
+def search(client, query, **params):
+    response = client.get("/search", params={"q": query, **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def search_ids(client, query):
+    return {(hit["entity"], hit["id"]) for hit in search(client, query)}
+
+
+def test_index_follows_inserts_updates_and_deletes(client):
+    task = create_task(client, "penguin task", description="in the zoo")
+    memo = client.post("/memos/", json={"content": "penguin memo"}).json()
+    log = client.post(f"/tasks/{task['id']}/work-logs/", json={
+        "description": "fed the penguin", "started_at": "2024-01-01T10:00:00", "ended_at": "2024-01-01T11:00:00",
+    }).json()
+    [sub_task] = create_action_plan(client, task["id"], action_items=1)
+    [item] = sub_task["leaf_tasks"][0]["action_items"]
+    client.put(f"/action-items/{item['id']}", json={"content": "count the penguin", "is_completed": False})
+    assert search_ids(client, "penguin") == {
+        ("task", task["id"]), ("memo", memo["id"]), ("work_log", log["id"]), ("action_item", item["id"]),
+    }
+
+    # 更新で古い語は引っかからなくなり、新しい語で引ける
+    client.put(f"/tasks/{task['id']}", json={"title": "walrus task", "description": "", "motivation": 50, "priority": 50})
+    client.put(f"/memos/{memo['id']}", json={"content": "walrus memo"})
+    assert search_ids(client, "walrus") == {("task", task["id"]), ("memo", memo["id"])}
+    assert search_ids(client, "penguin") == {("work_log", log["id"]), ("action_item", item["id"])}
+
+    # 削除でインデックスからも消える（タスクの配下はカスケード削除のトリガーで消える）
+    client.delete(f"/memos/{memo['id']}")
+    client.delete(f"/tasks/{task['id']}")
+    assert search_ids(client, "walrus") == set()
+    assert search_ids(client, "penguin") == set()
+
+
+@pytest.mark.parametrize("query", ["penguin", "pe"])
+def test_snippet_escapes_content(client, query):
+    # 3文字以上は FTS5 の snippet()、3文字未満は LIKE で絞り込んで highlight() で抜粋する
+    create_task(client, "escape", description='<i onclick="x">&</i> penguin')
+    [hit] = search(client, query)
+    assert "<i" not in hit["snippet"]
+    # snippet() は一致箇所の前後をトークン数で切り詰める
+    assert "=&quot;x&quot;&gt;&amp;&lt;/i&gt; " in hit["snippet"]
+    assert f"<mark>{query}</mark>" in hit["snippet"]
+    assert hit["snippet"].count("<mark>") == hit["snippet"].count("</mark>") == 1
+
+
+def test_highlighted_term_is_escaped(client):
+    create_task(client, "markup", description="a <b> tag")
+    [hit] = search(client, "<b")
+    assert hit["snippet"] == "a <mark>&lt;b</mark>&gt; tag"
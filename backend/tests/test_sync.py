@@ -0,0 +1,90 @@
+"""差分同期（GET /sync）"""
+from app.sync import prune_change_log
+
+from .conftest import create_action_plan, create_task
+
+
+def sync(client, since):
+    response = client.get("/sync", params={"since": since})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def tombstones(delta):
+    return {(item["entity"], item["id"]) for item in delta["deleted"]}
+
+
+def test_create_update_delete_are_returned_as_deltas(client):
+    start = sync(client, 0)["version"]
+    task = create_task(client, "first")
+    [sub_task] = create_action_plan(client, task["id"], action_items=1)
+    [leaf_task] = sub_task["leaf_tasks"]
+    [item] = leaf_task["action_items"]
+
+    delta = sync(client, start)
+    assert [row["title"] for row in delta["tasks"]] == ["first"]
+    assert [row["id"] for row in delta["sub_tasks"]] == [sub_task["id"]]
+    assert [row["id"] for row in delta["action_items"]] == [item["id"]]
+    assert delta["deleted"] == []
+
+    version = delta["version"]
+    client.put(f"/action-items/{item['id']}", json={"content": "done", "is_completed": True})
+    delta = sync(client, version)
+    assert [row["content"] for row in delta["action_items"]] == ["done"]
+    # 進捗カウンタが変わった親も更新として返る
+    assert [row["completed_count"] for row in delta["leaf_tasks"]] == [1]
+    assert [row["completed_count"] for row in delta["tasks"]] == [1]
+
+    version = delta["version"]
+    assert sync(client, version)["tasks"] == []
+
+
+def test_task_delete_reports_descendants_as_tombstones(client):
+    task = create_task(client)
+    [sub_task] = create_action_plan(client, task["id"])
+    [leaf_task] = sub_task["leaf_tasks"]
+    memo = client.post("/memos/", json={"content": "memo"}).json()
+    client.put(f"/memos/{memo['id']}", json={"content": "memo", "task_ids": [task["id"]]})
+    version = sync(client, 0)["version"]
+
+    assert client.delete(f"/tasks/{task['id']}").status_code == 200
+    delta = sync(client, version)
+    assert tombstones(delta) == {
+        ("task", task["id"]),
+        ("sub_task", sub_task["id"]),
+        ("leaf_task", leaf_task["id"]),
+        *{("action_item", item["id"]) for item in leaf_task["action_items"]},
+    }
+    # 関連付けが外れたメモは更新として返る
+    assert [(row["id"], row["task_ids"]) for row in delta["memos"]] == [(memo["id"], [])]
+
+
+def test_truncated_history_returns_410(client, db):
+    create_task(client, "first")
+    create_task(client, "second")
+    version = sync(client, 0)["version"]
+    create_task(client, "third")
+
+    # 最新の1件以外を削除すると、それより前からは差分を組み立てられない
+    assert prune_change_log(db, older_than_days=-1) > 0
+    response = client.get("/sync", params={"since": 1})
+    assert response.status_code == 410
+    assert response.json()["detail"]["version"] == version + 1
+    assert sync(client, version)["tasks"][0]["title"] == "third"
+
+
+def test_import_returns_410_for_older_versions(client):
+    create_task(client)
+    version = sync(client, 0)["version"]
+    exported = client.get("/export").content
+
+    response = client.post("/import", params={"replace": "true"}, content=exported)
+    assert response.status_code == 200, response.text
+    response = client.get("/sync", params={"since": version})
+    assert response.status_code == 410
+    current = response.json()["detail"]["version"]
+    assert sync(client, current)["deleted"] == []
+
+
+def test_future_version_returns_410(client):
+    assert client.get("/sync", params={"since": 10**6}).status_code == 410
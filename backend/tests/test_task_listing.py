@@ -0,0 +1,50 @@
+"""GET /tasks/ の発行クエリ数（件数によらず一定）"""
+import pytest
+
+from app.models import Category, Task, WorkLog
+
+from .conftest import count_statements, create_task
+
+
+def seed_tasks(client, db, count):
+    category = Category(name="仕事", type="major")
+    db.add(category)
+    db.commit()
+    task_ids = []
+    for i in range(count):
+        task = create_task(client, f"task {i}")
+        client.post(f"/tasks/{task['id']}/work-logs/", json={
+            "description": "log", "started_at": "2024-01-01T10:00:00", "ended_at": "2024-01-01T11:00:00",
+        })
+        task_ids.append(task["id"])
+    for task in db.query(Task).filter(Task.id.in_(task_ids)):
+        task.categories.append(category)
+    db.commit()
+
+
+def listing_statements(client, path):
+    with count_statements() as statements:
+        response = client.get(path)
+    assert response.status_code == 200
+    return len(statements), response.json()
+
+
+@pytest.mark.parametrize("path", ["/tasks/", "/tasks/?view=full"])
+def test_task_listing_issues_fixed_number_of_statements(client, db, path):
+    seed_tasks(client, db, 5)
+    small, tasks = listing_statements(client, path)
+    assert len(tasks) == 5
+
+    seed_tasks(client, db, 25)
+    large, tasks = listing_statements(client, path)
+    assert len(tasks) == 30
+    assert large == small
+
+
+def test_full_view_includes_relations(client, db):
+    seed_tasks(client, db, 2)
+    _, tasks = listing_statements(client, "/tasks/?view=full")
+    for task in tasks:
+        assert [category["name"] for category in task["categories"]] == ["仕事"]
+        assert [log["description"] for log in task["work_logs"]] == ["log"]
+    assert db.query(WorkLog).count() == 2
@@ -0,0 +1,33 @@
+"""GET /tasks/ の作業ログ集計（TaskSummary）"""
+from app.models import rebuild_work_time_rollups
+
+from .conftest import create_task
+
+
+def summaries(client):
+    return {task["id"]: task for task in client.get("/tasks/").json()}
+
+
+def test_logged_minutes_match_rebuild_after_edits(client, db):
+    task = create_task(client)
+    logs = [
+        client.post(f"/tasks/{task['id']}/work-logs/", json={
+            "description": "log", "started_at": started_at, "ended_at": ended_at,
+        }).json()
+        for started_at, ended_at in [
+            ("2026-10-17T20:00:00.000Z", "2026-10-17T21:00:00.000Z"),
+            ("2026-10-17T14:30:00.000Z", "2026-10-17T15:30:00.000Z"),
+        ]
+    ]
+    client.put(f"/tasks/{task['id']}/work-logs/{logs[0]['id']}", json={
+        "description": "log", "started_at": "2026-10-17T20:00:00.000Z", "ended_at": "2026-10-17T20:30:00.000Z",
+    })
+    client.delete(f"/tasks/{task['id']}/work-logs/{logs[1]['id']}")
+
+    summary = summaries(client)[task["id"]]
+    assert summary["work_log_count"] == 1
+    assert summary["logged_minutes"] == 30.0
+    assert summary["last_activity_at"] == "2026-10-18T05:30:00"
+
+    rebuild_work_time_rollups(db)
+    assert summaries(client)[task["id"]] == summary
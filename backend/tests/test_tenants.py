@@ -0,0 +1,157 @@
+"""マルチテナントモード（テナントごとの DB の切り替え・ヘッダーの検証・エンジンの LRU と使われていない接続の回収・ファイルの配置）"""
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import tenants
+from app.main import app
+from app.models import Task
+from app.scheduler import Scheduler
+from app.tenants import TENANT_HEADER, TenantMiddleware, TenantRouter, shard_for, tenant_path
+
+
+@pytest.fixture
+def data_dirs(tmp_path):
+    """テナントのファイルを置くディレクトリ（既定の引数が同じリストを参照しているため、中身を入れ替える）"""
+    dirs = [str(tmp_path / "a"), str(tmp_path / "b")]
+    saved = list(tenants.TENANT_DATA_DIRS)
+    tenants.TENANT_DATA_DIRS[:] = dirs
+    yield dirs
+    tenants.TENANT_DATA_DIRS[:] = saved
+
+
+@pytest.fixture
+def router(data_dirs):
+    router = TenantRouter(max_engines=4)
+    yield router
+    router.close_all()
+
+
+@pytest.fixture
+def tenant_client(router):
+    with TestClient(TenantMiddleware(app, router=router)) as client:
+        yield client
+
+
+def _headers(tenant):
+    return {TENANT_HEADER: tenant}
+
+
+def test_tenants_are_isolated(tenant_client, db, data_dirs):
+    created = tenant_client.post(
+        "/tasks/", headers=_headers("alpha"),
+        json={"title": "alpha task", "description": "", "motivation": 50, "priority": 50},
+    )
+    assert created.status_code == 200, created.text
+    assert created.headers["vary"] == TENANT_HEADER
+
+    alpha = tenant_client.get("/tasks/", headers=_headers("alpha"))
+    beta = tenant_client.get("/tasks/", headers=_headers("beta"))
+    assert [task["title"] for task in alpha.json()] == ["alpha task"]
+    assert beta.json() == []
+    # 一方のテナントの ETag で、もう一方のテナントに 304 を返さない
+    assert tenant_client.get(
+        "/tasks/", headers={**_headers("beta"), "If-None-Match": alpha.headers["etag"]}
+    ).json() == []
+
+    # テナントのファイルは振り分け先のディレクトリにでき、既定の DB には書き込まない
+    assert os.path.exists(os.path.join(shard_for("alpha", data_dirs), "alpha.db"))
+    assert db.query(Task).count() == 0
+
+
+@pytest.mark.parametrize("headers", [{}, _headers(""), _headers("../alpha"), _headers("a" * 65)])
+def test_missing_or_invalid_tenant_is_rejected(tenant_client, headers):
+    response = tenant_client.get("/tasks/", headers=headers)
+    assert response.status_code == 400
+    assert "detail" in response.json()
+
+
+def test_public_paths_do_not_need_a_tenant(tenant_client):
+    assert tenant_client.get("/healthz").status_code == 200
+
+
+def test_evicted_tenant_engine_is_disposed(data_dirs, monkeypatch):
+    router = TenantRouter(max_engines=1)
+    try:
+        first = router.get("first")
+        disposed = []
+        monkeypatch.setattr(first.engine, "dispose", lambda *args, **kwargs: disposed.append(True))
+
+        second = router.get("second")
+        assert disposed == [True]
+        assert router.cached("first") is None
+        assert router.cached("second") is second
+        # 開き直すと新しいエンジンになる
+        assert router.get("first").engine is not first.engine
+    finally:
+        router.close_all()
+
+
+def test_tenant_path_prefers_existing_file(data_dirs):
+    shard = shard_for("moved", data_dirs)
+    assert tenant_path("moved", data_dirs) == os.path.abspath(os.path.join(shard, "moved.db"))
+
+    # 以前の構成で別のディレクトリに作られたファイルはそのまま使う
+    [other] = [path for path in data_dirs if path != shard]
+    os.makedirs(other)
+    open(os.path.join(other, "moved.db"), "w").close()
+    assert tenant_path("moved", data_dirs) == os.path.abspath(os.path.join(other, "moved.db"))
+    assert tenant_path("moved") == tenant_path("moved", data_dirs)
+
+
+def test_idle_engines_are_closed_without_opening_new_tenants(data_dirs, monkeypatch):
+    router = TenantRouter(max_engines=4, idle_seconds=60)
+    try:
+        idle, busy = router.get("idle"), router.get("busy")
+        disposed = []
+        monkeypatch.setattr(idle.engine, "dispose", lambda *args, **kwargs: disposed.append(True))
+        router._last_used["idle"] -= 120
+
+        assert router.evict_idle() == 1
+        assert disposed == [True]
+        assert router.cached("idle") is None
+        assert router.cached("busy") is busy
+    finally:
+        router.close_all()
+
+
+def test_eviction_job_runs_in_every_worker():
+    class HeldElsewhere:
+        """別のワーカーがスケジューラのロックを持っている"""
+
+        def acquire(self):
+            return False
+
+        def release(self):
+            pass
+
+    ran = []
+    scheduler = Scheduler(lock=HeldElsewhere())
+    scheduler.add_job("leader", lambda: ran.append("leader"), 60)
+    scheduler.add_job("tenant-eviction", lambda: ran.append("eviction"), 60, leader_only=False)
+
+    async def run():
+        scheduler.start()
+        await asyncio.sleep(0.2)
+        await scheduler.stop()
+
+    asyncio.run(run())
+    assert ran == ["eviction"]
+
+
+def test_schema_is_checked_once_per_process(router, monkeypatch):
+    router.get("checked")
+    router.close_all()
+
+    # 閉じた後に開き直しても（スケジューラの borrow を含む）リビジョンを読みに行かない
+    def current_revision(connection):
+        raise AssertionError("schema checked again")
+
+    monkeypatch.setattr(tenants, "current_revision", current_revision)
+    with router.borrow("checked") as database:
+        assert database.tenant == "checked"
+    assert router.get("checked").tenant == "checked"
+    with pytest.raises(AssertionError):
+        router.get("unchecked")
@@ -0,0 +1,95 @@
+"""エクスポート → 置き換えインポート（派生データの作り直しと、不正な行での全体のロールバック）"""
+import json
+
+from app.models import Task, WorkTimeRollup
+
+from .conftest import assert_counters_match_rebuild, create_action_plan, create_task
+
+
+def search_ids(client, query):
+    return {(hit["entity"], hit["id"]) for hit in client.get("/search", params={"q": query}).json()}
+
+
+def rollups(db):
+    db.expire_all()
+    return {(row.task_id, row.day): (row.seconds, row.log_count) for row in db.query(WorkTimeRollup)}
+
+
+def export_records(client):
+    response = client.get("/export")
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def to_ndjson(records):
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+def import_replace(client, content):
+    return client.post("/import", params={"replace": "true"}, content=content)
+
+
+def test_replace_import_rebuilds_derived_data(client, db):
+    task = create_task(client, "otter task")
+    [sub_task] = create_action_plan(client, task["id"], action_items=2)
+    [leaf_task] = sub_task["leaf_tasks"]
+    item = leaf_task["action_items"][0]
+    client.put(f"/action-items/{item['id']}", json={"content": "otter item", "is_completed": True})
+    client.post(f"/tasks/{task['id']}/work-logs/", json={
+        "description": "otter log", "started_at": "2024-01-01T23:00:00", "ended_at": "2024-01-02T01:00:00",
+    })
+    memo = client.post("/memos/", json={"content": "otter memo"}).json()
+    expected_search = search_ids(client, "otter")
+    expected_rollups = rollups(db)
+    assert len(expected_search) == 4 and len(expected_rollups) == 2
+
+    records = export_records(client)
+    # ファイルの派生値は使わずに作り直す（カウンタを壊しておく）
+    for record in records[1:]:
+        if record["table"] in ("tasks", "sub_tasks", "leaf_tasks"):
+            record["row"].update(completed_count=0, total_count=0)
+
+    # エクスポートの後の変更は置き換えで消える
+    create_task(client, "beaver task")
+    version = client.get("/sync", params={"since": 0}).json()["version"]
+    etag = client.get("/tasks/").headers["etag"]
+
+    response = import_replace(client, to_ndjson(records))
+    assert response.status_code == 200, response.text
+    assert response.json()["imported"]["tasks"] == 1
+
+    assert search_ids(client, "otter") == expected_search
+    assert search_ids(client, "beaver") == set()
+    assert rollups(db) == expected_rollups
+    counters = assert_counters_match_rebuild(db)
+    assert counters[("tasks", task["id"])] == (1, 2)
+    assert counters[("leaf_tasks", leaf_task["id"])] == (1, 2)
+    # コレクションバージョンが進み、古い ETag では 304 にならない
+    response = client.get("/tasks/", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
+    assert client.get(f"/memos/{memo['id']}").json()["content"] == "otter memo"
+    # インポート前のバージョンからの差分は組み立てられない
+    assert client.get("/sync", params={"since": version}).status_code == 410
+
+
+def test_malformed_line_rolls_back_the_whole_import(client, db):
+    task = create_task(client, "otter task")
+    records = export_records(client)
+    create_task(client, "beaver task")
+    version = client.get("/sync", params={"since": 0}).json()["version"]
+    etag = client.get("/tasks/").headers["etag"]
+
+    # タスクの行を取り込んだ後（既存の行を消した後）で壊れた行に当たる
+    content = to_ndjson(records) + "{not json\n"
+    response = import_replace(client, content)
+    assert response.status_code == 400
+    assert "Line" in response.json()["detail"]
+
+    db.expire_all()
+    assert sorted(row.title for row in db.query(Task)) == ["beaver task", "otter task"]
+    assert search_ids(client, "otter") == {("task", task["id"])}
+    assert client.get("/tasks/", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/sync", params={"since": version}).status_code == 200
+    # 取り込みの間だけ外していた全文検索のトリガーも元に戻っている
+    created = create_task(client, "walrus task")
+    assert search_ids(client, "walrus") == {("task", created["id"])}
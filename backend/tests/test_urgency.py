@@ -0,0 +1,47 @@
+"""期限の通知と緊急度（期限は JST で保存・比較する）"""
+from datetime import datetime, timedelta, timezone
+
+from app.database import engine
+from app.models import Task
+from app.urgency import now_jst, queue_deadline_reminders, refresh_urgency_scores
+
+from .conftest import create_task
+
+
+def utc_iso(delta: timedelta) -> str:
+    # フロントエンドの toISOString() と同じ形式
+    return (datetime.now(timezone.utc) + delta).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def test_utc_deadline_is_stored_as_jst(client, db):
+    deadline = datetime(2026, 10, 17, 15, 0, tzinfo=timezone.utc)
+    task = create_task(client, deadline=deadline.isoformat())
+    assert task["deadline"] == "2026-10-18T00:00:00"
+    assert db.get(Task, task["id"]).deadline == datetime(2026, 10, 18, 0, 0)
+
+
+def test_reminders_use_the_actual_deadline(client):
+    soon = create_task(client, "soon", deadline=utc_iso(timedelta(hours=3)))
+    past = create_task(client, "past", deadline=utc_iso(timedelta(hours=-1)))
+    create_task(client, "later", deadline=utc_iso(timedelta(days=3)))
+
+    reminders = {reminder["id"]: reminder["kind"] for reminder in queue_deadline_reminders(engine)}
+    assert reminders == {soon["id"]: "approaching", past["id"]: "overdue"}
+
+
+def test_urgency_grows_as_deadline_approaches(client, db):
+    overdue = create_task(client, "overdue", deadline=utc_iso(timedelta(hours=-1)))
+    near = create_task(client, "near", deadline=utc_iso(timedelta(hours=2)))
+    far = create_task(client, "far", deadline=utc_iso(timedelta(hours=48)))
+    refresh_urgency_scores(engine, now_jst())
+    scores = {task.id: task.urgency_score for task in db.query(Task)}
+    assert scores[overdue["id"]] > scores[near["id"]] > scores[far["id"]]
+
+
+def test_deadline_filter_accepts_utc_bounds(client):
+    create_task(client, "in range", deadline="2026-10-18T00:00:00")  # JST
+    create_task(client, "out of range", deadline="2026-10-19T00:00:00")
+    response = client.get("/tasks/", params={
+        "deadline_from": "2026-10-17T14:00:00Z", "deadline_to": "2026-10-17T16:00:00Z", "view": "full",
+    })
+    assert [task["title"] for task in response.json()] == ["in range"]
@@ -0,0 +1,116 @@
+"""作業時間の日次ロールアップ（増分更新と作り直しの一致）"""
+import logging
+from datetime import date
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.models import WorkLog, WorkTimeRollup, rebuild_work_time_rollups
+
+from .conftest import count_statements, create_task
+
+
+def rollups(db):
+    db.expire_all()
+    return sorted(db.execute(
+        select(WorkTimeRollup.task_id, WorkTimeRollup.day, WorkTimeRollup.seconds, WorkTimeRollup.log_count)
+    ).all())
+
+
+def assert_matches_rebuild(db):
+    incremental = rollups(db)
+    rebuild_work_time_rollups(db)
+    assert rollups(db) == incremental
+    return incremental
+
+
+def add_log(client, task_id, started_at, ended_at):
+    response = client.post(f"/tasks/{task_id}/work-logs/", json={
+        "description": "log", "started_at": started_at, "ended_at": ended_at,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_utc_timestamps_are_stored_as_jst(client, db):
+    task = create_task(client)
+    log = add_log(client, task["id"], "2026-10-17T20:00:00.000Z", "2026-10-17T21:00:00.000Z")
+    assert log["started_at"] == "2026-10-18T05:00:00"
+    assert db.get(WorkLog, log["id"]).ended_at.isoformat() == "2026-10-18T06:00:00"
+    assert assert_matches_rebuild(db) == [(task["id"], date(2026, 10, 18), 3600, 1)]
+
+
+def test_create_then_delete_leaves_no_rollup(client, db):
+    task = create_task(client)
+    log = add_log(client, task["id"], "2026-10-17T20:00:00.000Z", "2026-10-17T21:00:00.000Z")
+    assert client.delete(f"/tasks/{task['id']}/work-logs/{log['id']}").status_code == 200
+    assert assert_matches_rebuild(db) == []
+
+
+def test_incremental_rollups_match_rebuild_after_updates(client, db):
+    task = create_task(client)
+    other = create_task(client, "other")
+    # JST の日付をまたぐログ（23:30〜翌 00:30 JST）
+    crossing = add_log(client, task["id"], "2026-10-17T14:30:00Z", "2026-10-17T15:30:00Z")
+    naive = add_log(client, task["id"], "2026-10-18T09:00:00", "2026-10-18T10:30:00")
+    open_log = add_log(client, other["id"], "2026-10-19T01:00:00+00:00", None)
+    assert assert_matches_rebuild(db) == [
+        (task["id"], date(2026, 10, 17), 1800, 1),
+        (task["id"], date(2026, 10, 18), 1800 + 5400, 1),
+        (other["id"], date(2026, 10, 19), 0, 1),
+    ]
+
+    client.put(f"/tasks/{task['id']}/work-logs/{crossing['id']}", json={
+        "description": "moved", "started_at": "2026-10-20T00:00:00Z", "ended_at": "2026-10-20T02:00:00Z",
+    })
+    client.put(f"/tasks/{other['id']}/work-logs/{open_log['id']}", json={
+        "description": "closed", "started_at": "2026-10-19T01:00:00Z", "ended_at": "2026-10-19T01:45:00Z",
+    })
+    client.delete(f"/tasks/{task['id']}/work-logs/{naive['id']}")
+    assert assert_matches_rebuild(db) == [
+        (task["id"], date(2026, 10, 20), 7200, 1),
+        (other["id"], date(2026, 10, 19), 2700, 1),
+    ]
+
+    assert client.delete(f"/tasks/{task['id']}").status_code == 200
+    assert assert_matches_rebuild(db) == [(other["id"], date(2026, 10, 19), 2700, 1)]
+
+
+def test_missing_rollup_row_is_reported(client, db, caplog):
+    task = create_task(client)
+    log = add_log(client, task["id"], "2026-10-17T00:00:00Z", "2026-10-17T01:00:00Z")
+    db.execute(delete(WorkTimeRollup))
+    db.commit()
+    with caplog.at_level(logging.WARNING, logger="bizbuddy"):
+        client.delete(f"/tasks/{task['id']}/work-logs/{log['id']}")
+    assert "rebuild-work-time" in caplog.text
+
+
+@pytest.mark.parametrize("started_at, ended_at", [
+    ("2026-10-17T10:00:00", "2026-10-17T09:00:00"),
+    ("2026-10-17T10:00:00", "2124-01-01T00:00:00"),
+    # タイムゾーンの有無が混ざっていても JST にそろえて比べる（01:00Z は 10:00 JST）
+    ("2026-10-17T10:30:00", "2026-10-17T01:00:00Z"),
+])
+def test_inverted_or_too_long_logs_are_rejected(client, db, started_at, ended_at):
+    task = create_task(client)
+    payload = {"description": "typo", "started_at": started_at, "ended_at": ended_at}
+    assert client.post(f"/tasks/{task['id']}/work-logs/", json=payload).status_code == 422
+    log = add_log(client, task["id"], "2026-10-17T09:00:00", "2026-10-17T10:00:00")
+    assert client.put(f"/tasks/{task['id']}/work-logs/{log['id']}", json=payload).status_code == 422
+    assert assert_matches_rebuild(db) == [(task["id"], date(2026, 10, 17), 3600, 1)]
+
+
+def test_multi_day_log_writes_rollups_in_one_statement(client, db):
+    task = create_task(client)
+    add_log(client, task["id"], "2026-10-17T09:00:00", "2026-10-17T10:00:00")
+    with count_statements() as statements:
+        add_log(client, task["id"], "2026-10-17T22:00:00", "2026-10-21T02:00:00")
+    assert len([sql for sql in statements if "work_time_rollups" in sql]) == 1
+    assert assert_matches_rebuild(db) == [
+        (task["id"], date(2026, 10, 17), 3600 + 7200, 2),
+        (task["id"], date(2026, 10, 18), 86400, 0),
+        (task["id"], date(2026, 10, 19), 86400, 0),
+        (task["id"], date(2026, 10, 20), 86400, 0),
+        (task["id"], date(2026, 10, 21), 7200, 0),
+    ]
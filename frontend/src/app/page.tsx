@@ -15,6 +15,7 @@ import Timer from '../components/Timer'
 import WorkLogForm from '@/components/WorkLogForm'
 import { ActionPlan } from '@/components/ActionPlan'
 import { DailyLog } from '@/components/DailyLog'
+import { subscribeChanges, getTask } from '@/lib/api'
 
 // パネルサイズの保存と読み込み用の関数
 const savePanelLayout = (sizes: number[]) => {
@@ -73,6 +74,7 @@ export default function Home() {
   const [loading, setLoading] = useState(true)
   const [isTaskFormOpen, setIsTaskFormOpen] = useState(false)
   const [selectedTaskId, setSelectedTaskId] = useState<number | null>(null)
+  const [selectedWorkLogs, setSelectedWorkLogs] = useState<WorkLog[]>([])
   const [isWorkLogModalOpen, setIsWorkLogModalOpen] = useState(false)
   const [editingWorkLog, setEditingWorkLog] = useState<WorkLog | undefined>(undefined)
   const [deletingWorkLogId, setDeletingWorkLogId] = useState<number | null>(null);
@@ -85,7 +87,7 @@ export default function Home() {
 
   const fetchTasks = async () => {
     try {
-      const response = await fetch('http://localhost:8000/tasks/')
+      const response = await fetch('http://localhost:8000/tasks/?sort=status,-priority')
       const data = await response.json()
       setTasks(data)
     } catch (error) {
@@ -113,6 +115,35 @@ export default function Home() {
     fetchTasks()
   }, [])
 
+  // 一覧には作業ログの集計値しか含まれないため、選択中のタスクの作業ログは詳細から取得する
+  // （一覧を取り直したときも作業ログが変わっている可能性があるので取り直す）
+  useEffect(() => {
+    if (selectedTaskId === null) {
+      setSelectedWorkLogs([])
+      return
+    }
+    let cancelled = false
+    getTask(selectedTaskId)
+      .then((task) => {
+        if (!cancelled) setSelectedWorkLogs(task.work_logs ?? [])
+      })
+      .catch((error) => console.error('Error fetching work logs:', error))
+    return () => {
+      cancelled = true
+    }
+  }, [selectedTaskId, tasks])
+
+  // 他のクライアントでの変更を反映する（削除はその場で取り除き、それ以外は取り直す）
+  useEffect(() => {
+    return subscribeChanges((change) => {
+      if (change.op === 'delete' && change.entity === 'task') {
+        setTasks((prev) => prev.filter((task) => task.id !== change.id))
+      } else if (change.op === 'resync' || change.collection === 'tasks') {
+        fetchTasks()
+      }
+    })
+  }, [])
+
   // キーボードショートカットの処理を追加
   useEffect(() => {
     const handleKeyDown = (e: KeyboardEvent) => {
@@ -477,9 +508,9 @@ export default function Home() {
                                       </div>
                                     </form>
                                   </div>
-                                  {tasks.find(task => task.id === selectedTaskId)?.work_logs
-                                    ?.sort((a, b) => new Date(b.started_at).getTime() - new Date(a.started_at).getTime())
-                                    ?.map(log => (
+                                  {[...selectedWorkLogs]
+                                    .sort((a, b) => new Date(b.started_at).getTime() - new Date(a.started_at).getTime())
+                                    .map(log => (
                                     <div key={log.id} className="mb-6 last:mb-0 border-b border-gray-200 last:border-0 pb-4 last:pb-0">
                                       <div className="flex justify-between items-start mb-2">
                                         <div className="text-sm text-gray-500">
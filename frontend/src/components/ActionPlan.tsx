@@ -148,8 +148,8 @@ export const ActionPlan = ({
   const fetchSubTasks = async () => {
     if (!selectedTaskId) return;
     try {
-      const data = await api.getSubTasks(selectedTaskId);
-      setSubTasks(data);
+      const data = await api.getActionPlanTree(selectedTaskId);
+      setSubTasks(data.sub_tasks);
     } catch (error) {
       console.error("Failed to fetch sub tasks:", error);
     }
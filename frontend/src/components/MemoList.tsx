@@ -5,6 +5,7 @@ import { format, parseISO, addHours } from "date-fns";
 import { ja } from "date-fns/locale";
 import { marked } from "marked";
 import { Task } from "@/types/task";
+import { subscribeChanges } from "@/lib/api";
 
 interface Memo {
   id: number;
@@ -53,6 +54,17 @@ export default function MemoList({ tasks, onUpdate }: MemoListProps) {
     fetchMemos();
   }, []);
 
+  // 他のクライアントでの変更を反映する
+  useEffect(() => {
+    return subscribeChanges((change) => {
+      if (change.op === "delete" && change.entity === "memo") {
+        setMemos((prev) => prev.filter((memo) => memo.id !== change.id));
+      } else if (change.op === "resync" || change.collection === "memos") {
+        fetchMemos();
+      }
+    });
+  }, []);
+
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     if (!newMemo.trim()) return;
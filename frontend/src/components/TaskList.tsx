@@ -1,12 +1,13 @@
 'use client'
 
-import React, { useState } from 'react'
+import React, { useEffect, useState } from 'react'
 import { format } from 'date-fns'
 import { ja } from 'date-fns/locale'
 import { Task, WorkLog } from '@/types/task'
 import TaskEditModal from './TaskEditModal'
 import { marked } from 'marked'
 import WorkLogForm from './WorkLogForm'
+import { getTaskMemoCounts } from '@/lib/api'
 
 interface TaskListProps {
   tasks: Task[]
@@ -21,6 +22,15 @@ export default function TaskList({ tasks, onUpdate, onTaskSelect, selectedTaskId
   const [isWorkLogModalOpen, setIsWorkLogModalOpen] = useState(false)
   const [editingWorkLog, setEditingWorkLog] = useState<WorkLog | undefined>(undefined)
   const [currentTaskId, setCurrentTaskId] = useState<number | null>(null)
+  const [memoCounts, setMemoCounts] = useState<Record<number, number>>({})
+
+  // 表示中のタスクのメモ件数をまとめて取得する
+  useEffect(() => {
+    if (!tasks) return
+    getTaskMemoCounts(tasks.map((task) => task.id))
+      .then(setMemoCounts)
+      .catch((error) => console.error('Error fetching memo counts:', error))
+  }, [tasks])
 
   if (!tasks) {
     return <div>Loading...</div>
@@ -208,6 +218,11 @@ export default function TaskList({ tasks, onUpdate, onTaskSelect, selectedTaskId
                           </span>
                         )}
                         {task.title}
+                        {memoCounts[task.id] > 0 && (
+                          <span className="ml-2 inline-flex items-center rounded-full bg-gray-100 px-2 text-xs font-normal text-gray-500">
+                            メモ {memoCounts[task.id]}
+                          </span>
+                        )}
                       </td>
                       <td className="whitespace-nowrap px-2 py-2 text-sm text-gray-500">
                         <div className="flex items-center" onClick={(e) => e.stopPropagation()}>
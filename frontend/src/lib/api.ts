@@ -1,3 +1,5 @@
+import { Task } from '@/types/task';
+
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
 // アクションプラン関連のAPI
@@ -9,6 +11,14 @@ export async function getSubTasks(taskId: number) {
   return response.json();
 }
 
+export async function getActionPlanTree(taskId: number) {
+  const response = await fetch(`${API_BASE_URL}/tasks/${taskId}/action-plan`);
+  if (!response.ok) {
+    throw new Error('Failed to fetch action plan');
+  }
+  return response.json();
+}
+
 export async function getSubTaskDetails(subTaskId: number) {
   const response = await fetch(`${API_BASE_URL}/sub-tasks/${subTaskId}/details`);
   if (!response.ok) {
@@ -131,6 +141,28 @@ export async function deleteActionItem(actionItemId: number) {
   return response.json();
 }
 
+export type ActionPlanOperation = {
+  op: 'create' | 'update' | 'delete';
+  entity: 'sub_task' | 'leaf_task' | 'action_item';
+  id?: number;
+  parent_id?: number;
+  data?: Record<string, unknown>;
+};
+
+export async function batchActionPlan(operations: ActionPlanOperation[]) {
+  const response = await fetch(`${API_BASE_URL}/action-plan/batch`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ operations }),
+  });
+  if (!response.ok) {
+    throw new Error('Failed to apply action plan operations');
+  }
+  return response.json();
+}
+
 export const getActionItems = async () => {
   const response = await fetch(`${API_BASE_URL}/action_items`, {
     method: 'GET',
@@ -159,4 +191,50 @@ export async function getActionPlan(actionItemId: number) {
   }
 
   return response.json();
-} 
\ No newline at end of file
+} 
+
+export type ChangeEvent = {
+  entity: 'task' | 'work_log' | 'memo' | 'sub_task' | 'leaf_task' | 'action_item';
+  id: number;
+  op: 'create' | 'update' | 'delete';
+  collection: 'tasks' | 'memos' | 'action_plan';
+  task_id: number | null;
+  version: number;
+} | { op: 'resync' };
+
+// サーバーからの変更イベントを購読する。戻り値を呼ぶと購読を解除する
+export function subscribeChanges(onChange: (change: ChangeEvent) => void) {
+  const source = new EventSource(`${API_BASE_URL}/events`);
+  source.addEventListener('change', (event) => {
+    onChange(JSON.parse((event as MessageEvent).data));
+  });
+  return () => source.close();
+}
+
+export type TaskMemos = {
+  task_id: number;
+  memo_count: number;
+  memos: { id: number; content: string; created_at: string }[];
+};
+
+// 複数タスクのメモ件数を1リクエストで取得する
+export async function getTaskMemoCounts(taskIds: number[]): Promise<Record<number, number>> {
+  if (taskIds.length === 0) return {};
+  const params = new URLSearchParams(taskIds.map((id) => ['task_ids', String(id)]));
+  params.set('counts_only', 'true');
+  const response = await fetch(`${API_BASE_URL}/task-memos?${params}`);
+  if (!response.ok) {
+    throw new Error('Failed to fetch memo counts');
+  }
+  const data: TaskMemos[] = await response.json();
+  return Object.fromEntries(data.map((item) => [item.task_id, item.memo_count]));
+}
+
+// タスクの詳細（一覧は集計値のみのため、作業ログ本体はこちらで取得する）
+export async function getTask(taskId: number): Promise<Task> {
+  const response = await fetch(`${API_BASE_URL}/tasks/${taskId}`);
+  if (!response.ok) {
+    throw new Error('Failed to fetch task');
+  }
+  return response.json();
+}
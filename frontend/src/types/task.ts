@@ -20,6 +20,10 @@ export interface Task {
   created_at: string
   last_updated: string
   work_logs?: WorkLog[]
+  // 一覧（GET /tasks/）で返る作業ログの集計値
+  work_log_count?: number
+  logged_minutes?: number
+  last_activity_at?: string | null
 }
 
 export interface SubTask {
@@ -49,4 +53,17 @@ export interface ActionItem {
   is_completed: boolean;
   created_at: string;
   updated_at: string;
-} 
\ No newline at end of file
+} 
+
+export interface Progress {
+  completed: number;
+  total: number;
+  percentage: number;
+}
+
+export interface ActionPlanTree {
+  task_id: number;
+  title: string;
+  progress: Progress;
+  sub_tasks: (SubTask & { progress: Progress })[];
+}